@@ -1,3 +1,9 @@
+import time
+
+# Process start for the boot timings, taken before the imports below. Streamlit
+# re-runs this file on every interaction; boot keeps only the first value
+_STARTED_AT = time.time()
+
 import streamlit as st
 import warnings
 import os
@@ -123,7 +129,9 @@ def safe_plotly_chart(figure_or_data, use_container_width=True, config=None, **k
 # Replace the original function
 st.plotly_chart = safe_plotly_chart
 
+from src.app.boot import boot, mark_process_started, record_page_rendered
 from src.app.settings import configure_page
+from src.db.datasets import enable_copy_on_write
 from src.app.layout import render_chrome, collapse_sidebar
 from src.pages.home import home_page
 from src.pages.about import about_page
@@ -140,6 +148,12 @@ from src.pages.dashboards.integrations import integrations_page
 from src.auth.login import user_login
 
 
+mark_process_started(_STARTED_AT)
+
+# Pages write to Copy-on-Write views of shared datasets (Dataset.view); pandas 2
+# only has CoW as a process-wide option, switched on here for the whole app
+enable_copy_on_write()
+
 with open('.streamlit/style.css') as f:
     st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
@@ -148,11 +162,14 @@ with open('.streamlit/style.css') as f:
 def main() -> None:
     configure_page()
 
-
     if not user_login():
         # Not authenticated: don't render navigation or any content.
         return
 
+    # Runs once per process, on the first authenticated run: anonymous
+    # visitors never trigger the warehouse warm-up
+    boot()
+
     # Dashboard subpages
     finance_pg = st.Page(finance_page, title='Finance', icon='💰')
     market_pg = st.Page(market_page, title='Market', icon='🌐')
@@ -203,6 +220,7 @@ def main() -> None:
         collapse_sidebar()
 
     pg.run()
+    record_page_rendered(pg.title)
 
 
 
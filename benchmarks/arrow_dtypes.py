@@ -0,0 +1,112 @@
+"""Benchmark GA frames with object, categorical and pandas' pyarrow dtypes.
+
+Run from the repo root. With BigQuery credentials in .streamlit/secrets.toml
+it fetches ``ga_view_app`` and compares, for the object-dtype frame, the
+categorical frame the cache serves by default and the ``pd.ArrowDtype``
+frame, memory use, decoding from the Arrow cache payload,
+string comparison, ``str.replace`` and groupby on a dimension, conversion
+back to Arrow (what ``st.dataframe`` does) and ``GaFrames`` preparation::
+
+    python -m benchmarks.arrow_dtypes --repeat 3
+
+``--synthetic N`` uses N random rows and needs no warehouse.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.db.normalize import normalize_frame
+from src.db.query_cache import deserialize_frame, serialize_frame
+from src.engines.ga_frames import DIMENSIONS, GaFrames
+
+DIMENSION = 'campaign_details_aggregated'
+
+
+def _timed(fn, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _synthetic(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp.now().normalize() - pd.to_timedelta(rng.integers(1, 365, rows), unit='D')
+    df = pd.DataFrame({'events_count': rng.integers(1, 50, rows), 'event_date': days.strftime('%Y%m%d')})
+    for i, dimension in enumerate(DIMENSIONS):
+        values = np.array([f'{dimension}_value_{v}' for v in range(10 + 15 * i)], dtype=object)
+        column = rng.choice(values, rows)
+        column[rng.random(rows) < 0.05] = None
+        df[dimension] = column
+    return df
+
+
+def _mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def compare(raw: pd.DataFrame, repeat: int) -> None:
+    # As cached: normalized with or without categoricals, then decoded each way
+    payload = serialize_frame(normalize_frame(raw, categories=False))
+    categorical_payload = serialize_frame(normalize_frame(raw))
+    value = raw[DIMENSION].dropna().iloc[0]
+
+    print(f'rows: {len(raw):,}; cache payload {len(payload) / 2**20:.1f} MB, '
+          f'with categoricals {len(categorical_payload) / 2**20:.1f} MB')
+    decode = {
+        'object': lambda: deserialize_frame(payload).astype({d: object for d in DIMENSIONS if d in raw.columns}),
+        'categorical': lambda: deserialize_frame(categorical_payload),
+        'pyarrow': lambda: deserialize_frame(payload, 'pyarrow'),
+    }
+    frames = {name: read() for name, read in decode.items()}
+    workloads = {
+        'decode from cache': lambda name, df: decode[name](),
+        f'{DIMENSION} == value': lambda name, df: df[DIMENSION] == value,
+        'str.replace': lambda name, df: df[DIMENSION].str.replace('_', ' '),
+        'groupby sum': lambda name, df: df.groupby(DIMENSION, observed=True)['events_count'].sum(),
+        'to Arrow (st.dataframe)': lambda name, df: pa.Table.from_pandas(df, preserve_index=False),
+        'GaFrames prepare': lambda name, df: GaFrames(df, df.iloc[:0]),
+    }
+
+    print('memory: ' + ', '.join(f'{name} {_mb(df):.1f} MB' for name, df in frames.items()))
+    for label, work in workloads.items():
+        timings = {name: _timed(lambda: work(name, df), repeat)[0] for name, df in frames.items()}
+        print(f'{label}: ' + ', '.join(f'{name} {seconds * 1000:.1f} ms' for name, seconds in timings.items()))
+
+    sums = {name: df.groupby(DIMENSION, observed=True)['events_count'].sum().to_dict() for name, df in frames.items()}
+    same = sums['object'] == sums['categorical'] == sums['pyarrow']
+    print(f'same groupby result: {same}')
+
+
+def run_synthetic(rows: int, repeat: int) -> None:
+    compare(_synthetic(rows), repeat)
+
+
+def run_warehouse(repeat: int) -> None:
+    # Only the warehouse run needs the connection helpers and SQL
+    from src.db.bigquery_connection import get_bigquery_client
+    from src.sql.google_analytics.google_analytics import ga_view_app
+
+    compare(get_bigquery_client().query(ga_view_app).to_dataframe(), repeat)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--synthetic', type=int, metavar='N', help='use N random rows')
+    args = parser.parse_args()
+    if args.synthetic:
+        run_synthetic(args.synthetic, args.repeat)
+    else:
+        run_warehouse(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark page reads of a cached dataset: st.cache_data copies vs Copy-on-Write views.
+
+Run from the repo root. With Redshift credentials in .streamlit/secrets.toml
+it reads ``core_metrics`` through ``run_query`` (``st.cache_data``, which
+unpickles a fresh copy per call) and through ``load_dataset(...).view()``,
+runs the same page transform on each (parse and sort weeks, derive columns
+on a column subset and on a filtered frame) with and without the defensive
+``.copy()`` calls, and reports what one rerun allocates (tracemalloc peak and
+the number of column arrays it leaves allocated) and how long it takes::
+
+    python -m benchmarks.dataset_views --repeat 5
+
+``--synthetic N`` uses an N-row, core_metrics-shaped frame and needs no warehouse.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.db.datasets import Dataset, enable_copy_on_write
+
+# Allocations at least this large are column buffers rather than Python objects
+ARRAY_BLOCK_BYTES = 64 * 1024
+
+
+def _timed(fn, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _allocations(fn) -> tuple[int, int]:
+    """Peak bytes allocated by one call of ``fn`` and how many array-sized blocks its result holds."""
+    tracemalloc.start()
+    before = sum(1 for t in tracemalloc.take_snapshot().traces if t.size >= ARRAY_BLOCK_BYTES)
+    result = fn()
+    after = sum(1 for t in tracemalloc.take_snapshot().traces if t.size >= ARRAY_BLOCK_BYTES)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, after - before
+
+
+def _synthetic(rows: int, columns: int = 40, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    weeks = pd.Timestamp.now().normalize() - pd.to_timedelta(rng.integers(0, 3650, rows) * 7, unit='D')
+    # Built in one go so its blocks are consolidated, like a frame decoded from the cache
+    metrics = {f'metric_{i}': rng.integers(0, 500, rows).astype('int32') for i in range(columns)}
+    return pd.DataFrame({'week': weeks, **metrics})
+
+
+def _page(df: pd.DataFrame, copies: bool) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """The transforms the core_metrics pages run, optionally with their old defensive copies."""
+    df['week'] = pd.to_datetime(df['week'])
+    df = df.sort_values('week')
+    metrics = [c for c in df.columns if c != 'week'][:3]
+    subset = df[['week', *metrics]]
+    subset = subset.copy() if copies else subset
+    subset['week_start'] = subset['week']
+    recent = df[df['week'] >= df['week'].iloc[len(df) // 2]]
+    recent = recent.copy() if copies else recent
+    recent['total'] = recent[metrics].sum(axis=1)
+    return subset, recent
+
+
+def compare(frame: pd.DataFrame, read_copy, read_view, repeat: int) -> None:
+    """``read_copy`` returns the dataset as ``run_query`` does, ``read_view`` as ``load_dataset(...).view()``."""
+    print(f'rows: {len(frame):,}; frame {frame.memory_usage(deep=True).sum() / 2**20:.1f} MB')
+    read_copy(), read_view()  # fill both caches
+    runs = {
+        'cache_data + copies': lambda: _page(read_copy(), copies=True),
+        'view, no copies': lambda: _page(read_view(), copies=False),
+    }
+    for label, run in runs.items():
+        seconds, _ = _timed(run, repeat)
+        peak, count = _allocations(run)
+        print(f'{label}: {seconds * 1000:.1f} ms, peak {peak / 2**20:.1f} MB, {count} arrays allocated')
+
+    reads = {'cache_data read': read_copy, 'view read': read_view}
+    for label, read in reads.items():
+        peak, count = _allocations(read)
+        print(f'{label}: peak {peak / 2**20:.2f} MB, {count} arrays allocated')
+
+
+def run_synthetic(rows: int, repeat: int) -> None:
+    frame = _synthetic(rows)
+    handle = Dataset(frame, version='synthetic')
+
+    @st.cache_data(show_spinner=False)
+    def read_copy() -> pd.DataFrame:
+        return frame
+
+    compare(frame, read_copy, handle.view, repeat)
+
+
+def run_warehouse(repeat: int) -> None:
+    # Only the warehouse run needs the connection helpers and SQL
+    from src.db.datasets import load_dataset
+    from src.db.redshift_connection import run_query
+    from src.sql.core_metrics.core_metrics import core_metrics
+
+    compare(
+        load_dataset(core_metrics).frame,
+        lambda: run_query(core_metrics),
+        lambda: load_dataset(core_metrics).view(),
+        repeat,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--synthetic', type=int, metavar='N', help='use N random rows')
+    args = parser.parse_args()
+    # As in app.py: the views only stay free of copies with Copy-on-Write on
+    enable_copy_on_write()
+    if args.synthetic:
+        run_synthetic(args.synthetic, args.repeat)
+    else:
+        run_warehouse(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
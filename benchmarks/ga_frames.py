@@ -0,0 +1,144 @@
+"""Benchmark GA frame preparation: object-string frames vs categorical, indexed frames.
+
+Run from the repo root. With BigQuery credentials in .streamlit/secrets.toml
+it fetches ``ga_installs`` and ``ga_view_app`` and compares, on the raw and
+the prepared frames, memory use, the time to slice every value of a
+dimension (plus a 8-week date range) the way google_analytics_page does, and
+the time to cut its date windows (last 30 days, 6 months, 8 completed weeks,
+last and previous week) with a boolean mask vs ``searchsorted``, and checks
+that a trend window over two values ends on their latest date::
+
+    python -m benchmarks.ga_frames --repeat 3
+
+``--synthetic N`` uses N random rows per frame and needs no warehouse.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.engines.ga_frames import DIMENSIONS, GaFrames, week_ordinal
+
+SLICED = ('medium_aggregated', 'source_aggregated', 'campaign_aggregated', 'locale_aggregated')
+
+
+def _timed(fn, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _synthetic(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp.now().normalize() - pd.to_timedelta(rng.integers(1, 365, rows), unit='D')
+    df = pd.DataFrame({'events_count': rng.integers(1, 50, rows), 'event_date': days.strftime('%Y%m%d')})
+    for i, dimension in enumerate(DIMENSIONS):
+        values = np.array([f'{dimension}_{v}' for v in range(10 + 15 * i)], dtype=object)
+        column = rng.choice(values, rows)
+        column[rng.random(rows) < 0.05] = None
+        df[dimension] = column
+    return df
+
+
+def _mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def compare(installs: pd.DataFrame, views: pd.DataFrame, repeat: int) -> None:
+    prep_seconds, ga = _timed(lambda: GaFrames(installs, views), 1)
+
+    # What the page did before: parse dates on the raw frame, then mask per value
+    raw = views.copy()
+    raw['event_date'] = pd.to_datetime(raw['event_date'], format='%Y%m%d')
+    end = raw['event_date'].max()
+    start = end - pd.Timedelta(weeks=8)
+
+    print(f'rows: {len(installs):,} installs + {len(views):,} views')
+    print(f'memory (views): raw {_mb(views):.1f} MB -> prepared {_mb(ga.views.frame):.1f} MB')
+    print(f'memory (installs): raw {_mb(installs):.1f} MB -> prepared {_mb(ga.installs.frame):.1f} MB')
+    print(f'preparation (both frames): {prep_seconds * 1000:.0f} ms')
+
+    for dimension in SLICED:
+        values = raw[dimension].dropna().unique()
+        ga.views.indexed(dimension)  # built once per dimension and shared afterwards
+
+        def masked():
+            return [raw[(raw[dimension] == v) & (raw['event_date'] >= start) & (raw['event_date'] <= end)]
+                    for v in values]
+
+        def sliced():
+            return [ga.views.rows(dimension, v, start, end) for v in values]
+
+        mask_seconds, expected = _timed(masked, repeat)
+        slice_seconds, actual = _timed(sliced, repeat)
+        same = all(int(a['events_count'].sum()) == int(e['events_count'].sum()) and len(a) == len(e)
+                   for a, e in zip(actual, expected))
+        print(f'{dimension} ({len(values)} values): mask {mask_seconds * 1000:.1f} ms, '
+              f'index slice {slice_seconds * 1000:.1f} ms, same rows: {same}')
+
+    this_week = end - pd.Timedelta(days=end.weekday())
+    week = week_ordinal(this_week)
+    windows = {
+        'last 30 days': ((end - pd.Timedelta(days=30), end), lambda: ga.views.window(end - pd.Timedelta(days=30))),
+        'last 6 months': ((end - pd.Timedelta(days=180), end), lambda: ga.views.window(end - pd.Timedelta(days=180))),
+        'last 8 completed weeks': (
+            (this_week - pd.Timedelta(weeks=8), this_week - pd.Timedelta(days=1)),
+            lambda: ga.views.weeks(week - 8, week - 1),
+        ),
+        'last week': (
+            (this_week - pd.Timedelta(weeks=1), this_week - pd.Timedelta(days=1)),
+            lambda: ga.views.weeks(week - 1, week - 1),
+        ),
+        'previous week': (
+            (this_week - pd.Timedelta(weeks=2), this_week - pd.Timedelta(weeks=1, days=1)),
+            lambda: ga.views.weeks(week - 2, week - 2),
+        ),
+    }
+    for label, ((low, high), window) in windows.items():
+        mask_seconds, expected = _timed(lambda: raw[(raw['event_date'] >= low) & (raw['event_date'] <= high)], repeat)
+        slice_seconds, actual = _timed(window, repeat)
+        same = len(actual) == len(expected) and int(actual['events_count'].sum()) == int(expected['events_count'].sum())
+        print(f'{label}: mask {mask_seconds * 1000:.2f} ms, searchsorted {slice_seconds * 1000:.3f} ms, same rows: {same}')
+
+    # The organic trends window: last 30 days of two mediums, ending on their latest date
+    mediums = installs['medium_aggregated'].dropna().unique()[:2].tolist()
+    latest = ga.installs.rows('medium_aggregated', mediums)['event_date'].max()
+    trends = ga.installs.rows('medium_aggregated', mediums, latest - pd.Timedelta(days=30))
+    expected = ga.installs.frame.loc[ga.installs.frame['medium_aggregated'].isin(mediums), 'event_date'].max()
+    print(f'two-medium trend window ends on the latest date: {trends["event_date"].max() == expected}')
+
+
+def run_synthetic(rows: int, repeat: int) -> None:
+    compare(_synthetic(rows), _synthetic(rows, seed=1), repeat)
+
+
+def run_warehouse(repeat: int) -> None:
+    # Only the warehouse run needs the connection helpers and SQL
+    from src.db.bigquery_connection import get_bigquery_client
+    from src.sql.google_analytics.google_analytics import ga_installs, ga_view_app
+
+    def query(sql: str) -> pd.DataFrame:
+        return get_bigquery_client().query(sql).to_dataframe()
+
+    compare(query(ga_installs), query(ga_view_app), repeat)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--synthetic', type=int, metavar='N', help='use N random rows per frame')
+    args = parser.parse_args()
+    if args.synthetic:
+        run_synthetic(args.synthetic, args.repeat)
+    else:
+        run_warehouse(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
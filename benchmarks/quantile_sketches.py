@@ -0,0 +1,89 @@
+"""Check t-digest percentiles against exact np.quantile on outlier-cut data.
+
+Run from the repo root. With Redshift credentials in .streamlit/secrets.toml
+it loads the journey store's ``days_to_first_review`` and compares, for the
+outlier cuts the onboarding page offers, the digest's percentiles and trimmed
+mean with the exact values of the rows inside [low, high] (both bounds
+inclusive), plus the time each takes::
+
+    python -m benchmarks.quantile_sketches --repeat 3
+
+``--synthetic N`` uses N values with a large share of zeros (same-day reviews)
+and ties at other cut values, and needs no warehouse.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from src.engines.quantiles import TDigest
+
+PERCENTILES = (25, 50, 75, 90, 99)
+CUTS = ((None, None), (0, 180), (0, 30), (5, 180))
+
+
+def _timed(fn, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _synthetic(rows: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    zeros = np.zeros(rows * 3 // 10)
+    fives = np.full(rows // 10, 5.0)
+    rest = np.round(rng.lognormal(1.5, 1.0, rows - len(zeros) - len(fives)), 1)
+    return rng.permutation(np.concatenate([zeros, fives, rest]))
+
+
+def compare(values: np.ndarray, repeat: int) -> None:
+    values = values[~np.isnan(values)]
+    q = np.asarray(PERCENTILES) / 100
+    build_seconds, digest = _timed(lambda: TDigest.from_values(values), repeat)
+    print(f'values: {len(values):,} ({(values == 0).mean():.0%} zeros); digest of {len(digest.means)} centroids '
+          f'built in {build_seconds * 1000:.1f} ms')
+
+    for low, high in CUTS:
+        def exact():
+            kept = values[(values >= (-np.inf if low is None else low)) & (values <= (np.inf if high is None else high))]
+            return np.quantile(kept, q), kept.mean()
+
+        exact_seconds, (expected, mean) = _timed(exact, repeat)
+        digest_seconds, actual = _timed(lambda: digest.quantile(q, low, high), repeat)
+        error = np.abs(actual - expected) / np.maximum(np.abs(expected), 1)
+        print(f'[{low}, {high}]: exact {np.round(expected, 2).tolist()} ({exact_seconds * 1000:.2f} ms), '
+              f'digest {np.round(actual, 2).tolist()} ({digest_seconds * 1000:.3f} ms), '
+              f'max error {error.max():.1%}; mean {mean:.2f} vs {digest.trimmed_mean(low, high):.2f}')
+
+
+def run_synthetic(rows: int, repeat: int) -> None:
+    compare(_synthetic(rows), repeat)
+
+
+def run_warehouse(repeat: int) -> None:
+    # Only the warehouse run needs the journey store
+    from src.engines.journeys import get_journey_store
+
+    store = get_journey_store()
+    store.ensure_fresh()
+    compare(store.journeys['days_to_first_review'].to_numpy(dtype='float64'), repeat)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--synthetic', type=int, metavar='N', help='use N random values')
+    args = parser.parse_args()
+    if args.synthetic:
+        run_synthetic(args.synthetic, args.repeat)
+    else:
+        run_warehouse(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
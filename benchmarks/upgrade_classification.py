@@ -0,0 +1,105 @@
+"""Benchmark the local as-of upgrade classification and check it against core_metrics.
+
+Run from the repo root. With Redshift credentials in .streamlit/secrets.toml
+it times ``core_metrics`` against fetching the two extracts plus classifying
+locally, and checks that every week's direct, trial and reopened counts add
+up to the week's ``core_upgrades`` in ``core_metrics``::
+
+    python -m benchmarks.upgrade_classification --repeat 3
+
+``--synthetic N`` times only the local engine on N random extension rows and
+needs no warehouse.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.engines.lifecycle import LifecycleExtract
+from src.engines.upgrades import UPGRADE_COLUMNS, TrialStarts, classify_upgrades, upgrade_breakdown, with_upgrade_breakdown
+
+
+def _timed(fn, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _synthetic(rows: int, seed: int = 0) -> tuple[LifecycleExtract, TrialStarts]:
+    rng = np.random.default_rng(seed)
+    base = pd.Timestamp.now().normalize() - pd.Timedelta(days=700)
+    shops = max(rows // 4, 1)
+
+    def stamps(n: int, share: float) -> pd.Series:
+        values = base + pd.to_timedelta(rng.integers(0, 700 * 86400, n), unit='s')
+        return pd.Series(values).where(rng.random(n) < share)
+
+    extensions = pd.DataFrame({
+        'shop_id': rng.integers(0, shops, rows),
+        'created_at': stamps(rows, 1.0),
+        'upgraded_at': stamps(rows, 0.4),
+        'downgraded_at': stamps(rows, 0.25),
+        'deleted_at': stamps(rows, 0.4),
+        'shop_awesome': 0,
+        'is_shopify': 1,
+    })
+    trials = pd.DataFrame({'shop_id': rng.integers(0, shops, rows // 2), 'created_at': stamps(rows // 2, 1.0)})
+    return LifecycleExtract.from_frame(extensions), TrialStarts.from_frame(trials)
+
+
+def run_synthetic(rows: int, repeat: int) -> None:
+    ex, trials = _synthetic(rows)
+    seconds, breakdown = _timed(lambda: upgrade_breakdown(classify_upgrades(ex, trials)), repeat)
+    print(f'local engine, {rows:,} extension rows: {seconds * 1000:.1f} ms '
+          f'({int(breakdown.iloc[:, 1:].to_numpy().sum()):,} upgrades classified)')
+
+
+def run_warehouse(repeat: int) -> None:
+    # Only the warehouse run needs the connection helpers and SQL
+    from src.db.redshift_connection import get_redshift_connection
+    from src.sql.core_metrics.core_metrics import core_metrics
+    from src.sql.growth.lifecycle import lifecycle_extract
+    from src.sql.upgrade.shop_trials import shop_trials_extract
+
+    def query(sql: str) -> pd.DataFrame:
+        with get_redshift_connection() as conn:
+            return pd.read_sql_query(sql, conn)
+
+    sql_seconds, core = _timed(lambda: query(core_metrics), repeat)
+    extract_seconds, (ex, trials) = _timed(
+        lambda: (LifecycleExtract.from_frame(query(lifecycle_extract)),
+                 TrialStarts.from_frame(query(shop_trials_extract))),
+        repeat,
+    )
+    local_seconds, breakdown = _timed(lambda: upgrade_breakdown(classify_upgrades(ex, trials)), repeat)
+
+    core['week'] = pd.to_datetime(core['week'])
+    weekly = with_upgrade_breakdown(core, breakdown)
+    totals = weekly[list(UPGRADE_COLUMNS)].sum(axis=1)
+    matches = (totals.to_numpy() == weekly['core_upgrades'].to_numpy()).all()
+
+    print(f'redshift core_metrics: {sql_seconds * 1000:.0f} ms')
+    print(f'extract fetch (extensions + trials): {extract_seconds * 1000:.0f} ms, {len(ex):,} + {len(trials.shop_id):,} rows')
+    print(f'local classification: {local_seconds * 1000:.1f} ms')
+    print(f'weekly totals match core_upgrades: {matches}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--synthetic', type=int, metavar='N', help='time the engine alone on N random rows')
+    args = parser.parse_args()
+    if args.synthetic:
+        run_synthetic(args.synthetic, args.repeat)
+    else:
+        run_warehouse(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,9 @@ import pandas as pd
 from google.oauth2 import service_account
 from google.cloud import bigquery
 
+from src.db.query_cache import fetch_query
+from src.sql.dtype_backends import dtype_backend
+
 
 @st.cache_resource(ttl="1h")
 def get_bigquery_client() -> bigquery.Client:
@@ -17,10 +20,21 @@ def get_bigquery_client() -> bigquery.Client:
     return bigquery.Client(credentials=credentials, project=info["project_id"])
 
 
+def _run_bigquery_query(query: str) -> pd.DataFrame:
+    client = get_bigquery_client()
+    return client.query(query).to_dataframe()
+
+
+def fetch_result(query: str) -> pd.DataFrame:
+    """
+    Run a bigquery query through the shared query cache, without st.cache_data
+    """
+    return fetch_query("bigquery", query, _run_bigquery_query, dtype_backend=dtype_backend(query))
+
+
 @st.cache_data(ttl="1h")
 def run_query(query: str) -> pd.DataFrame:
     """
     Run a bigquery query
     """
-    client = get_bigquery_client()
-    return client.query(query).to_dataframe()
+    return fetch_result(query)
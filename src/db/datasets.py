@@ -0,0 +1,71 @@
+"""Read-only handles on warehouse results, shared by all sessions.
+
+``run_query`` is memoized by ``st.cache_data``, which pickles the result and
+hands every call a freshly unpickled copy, so a page allocates the whole
+frame again on every rerun, then often ``.copy()``s it once more before
+deriving columns. ``load_dataset`` keeps one frame per query in
+``st.cache_resource`` instead and returns a ``Dataset`` handle on it.
+``Dataset.view()`` is a Copy-on-Write view: nothing is copied until the page
+writes to it, and a write (``df['week'] = ...``, ``df.loc[...] = ...``) copies
+only what it touches into the page's own frame, never into the shared one.
+Pages therefore derive columns on their view freely and need no defensive
+copies.
+
+Copy-on-Write is always on from pandas 3. On pandas 2 it is a process-wide
+option, so the entry point switches it on once (``enable_copy_on_write``)
+rather than this module on import.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+import pandas as pd
+import streamlit as st
+
+from src.db import bigquery_connection, redshift_connection
+from src.db.query_cache import query_fingerprint
+
+SOURCES: tuple[str, ...] = ("redshift", "bigquery")
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """A cached query result; read it through ``view``, never write to ``frame``.
+
+    ``version`` changes whenever the result is fetched again, so stages derived
+    from the dataset can be cached on it.
+    """
+
+    frame: pd.DataFrame
+    version: str
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def view(self, columns: Iterable[str] | None = None) -> pd.DataFrame:
+        """Copy-on-Write view of the result, or of ``columns`` only; free until written to."""
+        if columns is None:
+            return self.frame.copy(deep=False)
+        return self.frame[list(columns)]
+
+
+def enable_copy_on_write() -> None:
+    """Switch pandas 2 to Copy-on-Write, which ``Dataset.view`` relies on; a no-op from pandas 3."""
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+@st.cache_resource(ttl="1h", show_spinner=False)
+def load_dataset(query: str, source: str = "redshift") -> Dataset:
+    """Fetch (or reuse) the result of ``query`` on ``source`` as a handle shared by all sessions."""
+    if source not in SOURCES:
+        raise ValueError(f"Unknown source {source!r}; expected one of {SOURCES}")
+    fetch = bigquery_connection.fetch_result if source == "bigquery" else redshift_connection.fetch_result
+    frame = fetch(query)
+    return Dataset(frame, version=f"{query_fingerprint(source, query)[:12]}@{time.time():.3f}")
@@ -0,0 +1,144 @@
+"""Compact dtypes for warehouse results, applied once when a result is fetched.
+
+Redshift returns ``NUMERIC`` (``ROUND(...)``, ``DECIMAL(10,2)`` casts) as
+``Decimal`` objects, ``DATE`` as ``datetime.date`` objects and ``TO_CHAR``
+weeks and months as strings, all in object columns; BigQuery returns
+``NUMERIC`` as ``Decimal`` too. Pages then convert them on every rerun.
+``normalize_frame`` fixes the dtypes at cache-fill time instead:
+
+* ``NUMERIC`` / ``Decimal`` -> float64 (for Redshift already at fetch, via
+  the psycopg2 typecaster registered by ``register_typecasters``)
+* ``DATE`` values and date-named text columns (``week``, ``*_date``, ...) -> datetime64
+* integers -> the smallest integer type that holds them, but no narrower
+  than int32 so page arithmetic (sums of count columns, differences) cannot
+  overflow
+* low-cardinality text -> category
+
+Conversions are idempotent for the pages (``pd.to_datetime`` and ``float``
+accept the new dtypes), and the memory each dataset saved is recorded for
+the About page.
+"""
+from __future__ import annotations
+
+import datetime
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import psycopg2.extensions
+
+
+# Text columns that hold dates (TO_CHAR weeks and months, GA's YYYYMMDD event_date), besides
+# any *_date / *_at column; DATE values are detected by type
+DATE_COLUMNS: frozenset[str] = frozenset({
+    'week', 'month', 'week_start', 'month_start', 'trial_week', 'reporting_week',
+})
+DATE_SUFFIXES: tuple[str, ...] = ('_date', '_at')
+# Text becomes categorical when it has at most this many distinct values per row
+CATEGORY_MAX_RATIO: float = 0.5
+MIN_INT_DTYPE: str = 'int32'
+
+
+def _numeric_to_float(value: str | None, cursor) -> float | None:
+    return float(value) if value is not None else None
+
+
+NUMERIC_AS_FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values, 'NUMERIC_AS_FLOAT', _numeric_to_float
+)
+
+
+def register_typecasters(conn) -> None:
+    """Have ``conn`` return ``NUMERIC`` as float instead of ``Decimal``."""
+    psycopg2.extensions.register_type(NUMERIC_AS_FLOAT, conn)
+
+
+@dataclass(frozen=True)
+class NormalizeReport:
+    """What ``normalize_frame`` did to one result."""
+
+    rows: int
+    bytes_before: int
+    bytes_after: int
+    converted: dict[str, str]
+    normalized_at: float
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+
+_reports: dict[str, NormalizeReport] = {}
+_reports_lock = threading.Lock()
+
+
+def _first_value(col: pd.Series):
+    valid = col.first_valid_index()
+    return col.loc[valid] if valid is not None else None
+
+
+def _normalized_column(name: str, col: pd.Series, categories: bool) -> pd.Series | None:
+    """``col`` with a compact dtype, or None when it is already compact."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return None
+    if pd.api.types.is_integer_dtype(col) and not pd.api.types.is_extension_array_dtype(col):
+        narrow = pd.to_numeric(col, downcast='integer')
+        if narrow.dtype.itemsize < np.dtype(MIN_INT_DTYPE).itemsize:
+            narrow = narrow.astype(MIN_INT_DTYPE)
+        return narrow if narrow.dtype != col.dtype else None
+    if not (col.dtype == object or pd.api.types.is_string_dtype(col)):
+        return None
+
+    first = _first_value(col)
+    if isinstance(first, Decimal):
+        return col.astype('float64')
+    if isinstance(first, datetime.date) and not isinstance(first, datetime.datetime):
+        return pd.to_datetime(col)
+    if isinstance(first, str):
+        if name in DATE_COLUMNS or name.endswith(DATE_SUFFIXES):
+            try:
+                return pd.to_datetime(col)
+            except (ValueError, TypeError):
+                # Not dates after all; text that sorts and compares as dates must not become categorical
+                return None
+        if categories and col.nunique() <= CATEGORY_MAX_RATIO * len(col):
+            return col.astype('category')
+    return None
+
+
+def normalize_frame(df: pd.DataFrame, key: str | None = None, categories: bool = True) -> pd.DataFrame:
+    """``df`` with compact dtypes; records the memory saved under ``key`` when given.
+
+    ``categories=False`` keeps low-cardinality text as text, for datasets
+    served with the pyarrow dtype backend.
+    """
+    if df.empty:
+        return df
+    bytes_before = int(df.memory_usage(deep=True).sum())
+    out = df.copy()
+    converted = {}
+    for name in out.columns:
+        col = _normalized_column(str(name), out[name], categories)
+        if col is not None:
+            out[name] = col
+            converted[str(name)] = f'{df[name].dtype} -> {col.dtype}'
+    if key is not None:
+        report = NormalizeReport(
+            rows=len(out),
+            bytes_before=bytes_before,
+            bytes_after=int(out.memory_usage(deep=True).sum()),
+            converted=converted,
+            normalized_at=time.time(),
+        )
+        with _reports_lock:
+            _reports[key] = report
+    return out
+
+
+def normalize_reports() -> dict[str, NormalizeReport]:
+    """Reports of the results normalized by this process, by cache key."""
+    with _reports_lock:
+        return dict(_reports)
@@ -0,0 +1,425 @@
+"""Shared result cache for warehouse queries.
+
+``run_query`` in the Redshift and BigQuery modules is memoized per process by
+``st.cache_data``. This module adds a tier beneath it: results are serialized
+as Arrow IPC payloads and stored in a pluggable backend keyed by a fingerprint
+of the warehouse and query text, so replicas running on different nodes share
+one warm cache instead of each querying the warehouse.
+
+Every result this process fetches (or revalidates with a probe) is also
+written to a snapshot directory on local disk; cache hits leave it alone. At
+boot ``restore_snapshots`` loads the recent ones back so the first request
+after a deploy is served from the last snapshot instead of the warehouse.
+
+Expensive datasets can declare a freshness probe: a cheap query over their
+source tables (row counts, max(updated_at), ...). When such an entry's TTL
+runs out the probe is run first, and if its value matches the one recorded
+with the entry the TTL is extended instead of re-running the heavy query.
+Probed entries are therefore retained for ``probe_retention`` seconds, well
+past their TTL.
+
+Configure it in ``secrets.toml`` (omit ``backend`` to disable the shared tier)::
+
+    [query_cache]
+    backend = "redis"             # or "memory"
+    url = "redis://cache:6379/0"
+    ttl = 3600
+    snapshot_dir = ".cache/query_snapshots"
+    snapshot_max_age = 86400
+    probe_retention = 604800
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, ContextManager, Iterator, Protocol
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from src.db.normalize import normalize_frame
+
+try:
+    import redis
+except ImportError:  # only required when the redis backend is configured
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX: str = "marketing_dashboard:query:"
+DEFAULT_TTL_SECONDS: int = 3600
+LOCK_TIMEOUT_SECONDS: int = 900
+DEFAULT_SNAPSHOT_DIR: str = ".cache/query_snapshots"
+DEFAULT_SNAPSHOT_MAX_AGE_SECONDS: int = 24 * 3600
+DEFAULT_PROBE_RETENTION_SECONDS: int = 7 * 24 * 3600
+DTYPE_BACKENDS: tuple[str, ...] = ("numpy", "pyarrow")
+
+_HEADER = struct.Struct(">I")
+
+
+def query_fingerprint(source: str, query: str) -> str:
+    """Stable key for a query: whitespace-insensitive hash of source + SQL."""
+    normalized = " ".join(query.split())
+    return hashlib.sha256(f"{source}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+def serialize_frame(df: pd.DataFrame) -> bytes:
+    """Encode a frame as an Arrow IPC stream."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _arrow_dtype(arrow_type: pa.DataType) -> pd.ArrowDtype | None:
+    # Dictionary columns (categoricals) keep pandas' Categorical
+    return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+
+def table_to_frame(table: pa.Table, dtype_backend: str = "numpy") -> pd.DataFrame:
+    """Convert an Arrow table to pandas with NumPy dtypes or, for ``"pyarrow"``, ``pd.ArrowDtype`` columns."""
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(f"Unknown dtype_backend {dtype_backend!r}; expected one of {DTYPE_BACKENDS}")
+    if dtype_backend == "pyarrow":
+        return table.to_pandas(types_mapper=_arrow_dtype)
+    return table.to_pandas()
+
+
+def deserialize_frame(payload: bytes, dtype_backend: str = "numpy") -> pd.DataFrame:
+    """Decode a frame written by ``serialize_frame``."""
+    return table_to_frame(pa.ipc.open_stream(payload).read_all(), dtype_backend)
+
+
+@dataclass
+class CacheEntry:
+    """A cached query result plus the metadata needed to judge its age."""
+
+    payload: bytes
+    fetched_at: float
+    expires_at: float
+    probe: str | None = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, ttl: int, probe: str | None = None) -> "CacheEntry":
+        now = time.time()
+        return cls(payload=serialize_frame(df), fetched_at=now, expires_at=now + ttl, probe=probe)
+
+    def frame(self, dtype_backend: str = "numpy") -> pd.DataFrame:
+        return deserialize_frame(self.payload, dtype_backend)
+
+    def encode(self) -> bytes:
+        header = json.dumps(
+            {"fetched_at": self.fetched_at, "expires_at": self.expires_at, "probe": self.probe}
+        ).encode("utf-8")
+        return _HEADER.pack(len(header)) + header + self.payload
+
+    @classmethod
+    def decode(cls, blob: bytes) -> "CacheEntry":
+        (header_len,) = _HEADER.unpack_from(blob)
+        start = _HEADER.size
+        header = json.loads(blob[start:start + header_len])
+        return cls(
+            payload=blob[start + header_len:],
+            fetched_at=header["fetched_at"],
+            expires_at=header["expires_at"],
+            probe=header.get("probe"),
+        )
+
+
+class CacheBackend(Protocol):
+    """Minimal key/value interface a shared cache backend has to provide."""
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes, ttl: int) -> None: ...
+
+    def lock(self, key: str, timeout: int) -> ContextManager[bool]:
+        """Hold an exclusive lock on ``key``; yields whether it was acquired."""
+        ...
+
+
+class MemoryBackend:
+    """Process-local backend.
+
+    Behaves like the Redis backend (TTLs, per-key locks) so it doubles as a
+    stand-in when exercising the cache without a Redis server.
+    """
+
+    def __init__(self) -> None:
+        self._values: dict[str, tuple[bytes, float]] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        item = self._values.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at <= time.time():
+            self._values.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._values[key] = (value, time.time() + ttl)
+
+    @contextmanager
+    def lock(self, key: str, timeout: int) -> Iterator[bool]:
+        with self._guard:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        acquired = key_lock.acquire(timeout=timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                key_lock.release()
+
+
+class RedisBackend:
+    """Backend for any server speaking the Redis protocol.
+
+    The lock is Redis' SET NX + token based lock, so only one replica runs a
+    given query while the others wait for its result.
+    """
+
+    def __init__(self, url: str) -> None:
+        if redis is None:
+            raise RuntimeError("The redis package is required for the redis query cache backend")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> bytes | None:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._client.set(key, value, ex=ttl)
+
+    @contextmanager
+    def lock(self, key: str, timeout: int) -> Iterator[bool]:
+        # The lock expires on its own so a replica dying mid-query can't wedge the key
+        key_lock = self._client.lock(f"{key}:lock", timeout=timeout, blocking_timeout=timeout)
+        try:
+            acquired = key_lock.acquire()
+        except redis.RedisError:
+            acquired = False
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    key_lock.release()
+                except redis.RedisError:
+                    # Lock already expired or the server went away; nothing to undo
+                    pass
+
+
+def _cache_settings() -> dict:
+    try:
+        return dict(st.secrets.get("query_cache", {}))
+    except Exception:
+        # No secrets file in this environment
+        return {}
+
+
+@st.cache_resource
+def get_cache_backend() -> CacheBackend | None:
+    """Build the configured shared backend, or None when caching is disabled."""
+    settings = _cache_settings()
+    backend = settings.get("backend")
+    if backend == "redis":
+        return RedisBackend(settings["url"])
+    if backend == "memory":
+        return MemoryBackend()
+    return None
+
+
+def cache_ttl() -> int:
+    return int(_cache_settings().get("ttl", DEFAULT_TTL_SECONDS))
+
+
+def _retention(ttl: int, probe: str | None) -> int:
+    # Probed entries outlive their TTL so the probe has something to revalidate
+    if probe is None:
+        return ttl
+    return max(ttl, int(_cache_settings().get("probe_retention", DEFAULT_PROBE_RETENTION_SECONDS)))
+
+
+def snapshot_dir() -> Path | None:
+    """Directory holding result snapshots, or None when snapshots are disabled."""
+    path = _cache_settings().get("snapshot_dir", DEFAULT_SNAPSHOT_DIR)
+    return Path(path) if path else None
+
+
+# Entries restored from disk at boot, consumed by the first fetch of each query
+_restored: dict[str, CacheEntry] = {}
+_restored_guard = threading.Lock()
+
+
+def _write_snapshot(key: str, entry: CacheEntry) -> None:
+    directory = snapshot_dir()
+    if directory is None:
+        return
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / f"{key}.entry"
+        tmp = target.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_bytes(entry.encode())
+        # Atomic swap so a concurrent restore never reads a half-written file
+        os.replace(tmp, target)
+    except OSError:
+        logger.warning("Could not write snapshot %s", key[:12], exc_info=True)
+
+
+def restore_snapshots(max_age: int | None = None) -> int:
+    """Load snapshots younger than ``max_age`` seconds; returns how many were restored."""
+    directory = snapshot_dir()
+    if directory is None or not directory.is_dir():
+        return 0
+    if max_age is None:
+        max_age = int(_cache_settings().get("snapshot_max_age", DEFAULT_SNAPSHOT_MAX_AGE_SECONDS))
+    cutoff = time.time() - max_age
+    restored = 0
+    for path in directory.glob("*.entry"):
+        try:
+            entry = CacheEntry.decode(path.read_bytes())
+        except (OSError, ValueError, KeyError, struct.error):
+            continue
+        if entry.fetched_at < cutoff:
+            continue
+        with _restored_guard:
+            _restored[path.stem] = entry
+        restored += 1
+    return restored
+
+
+def _take_restored(key: str) -> CacheEntry | None:
+    with _restored_guard:
+        return _restored.pop(key, None)
+
+
+def _read_snapshot(key: str) -> CacheEntry | None:
+    directory = snapshot_dir()
+    if directory is None:
+        return None
+    try:
+        return CacheEntry.decode((directory / f"{key}.entry").read_bytes())
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+
+def probe_value(probe: str, loader: Callable[[str], pd.DataFrame]) -> str:
+    """Run a freshness probe and reduce its result to a comparable token."""
+    df = loader(probe)
+    return hashlib.sha256(
+        df.to_json(orient="records", date_format="iso", default_handler=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _safe_probe_value(probe: str | None, loader: Callable[[str], pd.DataFrame]) -> str | None:
+    if probe is None:
+        return None
+    try:
+        return probe_value(probe, loader)
+    except Exception:
+        # Without a probe value the entry simply expires with its TTL
+        return None
+
+
+def _read_entry(backend: CacheBackend, key: str) -> CacheEntry | None:
+    try:
+        blob = backend.get(key)
+    except Exception:
+        # A cache outage must never take a dashboard down; fall through to the warehouse
+        return None
+    return CacheEntry.decode(blob) if blob else None
+
+
+def _write_entry(backend: CacheBackend, key: str, entry: CacheEntry, ttl: int) -> None:
+    try:
+        backend.set(key, entry.encode(), ttl)
+    except Exception:
+        # The fetched result is still served; only the shared copy is missing
+        logger.warning("Could not write %s to the cache backend", key, exc_info=True)
+
+
+def _store(backend: CacheBackend | None, key: str, fingerprint: str, entry: CacheEntry, ttl: int) -> None:
+    if backend is not None:
+        _write_entry(backend, key, entry, _retention(ttl, entry.probe))
+    _write_snapshot(fingerprint, entry)
+
+
+def fetch_query(
+    source: str,
+    query: str,
+    loader: Callable[[str], pd.DataFrame],
+    probe: str | None = None,
+    dtype_backend: str = "numpy",
+) -> pd.DataFrame:
+    """Return the result of ``query``, going to the warehouse only on a cache miss.
+
+    ``loader`` runs the query against the warehouse named by ``source``. The
+    shared backend is tried first, then a snapshot restored at boot. An
+    expired entry is kept if ``probe`` (a cheap freshness query) still returns
+    the value recorded with it. Misses are single-flight across hosts: the
+    first replica to miss takes the key's lock and runs the query, the others
+    wait and read its result.
+
+    With ``dtype_backend="pyarrow"`` the frame is returned with
+    ``pd.ArrowDtype`` columns (``string[pyarrow]``, ``timestamp[..][pyarrow]``)
+    converted straight from the cached Arrow data; text is then left as
+    Arrow strings rather than made categorical.
+    """
+    fingerprint = query_fingerprint(source, query)
+    backend = get_cache_backend()
+    key = KEY_PREFIX + fingerprint
+    ttl = cache_ttl()
+
+    entry = _read_entry(backend, key) if backend is not None else None
+    if entry is None:
+        restored = _take_restored(fingerprint)
+        if restored is not None:
+            # Warm start: serve the boot snapshot as is, the next miss refreshes it
+            return restored.frame(dtype_backend)
+        if backend is None and probe is not None:
+            entry = _read_snapshot(fingerprint)
+
+    if entry is not None:
+        if entry.expires_at > time.time():
+            return entry.frame(dtype_backend)
+        if entry.probe is not None and _safe_probe_value(probe, loader) == entry.probe:
+            # Sources unchanged since the entry was built; keep it for another TTL
+            entry.expires_at = time.time() + ttl
+            _store(backend, key, fingerprint, entry, ttl)
+            return entry.frame(dtype_backend)
+
+    lock = backend.lock(key, LOCK_TIMEOUT_SECONDS) if backend is not None else nullcontext()
+    with lock:
+        if backend is not None:
+            # Another replica may have refreshed the key while we waited for the lock
+            entry = _read_entry(backend, key)
+            if entry is not None and entry.expires_at > time.time():
+                return entry.frame(dtype_backend)
+        # Probe before the heavy query so changes landing mid-query trigger a rerun later
+        token = _safe_probe_value(probe, loader)
+        df = normalize_frame(
+            loader(query), key=f"{source}:{fingerprint[:12]}", categories=dtype_backend != "pyarrow"
+        )
+        try:
+            entry = CacheEntry.from_frame(df, ttl, probe=token)
+        except Exception:
+            # A result Arrow can't encode is served uncached rather than failing the page
+            logger.warning("Could not serialize %s:%s; serving it uncached", source, fingerprint[:12], exc_info=True)
+            return df
+        _store(backend, key, fingerprint, entry, ttl)
+        if dtype_backend == "pyarrow":
+            return entry.frame(dtype_backend)
+        return df
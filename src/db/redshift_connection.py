@@ -1,9 +1,16 @@
 import sys
+import threading
 from pathlib import Path
 import streamlit as st
 import psycopg2
+from psycopg2 import pool
 import pandas as pd
 
+from src.db.normalize import register_typecasters
+from src.db.query_cache import fetch_query
+from src.sql.dtype_backends import dtype_backend
+from src.sql.freshness import FRESHNESS_PROBES
+
 # Cache connection parameters instead of connection object
 @st.cache_resource
 def get_redshift_params():
@@ -20,9 +27,67 @@ def get_redshift_connection():
     params = get_redshift_params()
     return psycopg2.connect(**params)
 
+# Longest a query waits for a free pooled connection before giving up
+POOL_WAIT_SECONDS = 600
+
+# ThreadedConnectionPool raises PoolError as soon as all maxconn connections
+# are out; this one makes the extra callers queue for a free connection instead
+class BlockingConnectionPool(pool.ThreadedConnectionPool):
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        self._slots = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=POOL_WAIT_SECONDS):
+            raise pool.PoolError(f"no Redshift connection free after {POOL_WAIT_SECONDS}s")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+# Shared pool so queries reuse warm connections; created eagerly at boot
+@st.cache_resource
+def get_redshift_pool(maxconn=4):
+    return BlockingConnectionPool(1, maxconn, **get_redshift_params())
+
+def _run_redshift_query(query):
+    redshift_pool = get_redshift_pool()
+    conn = redshift_pool.getconn()
+    register_typecasters(conn)
+    broken = False
+    try:
+        with conn:
+            return pd.read_sql_query(query, conn)
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        # Drop dead connections instead of handing them to the next query
+        redshift_pool.putconn(conn, close=broken or bool(conn.closed))
+
+# For callers that keep their own state (e.g. incremental stores) and must not
+# fill the result caches with one-off queries
+def run_query_uncached(query):
+    return _run_redshift_query(query)
+
+# Result through the shared query cache, without st.cache_data's per-call copy;
+# expired datasets with a freshness probe are only re-run when the probe says
+# their sources changed
+def fetch_result(query):
+    return fetch_query(
+        "redshift", query, _run_redshift_query,
+        probe=FRESHNESS_PROBES.get(query), dtype_backend=dtype_backend(query),
+    )
+
 # cache data from running query
-@st.cache_data
+@st.cache_data(ttl="1h")
 def run_query(query):
-    with get_redshift_connection() as conn:
-        return pd.read_sql_query(query, conn)
+    return fetch_result(query)
         
\ No newline at end of file
@@ -0,0 +1,2 @@
+"""Local compute engines that derive metrics from compact warehouse extracts."""
+
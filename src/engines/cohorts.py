@@ -0,0 +1,175 @@
+"""Cohort retention engine.
+
+Builds the install-cohort x age retention matrix (and the awesome-plan
+variant, cohorted by upgrade) in one vectorized pass over the lifecycle
+extract: every extension row is reduced to its cohort and the number of
+whole periods it survived, one ``np.bincount`` counts (cohort, survived)
+pairs, and a reverse cumulative sum along the age axis turns those into
+"still active at age k" counts.
+
+The counts don't depend on today's date, only on the extract. They are kept
+per extract in ``CohortStore``; as new weeks close only the censoring mask
+moves, so the matrix is recomputed only when the extract is refreshed.
+
+Ages are whole calendar periods since the row's own install (or upgrade)
+timestamp. A cell is shown only once every member of the cohort can have
+reached that age.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.engines.lifecycle import NULL_TS, LifecycleExtract, load_lifecycle_extract
+
+
+FREQS: tuple[str, ...] = ('week', 'month')
+PLANS: tuple[str, ...] = ('installs', 'awesome')
+MAX_AGE: dict[str, int] = {'week': 52, 'month': 24}
+
+# 1970-01-01 was a Thursday; shifting by 3 days puts week boundaries on Mondays
+_EPOCH_WEEKDAY_OFFSET = 3
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def _period_index(ts_i8: np.ndarray, freq: str) -> np.ndarray:
+    if freq == 'week':
+        return np.floor_divide(np.floor_divide(ts_i8, _NS_PER_DAY) + _EPOCH_WEEKDAY_OFFSET, 7)
+    return ts_i8.view('datetime64[ns]').astype('datetime64[M]').astype('int64')
+
+
+def _period_starts(idx: np.ndarray, freq: str) -> pd.DatetimeIndex:
+    if freq == 'week':
+        starts = (idx * 7 - _EPOCH_WEEKDAY_OFFSET).astype('datetime64[D]')
+    else:
+        starts = idx.astype('datetime64[M]')
+    return pd.DatetimeIndex(starts.astype('datetime64[ns]'))
+
+
+def _periods_survived(start: np.ndarray, end: np.ndarray, freq: str) -> np.ndarray:
+    """Whole weeks (7 days) or calendar months from ``start`` to ``end``."""
+    if freq == 'week':
+        return np.floor_divide(end - start, 7 * _NS_PER_DAY)
+    start_ts, end_ts = start.view('datetime64[ns]'), end.view('datetime64[ns]')
+    start_m, end_m = start_ts.astype('datetime64[M]'), end_ts.astype('datetime64[M]')
+    # One month less when the end falls earlier in its month than the start did
+    short = (end_ts - end_m) < (start_ts - start_m)
+    return (end_m - start_m).astype('int64') - short
+
+
+def _spans(ex: LifecycleExtract, plan: str, shopify_only: bool) -> tuple[np.ndarray, np.ndarray]:
+    """Start and end (NULL_TS when still open) of each row's install or awesome span."""
+    mask = ex.is_shopify if shopify_only else np.ones(len(ex), dtype=bool)
+    created, deleted = ex.created_at[mask], ex.deleted_at[mask]
+    if plan == 'installs':
+        start, end = created, deleted
+    elif plan == 'awesome':
+        upgraded, downgraded = ex.upgraded_at[mask], ex.downgraded_at[mask]
+        start = upgraded
+        # A downgrade before the (latest) upgrade doesn't end the current paid span
+        lost = np.where(downgraded >= upgraded, downgraded, NULL_TS)
+        end = np.where(lost == NULL_TS, deleted, np.where(deleted == NULL_TS, lost, np.minimum(lost, deleted)))
+    else:
+        raise ValueError(f'Unknown plan {plan!r}; expected one of {PLANS}')
+    keep = (start != NULL_TS) & (created != NULL_TS)
+    return start[keep], end[keep]
+
+
+@dataclass(frozen=True)
+class CohortCounts:
+    """Rows per cohort still active at each age; ``active[:, -1]`` is "max age or more"."""
+
+    first_cohort: int
+    active: np.ndarray
+    freq: str
+
+    @classmethod
+    def build(cls, ex: LifecycleExtract, freq: str = 'week', plan: str = 'installs', shopify_only: bool = True) -> 'CohortCounts':
+        if freq not in FREQS:
+            raise ValueError(f'Unknown freq {freq!r}; expected one of {FREQS}')
+        start, end = _spans(ex, plan, shopify_only)
+        max_age = MAX_AGE[freq]
+        if len(start) == 0:
+            return cls(0, np.zeros((0, max_age + 1), dtype='int64'), freq)
+
+        cohort = _period_index(start, freq)
+        first = int(cohort.min())
+        cohort -= first
+        open_span = end == NULL_TS
+        survived = np.where(open_span, max_age, _periods_survived(start, np.where(open_span, start, end), freq))
+        survived = np.clip(survived, 0, max_age)
+
+        # Rows by (cohort, periods survived), then "survived at least k" per cohort
+        width = max_age + 1
+        counts = np.bincount(cohort * width + survived, minlength=(int(cohort.max()) + 1) * width)
+        counts = counts.reshape(-1, width)
+        active = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+        active.setflags(write=False)
+        return cls(first, active, freq)
+
+    def matrix(self, today=None, cohorts: int | None = None) -> pd.DataFrame:
+        """Retention % per cohort (rows, oldest first) and age (columns); NaN where not yet observable."""
+        today = pd.Timestamp(today) if today is not None else pd.Timestamp.now(tz='UTC').tz_localize(None)
+        current = int(_period_index(np.array([today.normalize().value]), self.freq)[0])
+        closed = max(0, min(len(self.active), current - self.first_cohort))
+        active = self.active[:closed]
+        if cohorts is not None:
+            active = active[-cohorts:] if cohorts else active[:0]
+        idx = np.arange(closed - len(active), closed) + self.first_cohort
+
+        # Age k of cohort c is complete once period c + 1 + k has started
+        ages = np.arange(active.shape[1])
+        observable = idx[:, None] + 1 + ages[None, :] <= current
+        size = active[:, 0].astype('float64')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            retention = np.round(100.0 * active / size[:, None], 2)
+        retention = np.where(observable & (size[:, None] > 0), retention, np.nan)
+
+        out = pd.DataFrame(retention, index=_period_starts(idx, self.freq), columns=ages)
+        out.index.name = 'cohort_start'
+        out.columns.name = 'age'
+        out.insert(0, 'cohort_size', active[:, 0])
+        return out
+
+
+def retention_curve(matrix: pd.DataFrame) -> pd.Series:
+    """Cohort-size weighted retention % per age over the cohorts observable at that age."""
+    ages = matrix.drop(columns='cohort_size')
+    size = matrix['cohort_size'].astype('float64')
+    weights = ages.notna().mul(size, axis=0)
+    curve = (ages.fillna(0).mul(size, axis=0).sum() / weights.sum().where(weights.sum() > 0)).round(2)
+    curve.index.name = 'age'
+    return curve.rename('retention_pct')
+
+
+class CohortStore:
+    """``CohortCounts`` per (freq, plan), rebuilt only when the lifecycle extract changes."""
+
+    def __init__(self) -> None:
+        self._counts: dict[tuple[str, str], CohortCounts] = {}
+        self._source: LifecycleExtract | None = None
+        self._lock = threading.Lock()
+
+    def counts(self, ex: LifecycleExtract, freq: str = 'week', plan: str = 'installs') -> CohortCounts:
+        with self._lock:
+            if self._source is not ex:
+                self._counts, self._source = {}, ex
+            key = (freq, plan)
+            if key not in self._counts:
+                self._counts[key] = CohortCounts.build(ex, freq, plan)
+            return self._counts[key]
+
+
+@st.cache_resource(show_spinner=False)
+def get_cohort_store() -> CohortStore:
+    return CohortStore()
+
+
+def cohort_retention(freq: str = 'week', plan: str = 'installs', cohorts: int | None = None, today=None) -> pd.DataFrame:
+    """Retention matrix of the shared lifecycle extract."""
+    counts = get_cohort_store().counts(load_lifecycle_extract(), freq, plan)
+    return counts.matrix(today, cohorts)
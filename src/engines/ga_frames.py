@@ -0,0 +1,288 @@
+"""Prepared Google Analytics frames.
+
+``ga_installs`` and ``ga_view_app`` come back as one row per (day, dimension
+combination) with about a dozen high-repetition string dimensions. This
+module prepares them once per fetch instead of on every rerun, keyed by the
+version of the raw datasets (``Dataset.version``):
+
+* ``event_date`` is parsed and the Monday ``week`` added
+* every dimension becomes a pandas Categorical whose categories are shared by
+  installs and views, so both frames compare, merge and group on the same
+  integer codes
+* each frame is sorted by date and keeps its dates and integer week / month
+  ordinals as arrays, so a date or week window (``GaFrame.window``,
+  ``GaFrame.weeks``, ``date_window`` for row subsets) is two binary searches
+  and a positional slice instead of a full boolean mask
+* per-dimension views sorted on a (dimension, event_date) MultiIndex are
+  built on first use, so slicing one dimension value (and optionally a date
+  range) is a binary search as well
+
+The prepared frames are shared between sessions and must not be mutated;
+pages read them through ``GaFrame.view``, ``GaFrame.window`` and
+``GaFrame.rows``, whose results are their own (Copy-on-Write) frames.
+"""
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.db.datasets import load_dataset
+from src.sql.google_analytics.google_analytics import ga_installs, ga_view_app
+from src.utils.formatting import format_values
+
+
+DIMENSIONS: tuple[str, ...] = (
+    'st_source_parsed',
+    'surface_type_parsed',
+    'surface_detail_parsed',
+    'st_campaign_parsed',
+    'utm_campaign_parsed',
+    'utm_medium_parsed',
+    'utm_source_parsed',
+    'medium_aggregated',
+    'source_aggregated',
+    'campaign_aggregated',
+    'campaign_details_aggregated',
+    'locale_parsed',
+    'locale_aggregated',
+)
+
+
+def shared_categories(*frames: pd.DataFrame) -> dict[str, pd.CategoricalDtype]:
+    """One categorical dtype per dimension covering its values in every frame."""
+    dtypes = {}
+    for dimension in DIMENSIONS:
+        values = [set(frame[dimension].dropna().unique()) for frame in frames if dimension in frame.columns]
+        if values:
+            dtypes[dimension] = pd.CategoricalDtype(sorted(set().union(*values)))
+    return dtypes
+
+
+def _categorical(values: pd.Series, dtype: pd.CategoricalDtype) -> pd.Categorical:
+    """``values.astype(dtype)``, matching each distinct value once instead of every row."""
+    codes, uniques = pd.factorize(values)
+    lookup = np.append(dtype.categories.get_indexer(uniques), -1)
+    return pd.Categorical.from_codes(lookup[codes], dtype=dtype)
+
+
+def prepare(df: pd.DataFrame, dtypes: dict[str, pd.CategoricalDtype]) -> pd.DataFrame:
+    """Parse dates, add ``week``, apply the shared categoricals and sort by date."""
+    # Copy-on-Write view; the columns rewritten below are the only ones copied
+    out = df.copy(deep=False)
+    if not out.empty:
+        out['event_date'] = pd.to_datetime(out['event_date'], format='%Y%m%d')
+        out['week'] = out['event_date'].dt.to_period('W').dt.start_time
+        out['events_count'] = out['events_count'].astype('int64')
+    for dimension, dtype in dtypes.items():
+        if dimension in out.columns:
+            out[dimension] = _categorical(out[dimension], dtype)
+    return out.sort_values('event_date', kind='stable').reset_index(drop=True)
+
+
+# 1970-01-05, the first Monday of the epoch, is day 4
+_EPOCH_MONDAY_DAYS = 4
+
+
+def week_ordinal(dates) -> np.ndarray:
+    """Monday-based week number since the epoch of each date (a scalar for a scalar)."""
+    days = np.asarray(dates, dtype='datetime64[D]').astype('int64')
+    return (days - _EPOCH_MONDAY_DAYS) // 7
+
+
+def month_ordinal(dates) -> np.ndarray:
+    """Month number since the epoch of each date (a scalar for a scalar)."""
+    return np.asarray(dates, dtype='datetime64[M]').astype('int64')
+
+
+def _sorted_slice(values: np.ndarray, start=None, end=None) -> slice:
+    """Positions of ``values`` (sorted ascending) within [start, end]."""
+    lo = 0 if start is None else int(np.searchsorted(values, start, side='left'))
+    hi = len(values) if end is None else int(np.searchsorted(values, end, side='right'))
+    return slice(lo, max(lo, hi))
+
+
+def _datetime64(value):
+    return None if value is None else pd.Timestamp(value).to_datetime64()
+
+
+def date_window(frame: pd.DataFrame, start=None, end=None, column: str = 'event_date') -> pd.DataFrame:
+    """Rows of ``frame``, sorted on ``column``, with ``column`` within [start, end].
+
+    Two binary searches and a positional slice (a view) instead of a boolean
+    mask. ``GaFrame`` views and windows, ``rows`` of a single value and any row
+    subset of those are sorted on both ``event_date`` and ``week``.
+    """
+    if frame.empty:
+        return frame
+    values = frame[column].to_numpy()
+    return frame.iloc[_sorted_slice(values, _datetime64(start), _datetime64(end))]
+
+
+class GaFrame:
+    """A prepared, date-sorted GA frame, its date and week / month ordinal arrays and lazily built per-dimension views."""
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        self.frame = frame
+        if frame.empty:
+            self.dates = np.empty(0, dtype='datetime64[ns]')
+        else:
+            self.dates = frame['event_date'].to_numpy()
+        self.weeks_since_epoch = week_ordinal(self.dates)
+        self.months_since_epoch = month_ordinal(self.dates)
+        for values in (self.dates, self.weeks_since_epoch, self.months_since_epoch):
+            # Shared between sessions through st.cache_resource; keep it read-only
+            values.setflags(write=False)
+        self._indexed: dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+    @property
+    def latest(self) -> pd.Timestamp | None:
+        """The last event date, or None for an empty frame."""
+        return pd.Timestamp(self.dates[-1]) if len(self.dates) else None
+
+    def window(self, start=None, end=None) -> pd.DataFrame:
+        """Rows dated within [start, end] as a positional slice of the frame; writes stay local."""
+        return self.frame.iloc[_sorted_slice(self.dates, _datetime64(start), _datetime64(end))]
+
+    def weeks(self, first: int, last: int) -> pd.DataFrame:
+        """Rows whose week ordinal (see ``week_ordinal``) is within [first, last]."""
+        return self.frame.iloc[_sorted_slice(self.weeks_since_epoch, first, last)]
+
+    def months(self, first: int, last: int) -> pd.DataFrame:
+        """Rows whose month ordinal (see ``month_ordinal``) is within [first, last]."""
+        return self.frame.iloc[_sorted_slice(self.months_since_epoch, first, last)]
+
+    def view(self) -> pd.DataFrame:
+        """Copy-on-Write view of the prepared frame; writes to it stay local to the caller."""
+        return self.frame.copy(deep=False)
+
+    def indexed(self, dimension: str) -> pd.DataFrame:
+        """The frame sorted on a (dimension, event_date) MultiIndex; columns are kept."""
+        with self._lock:
+            if dimension not in self._indexed:
+                # Rows without a value are never sliced and would break the lexsort
+                present = self.frame[self.frame[dimension].notna()]
+                indexed = present.set_index([dimension, 'event_date'], drop=False).sort_index()
+                # Levels start as every shared category; keep only the values in this frame
+                indexed.index = indexed.index.remove_unused_levels()
+                self._indexed[dimension] = indexed
+            return self._indexed[dimension]
+
+    def rows(self, dimension: str, values, start=None, end=None) -> pd.DataFrame:
+        """Rows whose ``dimension`` is ``values`` (one or a list), dated within [start, end].
+
+        Rows come ordered by value, then date, so only a single value's rows
+        are date-sorted; take the latest date of several with ``max()``.
+        """
+        if self.frame.empty:
+            return self.view()
+        values = [values] if isinstance(values, str) else list(values)
+        indexed = self.indexed(dimension)
+        # Labels must be present in this frame, otherwise .loc raises
+        values = [v for v in values if v in indexed.index.levels[0]]
+        if not values:
+            return self.frame.iloc[:0]
+        dates = slice(
+            pd.Timestamp(start) if start is not None else None,
+            pd.Timestamp(end) if end is not None else None,
+        )
+        return indexed.loc[(values, dates), :].reset_index(drop=True)
+
+
+def events_by(frame: pd.DataFrame, dimension: str) -> pd.Series:
+    """Summed ``events_count`` per observed value of ``dimension`` (empty for an empty frame)."""
+    if frame.empty:
+        return pd.Series(dtype='int64')
+    return frame.groupby(dimension, observed=True)['events_count'].sum()
+
+
+def period_comparison(installs: pd.DataFrame, views: pd.DataFrame, dimension: str, current, previous) -> pd.DataFrame:
+    """Views, installs and conversion per value of ``dimension`` in the ``current`` vs ``previous`` window.
+
+    Windows are inclusive (start, end) date pairs and both frames must be
+    sorted on ``event_date``: each window is cut with ``date_window``, so only
+    its own rows are grouped, and the four sums are aligned on the dimension.
+    Rows are values seen in either window, most installs first; percent
+    changes are NaN when the previous value is 0, and the conversion change is
+    NaN unless both windows have views.
+    """
+    sums = {}
+    for name, frame in (('installs', installs), ('views', views)):
+        for (start, end), suffix in ((current, ''), (previous, '_prev')):
+            rows = date_window(frame, start, end)
+            if not rows.empty:
+                sums[f'{name}{suffix}'] = rows.groupby(dimension, observed=True, dropna=False)['events_count'].sum()
+
+    columns = ['views', 'views_prev', 'installs', 'installs_prev']
+    table = pd.DataFrame(sums).reindex(columns=columns).fillna(0).astype('int64')
+    table.index.name = dimension
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name in ('views', 'installs'):
+            table[f'{name}_delta'] = table[name] - table[f'{name}_prev']
+            table[f'{name}_pct'] = np.where(table[f'{name}_prev'] > 0, table[f'{name}_delta'] / table[f'{name}_prev'] * 100, np.nan)
+        table['conversion'] = np.where(table['views'] > 0, table['installs'] / table['views'] * 100, 0.0)
+        table['conversion_prev'] = np.where(table['views_prev'] > 0, table['installs_prev'] / table['views_prev'] * 100, 0.0)
+    both = (table['views'] > 0) & (table['views_prev'] > 0)
+    table['conversion_delta'] = (table['conversion'] - table['conversion_prev']).where(both)
+    return table.sort_values('installs', ascending=False, kind='stable').reset_index()
+
+
+def weekly_conversion(installs: pd.DataFrame, views: pd.DataFrame, dimension: str) -> pd.DataFrame:
+    """Weekly installs, views, conversion, WoW change and chart labels for every value of ``dimension``.
+
+    Both frames are grouped once by (dimension, week) and aligned on that
+    index, so a small-multiples grid is one frame with a block of weeks per
+    value rather than a filter, merge and row-wise apply per chart. Weeks
+    present in either frame are kept, with the missing side counted as 0.
+    """
+    sums = {}
+    for name, frame in (('installs_count', installs), ('views_count', views)):
+        if not frame.empty:
+            sums[name] = frame.groupby([dimension, 'week'], observed=True)['events_count'].sum()
+    if not sums:
+        return pd.DataFrame(columns=[dimension, 'week', 'installs_count', 'views_count', 'conversion_rate',
+                                     'prev_week_installs', 'wow_change', 'installs_label', 'conversion_label'])
+
+    grid = pd.DataFrame(sums).reindex(columns=['installs_count', 'views_count']).fillna(0).astype('int64').sort_index()
+    installs_count, views_count = grid['installs_count'], grid['views_count']
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        grid['conversion_rate'] = np.where(views_count > 0, installs_count / views_count * 100, 0.0).round(2)
+        grid['prev_week_installs'] = installs_count.groupby(level=dimension, observed=True).shift(1)
+        grid['wow_change'] = ((installs_count - grid['prev_week_installs']) / grid['prev_week_installs'] * 100).round(1)
+    grid['installs_label'] = installs_count.map('{:,}'.format)
+    grid['conversion_label'] = format_values(grid['conversion_rate'].where(grid['conversion_rate'] > 0), 'percent', missing='')
+    return grid.reset_index()
+
+
+class GaFrames:
+    """Prepared installs and views with shared dimension categories."""
+
+    def __init__(self, installs: pd.DataFrame, views: pd.DataFrame, version: str = '') -> None:
+        # Versions of the raw datasets; results derived from the frames can be cached on it
+        self.version = version
+        self.dtypes = shared_categories(installs, views)
+        self.installs = GaFrame(prepare(installs, self.dtypes))
+        self.views = GaFrame(prepare(views, self.dtypes))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _prepared_ga_frames(
+    installs_version: str, views_version: str, _installs: pd.DataFrame, _views: pd.DataFrame
+) -> GaFrames:
+    return GaFrames(_installs, _views, version=f'{installs_version}+{views_version}')
+
+
+def load_ga_frames() -> GaFrames:
+    """Prepared GA frames shared by all sessions, rebuilt only when a raw GA dataset is re-fetched."""
+    installs = load_dataset(ga_installs, 'bigquery')
+    views = load_dataset(ga_view_app, 'bigquery')
+    return _prepared_ga_frames(installs.version, views.version, installs.view(), views.view())
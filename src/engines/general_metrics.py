@@ -0,0 +1,114 @@
+"""Week x key table of ``pg.general_metrics`` with growth derived column-wise.
+
+``general_metrics`` comes back long, one ``(week, key, value)`` row per
+metric per week. ``GeneralMetrics`` pivots it once into a float64 week x key
+frame and derives, for every key at once, the previous value, week-over-week
+net growth and growth rate, the latest-vs-previous KPI values and summary
+statistics as column-wise operations, instead of filtering the long frame
+once per key and chart.
+
+A key's previous value is its last value in an earlier week, so a week
+missing for one key does not break that key's growth series.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.db.datasets import load_dataset
+from src.engines.kpi import latest_deltas
+from src.sql.core_metrics.general_metrics import general_metrics
+
+
+@dataclass(frozen=True)
+class GeneralMetrics:
+    """Metric values and their week-over-week growth, each a week x key float64 frame."""
+
+    values: pd.DataFrame
+    previous: pd.DataFrame
+    net_growth: pd.DataFrame
+    growth_rate: pd.DataFrame
+    kpis: pd.DataFrame
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> GeneralMetrics:
+        """Pivot the long ``(week, key, value)`` extract and derive growth for every key."""
+        long = df.assign(
+            week=pd.to_datetime(df['week']),
+            value=pd.to_numeric(df['value'], errors='coerce'),
+        ).dropna(subset=['value'])
+        values = long.pivot_table(index='week', columns='key', values='value', aggfunc='last')
+        values = values.sort_index().astype('float64')
+        values.columns.name = None
+
+        previous = values.ffill().shift(1).where(values.notna())
+        net_growth = values - previous
+        # 0/0 counts as no growth; growth from 0 stays infinite
+        growth_rate = (net_growth / previous * 100).fillna(0).where(previous.notna())
+        return cls(
+            values=values,
+            previous=previous,
+            net_growth=net_growth,
+            growth_rate=growth_rate,
+            kpis=latest_deltas(values.reset_index(), 'week', values.columns),
+        )
+
+    @property
+    def empty(self) -> bool:
+        return self.values.empty
+
+    def _long(self, frames: dict[str, pd.DataFrame], keys, present: pd.DataFrame) -> pd.DataFrame:
+        """Rows of ``frames`` where ``present`` holds, one block of weeks per key in ``keys`` order."""
+        keys = [k for k in keys if k in self.values.columns]
+        mask = present[keys].to_numpy().T.ravel()
+        weeks = self.values.index.to_numpy()
+        out = {
+            'week': np.tile(weeks, len(keys))[mask],
+            'key': np.repeat(np.array(keys, dtype=object), len(weeks))[mask],
+        }
+        for name, frame in frames.items():
+            out[name] = frame[keys].to_numpy().T.ravel()[mask]
+        return pd.DataFrame(out)
+
+    def series(self, keys) -> pd.DataFrame:
+        """Long ``(week, key, value)`` rows for ``keys``, ordered by week then key like the extract."""
+        keys = [k for k in self.values.columns if k in set(keys)]
+        return self._long({'value': self.values}, keys, self.values.notna()).sort_values(
+            ['week', 'key'], kind='stable'
+        ).reset_index(drop=True)
+
+    def growth(self, keys) -> pd.DataFrame:
+        """Long rows with value, previous value, net growth and growth rate for weeks that have a previous value."""
+        return self._long(
+            {
+                'value': self.values,
+                'previous_value': self.previous,
+                'net_growth': self.net_growth,
+                'growth_rate': self.growth_rate,
+            },
+            keys,
+            self.net_growth.notna(),
+        )
+
+    def summary(self, keys) -> pd.DataFrame:
+        """Average and total net growth, average rate and positive weeks per key with any growth weeks."""
+        keys = [k for k in keys if k in self.values.columns]
+        net_growth, growth_rate = self.net_growth[keys], self.growth_rate[keys]
+        table = pd.DataFrame({
+            'avg_growth': net_growth.mean(),
+            'avg_growth_rate': growth_rate.mean(),
+            'total_growth': net_growth.sum(),
+            'positive_weeks': (net_growth > 0).sum(),
+            'total_weeks': net_growth.count(),
+        })
+        table = table[table['total_weeks'] > 0]
+        return table.assign(success_rate=table['positive_weeks'] / table['total_weeks'] * 100)
+
+
+@st.cache_resource(ttl='1h', show_spinner=False)
+def load_general_metrics() -> GeneralMetrics:
+    """Fetch (or reuse) the pivoted general metrics shared by all sessions."""
+    return GeneralMetrics.from_frame(load_dataset(general_metrics).view())
@@ -0,0 +1,314 @@
+"""Mergeable HyperLogLog sketches for distinct-shop counts.
+
+One HLL per day and metric (distinct shops installing, uninstalling,
+upgrading, downgrading) built from the lifecycle extract and persisted
+locally. Distinct counts can't be summed across days, but HLL registers
+merge with an element-wise max, so week, month, quarter and arbitrary date
+range counts come from ``np.maximum.reduceat`` over the day axis instead of
+another ``COUNT(DISTINCT shop_id)`` scan of ``pg.extensions``.
+
+Shop ids are hashed with splitmix64. With ``PRECISION = 12`` (4096 one-byte
+registers, 4 KiB per day) the relative standard error is
+``1.04 / sqrt(4096)`` ~ 1.6%, and small counts are near exact.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.engines.lifecycle import NULL_TS, LifecycleExtract, load_lifecycle_extract
+
+
+PRECISION: int = 12
+REGISTERS: int = 1 << PRECISION
+RELATIVE_ERROR: float = 1.04 / np.sqrt(REGISTERS)
+# z-score of the 95% lower/upper bounds reported with every estimate
+BOUND_Z: float = 1.96
+
+HLL_STORE_DIR: Path = Path('.cache/hll')
+HISTORY_DAYS: int = 800
+# Days this close to the last refresh are resketched, as late events can still land on them
+RESKETCH_DAYS: int = 7
+FULL_REBUILD_INTERVAL: pd.Timedelta = pd.Timedelta(days=7)
+
+# Metric name -> lifecycle timestamp column whose day the shop is counted on
+METRICS: dict[str, str] = {
+    'installs': 'created_at',
+    'uninstalls': 'deleted_at',
+    'upgrades': 'upgraded_at',
+    'downgrades': 'downgraded_at',
+}
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def _utcnow() -> pd.Timestamp:
+    return pd.Timestamp.now(tz='UTC').tz_localize(None)
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    z = values.astype('uint64') + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _leading_zeros(x: np.ndarray) -> np.ndarray:
+    """Leading zero bits of each uint64 (64 for zero)."""
+    x = x.copy()
+    count = np.zeros(len(x), dtype='int64')
+    for shift in (32, 16, 8, 4, 2, 1):
+        empty = (x >> np.uint64(64 - shift)) == 0
+        count += shift * empty
+        x = np.where(empty, x << np.uint64(shift), x)
+    return count + (x == 0)
+
+
+def register_updates(shop_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Register index and rank (position of the first set bit) for each shop id."""
+    hashed = _splitmix64(shop_ids)
+    index = (hashed >> np.uint64(64 - PRECISION)).astype('int64')
+    rest = hashed << np.uint64(PRECISION)
+    rank = np.minimum(_leading_zeros(rest), 64 - PRECISION) + 1
+    return index, rank.astype('uint8')
+
+
+def _sigma(x: np.ndarray) -> np.ndarray:
+    x = x.astype('float64')
+    y, z = 1.0, x.copy()
+    for _ in range(64):
+        x = x * x
+        z = z + x * y
+        y += y
+    return z
+
+
+def _tau(x: np.ndarray) -> np.ndarray:
+    x = x.astype('float64')
+    y, z = 1.0, 1 - x
+    for _ in range(64):
+        x = np.sqrt(x)
+        y *= 0.5
+        z = z - (1 - x) ** 2 * y
+    return z / 3
+
+
+def estimate(registers: np.ndarray) -> np.ndarray:
+    """Cardinality estimate for each row of a (sketches, REGISTERS) array.
+
+    Uses Ertl's improved estimator on the register histogram, which stays
+    unbiased through the small and mid ranges where raw HLL needs linear
+    counting and bias tables.
+    """
+    registers = np.atleast_2d(registers)
+    q = 64 - PRECISION
+    rows = np.arange(len(registers))[:, None]
+    hist = np.bincount((rows * (q + 2) + registers).ravel(), minlength=len(registers) * (q + 2))
+    hist = hist.reshape(len(registers), q + 2).astype('float64')
+
+    empty = hist[:, 0] == REGISTERS
+    ranks = np.exp2(-np.arange(1, q + 1))
+    with np.errstate(over='ignore', invalid='ignore'):
+        denom = (
+            REGISTERS * _sigma(np.where(empty, 0, hist[:, 0] / REGISTERS))
+            + hist[:, 1:q + 1] @ ranks
+            + REGISTERS * _tau(1 - hist[:, q + 1] / REGISTERS) * 2.0**-q
+        )
+    # Empty sketches have a zero denominator; skip them rather than divide by it
+    return np.divide(REGISTERS**2 / (2 * np.log(2)), denom, out=np.zeros_like(denom), where=~empty)
+
+
+def _day(ts_i8: np.ndarray) -> np.ndarray:
+    return np.floor_divide(ts_i8, _NS_PER_DAY)
+
+
+def sketch_days(ts_i8: np.ndarray, shop_ids: np.ndarray, first_day: int, days: int) -> np.ndarray:
+    """(days, REGISTERS) sketches of the shops with an event on each day from ``first_day``."""
+    keep = ts_i8 != NULL_TS
+    day = _day(ts_i8[keep]) - first_day
+    in_range = (day >= 0) & (day < days)
+    day, shops = day[in_range], shop_ids[keep][in_range]
+    index, rank = register_updates(shops)
+    registers = np.zeros(days * REGISTERS, dtype='uint8')
+    np.maximum.at(registers, day * REGISTERS + index, rank)
+    return registers.reshape(days, REGISTERS)
+
+
+class HllStore:
+    """Daily sketches per metric for days ``first_day .. first_day + days - 1``, persisted under ``directory``."""
+
+    def __init__(self, directory: Path = HLL_STORE_DIR) -> None:
+        self.directory = directory
+        self.first_day: int | None = None
+        self.sketches: dict[str, np.ndarray] = {}
+        self.watermark: pd.Timestamp | None = None
+        self.built_at: pd.Timestamp | None = None
+        self.refreshed_at: pd.Timestamp | None = None
+        self._source: LifecycleExtract | None = None
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def _path(self) -> Path:
+        return self.directory / 'daily_sketches.npz'
+
+    def _load(self) -> None:
+        try:
+            with np.load(self._path) as data:
+                if int(data['precision']) != PRECISION:
+                    return
+                sketches = {metric: data[metric] for metric in METRICS}
+                first_day = int(data['first_day'])
+                watermark = pd.Timestamp(int(data['watermark']))
+                built_at = pd.Timestamp(int(data['built_at']))
+        except (OSError, ValueError, KeyError):
+            return
+        self.sketches, self.first_day = sketches, first_day
+        self.watermark, self.built_at = watermark, built_at
+
+    def _save(self) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_suffix(f'.tmp{os.getpid()}.npz')
+            np.savez_compressed(
+                tmp,
+                precision=PRECISION,
+                first_day=self.first_day,
+                watermark=self.watermark.value,
+                built_at=self.built_at.value,
+                **self.sketches,
+            )
+            os.replace(tmp, self._path)
+        except OSError:
+            # The in-memory sketches still work; the next process just rebuilds
+            pass
+
+    @property
+    def days(self) -> int:
+        return len(next(iter(self.sketches.values()))) if self.sketches else 0
+
+    def _refresh(self, ex: LifecycleExtract, full: bool) -> None:
+        started = _utcnow()
+        first_day = int(_day(np.array([(started.normalize() - pd.Timedelta(days=HISTORY_DAYS)).value]))[0])
+        days = int(_day(np.array([started.value]))[0]) - first_day + 1
+        full = full or self.watermark is None or self.built_at is None or (
+            started - self.built_at > FULL_REBUILD_INTERVAL
+        )
+
+        if full:
+            resketch_from = first_day
+        else:
+            last_sketched = int(_day(np.array([self.watermark.value]))[0])
+            resketch_from = max(first_day, last_sketched - RESKETCH_DAYS)
+
+        sketches = {}
+        for metric, column in METRICS.items():
+            fresh = sketch_days(getattr(ex, column), ex.shop_id, resketch_from, first_day + days - resketch_from)
+            if resketch_from > first_day:
+                # Keep the settled days, shifted onto the new day range
+                kept = np.zeros((resketch_from - first_day, REGISTERS), dtype='uint8')
+                lo = max(first_day, self.first_day)
+                hi = min(resketch_from, self.first_day + self.days)
+                if hi > lo:
+                    kept[lo - first_day:hi - first_day] = self.sketches[metric][lo - self.first_day:hi - self.first_day]
+                fresh = np.concatenate([kept, fresh])
+            fresh.setflags(write=False)
+            sketches[metric] = fresh
+
+        self.sketches, self.first_day = sketches, first_day
+        if full:
+            self.built_at = started
+        self.watermark = started
+        self.refreshed_at = started
+        self._save()
+
+    def refresh(self, ex: LifecycleExtract, full: bool = False) -> None:
+        """Resketch recent days (or every day when ``full``) from ``ex``."""
+        with self._lock:
+            self._refresh(ex, full)
+
+    def ensure_fresh(self, ex: LifecycleExtract) -> None:
+        """Refresh from ``ex`` unless it was already sketched by this process."""
+        with self._lock:
+            if self._source is not ex:
+                self._refresh(ex, full=False)
+                self._source = ex
+
+    def merged(self, metric: str, starts, ends) -> np.ndarray:
+        """One merged sketch per [start, end) day range, as a (ranges, REGISTERS) array."""
+        starts = pd.DatetimeIndex(starts).normalize()
+        ends = pd.DatetimeIndex(ends).normalize()
+        day0 = pd.Timestamp(self.first_day * _NS_PER_DAY)
+        lo = np.clip((starts - day0).days.to_numpy(), 0, self.days)
+        hi = np.clip((ends - day0).days.to_numpy(), 0, self.days)
+        daily = self.sketches[metric]
+        out = np.zeros((len(lo), REGISTERS), dtype='uint8')
+        nonempty = hi > lo
+        if nonempty.any():
+            # reduceat over (start, end) pairs; only the even slots are the ranges
+            bounds = np.stack([lo[nonempty], hi[nonempty]], axis=1).ravel()
+            padded = np.concatenate([daily, np.zeros((1, REGISTERS), dtype='uint8')])
+            out[nonempty] = np.maximum.reduceat(padded, bounds, axis=0)[::2]
+        return out
+
+
+@st.cache_resource(show_spinner=False)
+def get_hll_store() -> HllStore:
+    return HllStore()
+
+
+def _with_bounds(df: pd.DataFrame, registers: np.ndarray) -> pd.DataFrame:
+    counts = estimate(registers)
+    margin = BOUND_Z * RELATIVE_ERROR * counts
+    df['distinct_shops'] = np.round(counts).astype('int64')
+    df['lower'] = np.floor(np.maximum(counts - margin, 0)).astype('int64')
+    df['upper'] = np.ceil(counts + margin).astype('int64')
+    df['relative_error'] = RELATIVE_ERROR
+    return df
+
+
+def distinct_shops_by_period(
+    store: HllStore,
+    metric: str = 'installs',
+    freq: str = 'week',
+    periods: int | None = None,
+    today=None,
+) -> pd.DataFrame:
+    """Estimated distinct shops per complete period before today, newest first."""
+    if metric not in METRICS:
+        raise ValueError(f'Unknown metric {metric!r}; expected one of {tuple(METRICS)}')
+    if periods is None:
+        periods = 52 if freq == 'week' else 12
+    today = pd.Timestamp(today) if today is not None else _utcnow()
+    current = today.normalize().to_period({'week': 'W-SUN', 'month': 'M', 'quarter': 'Q'}[freq])
+    closed = pd.period_range(end=current - 1, periods=periods, freq=current.freq)
+    starts = closed.start_time
+    ends = (closed + 1).start_time
+    df = pd.DataFrame({'period_start': starts})
+    df = _with_bounds(df, store.merged(metric, starts, ends))
+    return df.iloc[::-1].reset_index(drop=True)
+
+
+def distinct_shops_between(store: HllStore, metric: str, start, end) -> dict:
+    """Estimated distinct shops with a ``metric`` event on days in [start, end]."""
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end) + pd.Timedelta(days=1)
+    row = _with_bounds(pd.DataFrame(index=[0]), store.merged(metric, [start], [end])).iloc[0]
+    return {
+        'distinct_shops': int(row['distinct_shops']),
+        'lower': int(row['lower']),
+        'upper': int(row['upper']),
+        'relative_error': float(row['relative_error']),
+    }
+
+
+def lifecycle_hll_store() -> HllStore:
+    """The shared store, resketched whenever the lifecycle extract is reloaded."""
+    store = get_hll_store()
+    store.ensure_fresh(load_lifecycle_extract())
+    return store
@@ -0,0 +1,280 @@
+"""Shop x integration bitmap index.
+
+Fetches one compact row per shop (``integration_shops``) and a shop ->
+integration membership list (``integration_memberships``) and packs each
+integration, and each shop attribute (awesome, churned, downgraded, ...),
+into a NumPy bitset over shop positions (``np.packbits``, 1 bit per shop).
+Per-integration counts are popcounts of bitset intersections, lifetime sums
+are dot products with the set bits, and the benchmark is the same
+computation over the all-shops bitset. Overlaps and combinations of
+integrations are further intersections of the same bitsets.
+
+Shops are Shopify shops whose core extension was installed since
+2023-01-01 and at least 30 days ago, and awesome LTV is $15 per 30 days of
+lifetime. Per-integration rates are rounded to 1 decimal, benchmark rates
+and LTV to 2.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.db.datasets import load_dataset
+from src.sql.core_metrics.integration_index import integration_memberships, integration_shops
+
+
+AWESOME_MONTHLY_PRICE: float = 15.0
+MIN_SHOPS: int = 20
+TIERS: tuple[str, ...] = ('Awesome-Only', 'Available-to-All', 'Unknown')
+
+AWESOME_ONLY: frozenset[str] = frozenset({
+    'Smile: Rewards & Loyalty', 'Gorgias', 'Tidio', 'Customer Accounts Concierge',
+    'Flits: Customer Account Page', 'Joy Loyalty (Prod)', 'BLOY Loyalty Rewards',
+    'Commslayer: AI Helpdesk & Chat', 'BOGOS', 'Casa', 'Love Loyalty', 'Redeemly',
+    'AfterShip Feed', 'AfterShip (Settings)', 'easyPoints', 'Akohub', 'Kangaroo Rewards',
+    'MESA', 'ToastiBar - Sales Popup', 'Beans', 'Beans: Loyalty & Rewards', 'Beans (Settings)',
+    'TikTok Shop', 'LoyaltyLion', 'Lion Loyalty (Settings)',
+    'Swell - Yotpo Loyalty & Rewards', 'Swell (Settings)',
+})
+AVAILABLE_TO_ALL: frozenset[str] = frozenset({
+    'BON Loyalty', 'PushOwl Prod', 'Marsello', 'Raleon',
+    'Outfy - Automated Social Media Management',
+})
+
+# Lookup table popcount; works on any numpy version
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype='uint8')
+
+
+def tier_of(name: str) -> str:
+    """Tier of an integration: Awesome-Only, Available-to-All or Unknown."""
+    if name in AWESOME_ONLY or 'Swell' in name or 'Lion' in name:
+        return 'Awesome-Only'
+    if name in AVAILABLE_TO_ALL:
+        return 'Available-to-All'
+    return 'Unknown'
+
+
+def popcount(bits: np.ndarray) -> np.ndarray:
+    """Set bits per row of a packed (rows, bytes) bitset array."""
+    return _POPCOUNT[bits].sum(axis=-1, dtype='int64')
+
+
+@dataclass(frozen=True)
+class IntegrationIndex:
+    """Packed bitsets over shop positions: one per integration plus one per shop attribute."""
+
+    shop_id: np.ndarray
+    lifetime_days: np.ndarray
+    extension_rows: np.ndarray
+    names: tuple[str, ...]
+    sources: tuple[str, ...]
+    bits: np.ndarray
+    awesome: np.ndarray
+    deleted: np.ndarray
+    upgraded: np.ndarray
+    downgraded: np.ndarray
+
+    @classmethod
+    def from_frames(cls, shops: pd.DataFrame, memberships: pd.DataFrame) -> 'IntegrationIndex':
+        shops = shops.sort_values('shop_id')
+        shop_id = shops['shop_id'].to_numpy(dtype='int64')
+        n = len(shop_id)
+
+        def packed(flags) -> np.ndarray:
+            return np.packbits(np.asarray(flags, dtype=bool))
+
+        # Memberships of shops outside the shop table drop out here
+        memberships = memberships.dropna(subset=['integration_name'])
+        member_shop = memberships['shop_id'].to_numpy(dtype='int64')
+        pos = np.searchsorted(shop_id, member_shop)
+        known = (pos < n) & (shop_id[np.minimum(pos, max(n - 1, 0))] == member_shop) if n else np.zeros(len(pos), dtype=bool)
+        keys = memberships['integration_name'].astype(str) + '\x00' + memberships['integration_source'].astype(str)
+        codes, uniques = pd.factorize(keys[known], sort=True)
+
+        member = np.zeros((len(uniques), n), dtype=bool)
+        member[codes, pos[known]] = True
+        names, sources = zip(*(key.split('\x00') for key in uniques)) if len(uniques) else ((), ())
+
+        arrays = dict(
+            shop_id=shop_id,
+            lifetime_days=shops['lifetime_days'].to_numpy(dtype='float64'),
+            extension_rows=shops['extension_rows'].to_numpy(dtype='float64'),
+            bits=np.packbits(member, axis=1),
+            awesome=packed(shops['awesome'].to_numpy() == 1),
+            deleted=packed(shops['deleted'].to_numpy() == 1),
+            upgraded=packed(shops['upgraded'].to_numpy() == 1),
+            downgraded=packed(shops['downgraded'].to_numpy() == 1),
+        )
+        for values in arrays.values():
+            # Shared between sessions through st.cache_resource; keep it read-only
+            values.setflags(write=False)
+        return cls(names=tuple(names), sources=tuple(sources), **arrays)
+
+    def __len__(self) -> int:
+        return len(self.shop_id)
+
+    @property
+    def everyone(self) -> np.ndarray:
+        return np.packbits(np.ones(len(self), dtype=bool))
+
+    def integration(self, name: str) -> np.ndarray:
+        """Bitset of shops using ``name`` through any source."""
+        rows = [i for i, n in enumerate(self.names) if n == name]
+        return np.bitwise_or.reduce(self.bits[rows], axis=0) if rows else np.zeros_like(self.awesome)
+
+    def _sums(self, sets: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Sum of ``values`` over the shops in each bitset row."""
+        members = np.unpackbits(np.atleast_2d(sets), axis=1, count=len(self)).astype('float64')
+        return members @ values
+
+    def metrics(self, sets: np.ndarray, digits: int = 1) -> pd.DataFrame:
+        """Counts, rates (rounded to ``digits`` decimals), lifetimes and LTV for each bitset row of ``sets``."""
+        sets = np.atleast_2d(sets)
+        free = ~self.awesome
+        total = popcount(sets)
+        awesome = popcount(sets & self.awesome)
+        free_shops = total - awesome
+
+        # Lifetime averages are over extension rows, as in the SQL
+        awesome_sets = sets & self.awesome
+        free_sets = sets & free
+        awesome_days = self._sums(awesome_sets, self.lifetime_days)
+        awesome_rows = self._sums(awesome_sets, self.extension_rows)
+        free_days = self._sums(free_sets, self.lifetime_days)
+        free_rows = self._sums(free_sets, self.extension_rows)
+
+        def pct(num, den):
+            den = np.asarray(den, dtype='float64')
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.round(np.where(den > 0, 100.0 * num / den, np.nan), digits)
+
+        def ratio(num, den):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(den > 0, num / den, np.nan)
+
+        return pd.DataFrame({
+            'total_shops': total,
+            'awesome_shops': awesome,
+            'free_shops': free_shops,
+            'awesome_downgrade_rate': pct(popcount(awesome_sets & self.downgraded), awesome),
+            'awesome_churn_rate': pct(popcount(awesome_sets & self.deleted), awesome),
+            'awesome_avg_lifetime': np.round(ratio(awesome_days, awesome_rows)),
+            'awesome_ltv': np.round(ratio(AWESOME_MONTHLY_PRICE * awesome_days / 30.0, awesome)),
+            'free_churn_rate': pct(popcount(free_sets & self.deleted), free_shops),
+            'free_avg_lifetime': np.round(ratio(free_days, free_rows)),
+            'awesome_conversion_rate': pct(awesome, total),
+        })
+
+    def performance(self, min_shops: int = MIN_SHOPS) -> pd.DataFrame:
+        """One row per (integration, source) with at least ``min_shops`` shops, largest first."""
+        df = self.metrics(self.bits)
+        df.insert(0, 'integration_name', list(self.names))
+        df.insert(1, 'integration_source', list(self.sources))
+        df.insert(2, 'tier', [tier_of(name) for name in self.names])
+        df = df[df['total_shops'] >= min_shops]
+        tier_rank = df['tier'].map({tier: i for i, tier in enumerate(TIERS)})
+        return df.assign(_rank=tier_rank).sort_values(['_rank', 'total_shops'], ascending=[True, False]).drop(columns='_rank').reset_index(drop=True)
+
+    def benchmark(self) -> pd.Series:
+        """The same metrics over every shop in the index, rates and LTV to 2 decimals."""
+        row = self.metrics(self.everyone, digits=2).iloc[0]
+        # The benchmark query averages LTV over extension rows rather than shops
+        awesome_sets = self.everyone & self.awesome
+        rows = self._sums(awesome_sets, self.extension_rows)[0]
+        days = self._sums(awesome_sets, self.lifetime_days)[0]
+        row['awesome_ltv'] = round(AWESOME_MONTHLY_PRICE * days / 30.0 / rows, 2) if rows else np.nan
+        return row
+
+    def overlap(self, names: list[str]) -> pd.DataFrame:
+        """Shops using both integrations, for every pair in ``names`` (diagonal: shops using each)."""
+        sets = np.stack([self.integration(name) for name in names]) if names else np.zeros((0, len(self.awesome)), dtype='uint8')
+        counts = np.stack([popcount(row & sets) for row in sets]) if len(sets) else np.zeros((0, 0), dtype='int64')
+        return pd.DataFrame(counts, index=names, columns=names)
+
+    def combination(self, names: list[str]) -> np.ndarray:
+        """Bitset of shops using every integration in ``names``."""
+        sets = [self.integration(name) for name in names]
+        return np.bitwise_and.reduce(np.stack(sets), axis=0) if sets else self.everyone
+
+
+@st.cache_resource(ttl='1h', show_spinner=False)
+def load_integration_index() -> IntegrationIndex:
+    """Fetch (or reuse) the integration index shared by all sessions."""
+    return IntegrationIndex.from_frames(
+        load_dataset(integration_shops).view(), load_dataset(integration_memberships).view()
+    )
+
+
+# Typed schema of the Integrations page table
+TIER_DTYPE = pd.CategoricalDtype(TIERS, ordered=True)
+INTEGRATION_SCHEMA: dict[str, object] = {
+    'Integration': 'string',
+    'Source': 'string',
+    'Tier': TIER_DTYPE,
+    'Total Shops': 'int64',
+    'Awesome': 'int64',
+    'Free': 'int64',
+    'Downgrade %': 'float64',
+    'Downgrade % vs Avg': 'float64',
+    'Churn %': 'float64',
+    'Churn % vs Avg': 'float64',
+    'LTV': 'float64',
+    'LTV vs Avg': 'float64',
+    'Lifetime': 'float64',
+    'Lifetime vs Avg': 'float64',
+    'Free Churn %': 'float64',
+    'Free Churn % vs Avg': 'float64',
+    'Free Lifetime': 'float64',
+    'Awesome Conv %': 'float64',
+}
+
+# Metric -> (its benchmark, decimals) behind the "vs Avg" columns
+_VS_AVG = {
+    'Downgrade %': ('awesome_downgrade_rate', 1),
+    'Churn %': ('awesome_churn_rate', 1),
+    'LTV': ('awesome_ltv', 0),
+    'Lifetime': ('awesome_avg_lifetime', 0),
+    'Free Churn %': ('free_churn_rate', 1),
+}
+
+
+def typed_integrations(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast an integrations frame to ``INTEGRATION_SCHEMA`` (unknown tiers become 'Unknown')."""
+    out = pd.DataFrame(index=df.index)
+    for column, dtype in INTEGRATION_SCHEMA.items():
+        values = df[column] if column in df.columns else pd.Series(np.nan, index=df.index)
+        if dtype is TIER_DTYPE:
+            out[column] = values.where(values.isin(TIERS), 'Unknown').astype(TIER_DTYPE)
+        elif dtype == 'string':
+            out[column] = values.astype('string')
+        elif dtype == 'int64':
+            out[column] = pd.to_numeric(values, errors='coerce').fillna(0).astype(dtype)
+        else:
+            out[column] = pd.to_numeric(values, errors='coerce').astype(dtype)
+    return out
+
+
+def integration_performance(index: IntegrationIndex, min_shops: int = MIN_SHOPS) -> pd.DataFrame:
+    """Per-integration metrics in ``INTEGRATION_SCHEMA``, with "vs Avg" differences to the benchmark."""
+    df = index.performance(min_shops).rename(columns={
+        'integration_name': 'Integration',
+        'integration_source': 'Source',
+        'tier': 'Tier',
+        'total_shops': 'Total Shops',
+        'awesome_shops': 'Awesome',
+        'free_shops': 'Free',
+        'awesome_downgrade_rate': 'Downgrade %',
+        'awesome_churn_rate': 'Churn %',
+        'awesome_ltv': 'LTV',
+        'awesome_avg_lifetime': 'Lifetime',
+        'free_churn_rate': 'Free Churn %',
+        'free_avg_lifetime': 'Free Lifetime',
+        'awesome_conversion_rate': 'Awesome Conv %',
+    })
+    benchmark = index.benchmark()
+    for column, (metric, digits) in _VS_AVG.items():
+        df[f'{column} vs Avg'] = (df[column] - benchmark[metric]).round(digits)
+    return typed_integrations(df)
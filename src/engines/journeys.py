@@ -0,0 +1,167 @@
+"""Incremental shop-journey store for time to first review.
+
+Keeps one row per shop (install -> widget enabled -> first review shown) on
+local disk. Each refresh only recomputes shops with activity since the last
+watermark; the weekly aggregates of ``time_to_first_review_query`` are then
+derived from the stored journeys in pandas.
+
+``dbt.installed_widgets_by_shops`` carries no timestamps, so changes coming
+only from it are picked up by the periodic full rebuild.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.db.query_cache import deserialize_frame, serialize_frame
+from src.db.redshift_connection import run_query_uncached
+from src.sql.onboarding.shop_journeys import all_shops, shop_journeys_query, shops_changed_since
+
+
+JOURNEY_STORE_DIR: Path = Path('.cache/journeys')
+REFRESH_INTERVAL: pd.Timedelta = pd.Timedelta(hours=1)
+FULL_REBUILD_INTERVAL: pd.Timedelta = pd.Timedelta(days=7)
+# Re-read a little before the watermark to cover replication lag and clock skew
+WATERMARK_OVERLAP: pd.Timedelta = pd.Timedelta(hours=1)
+MAX_DAYS_TO_FIRST_REVIEW: float = 180
+
+JOURNEY_COLUMNS = ['shop_id', 'awesome', 'first_review_shown_date', 'days_to_first_review']
+
+
+def _utcnow() -> pd.Timestamp:
+    return pd.Timestamp.now(tz='UTC').tz_localize(None)
+
+
+class JourneyStore:
+    """Shop journeys plus the watermark of the last refresh, persisted under ``directory``."""
+
+    def __init__(self, directory: Path = JOURNEY_STORE_DIR) -> None:
+        self.directory = directory
+        self.journeys = pd.DataFrame(columns=JOURNEY_COLUMNS)
+        self.watermark: pd.Timestamp | None = None
+        self.built_at: pd.Timestamp | None = None
+        self.refreshed_at: pd.Timestamp | None = None
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def _data_path(self) -> Path:
+        return self.directory / 'journeys.arrow'
+
+    @property
+    def _state_path(self) -> Path:
+        return self.directory / 'state.json'
+
+    def _load(self) -> None:
+        try:
+            state = json.loads(self._state_path.read_text())
+            journeys = deserialize_frame(self._data_path.read_bytes())
+        except (OSError, ValueError, KeyError):
+            return
+        self.journeys = journeys
+        self.watermark = pd.Timestamp(state['watermark'])
+        self.built_at = pd.Timestamp(state['built_at'])
+
+    def _save(self) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for path, payload in (
+                (self._data_path, serialize_frame(self.journeys)),
+                (self._state_path, json.dumps({
+                    'watermark': self.watermark.isoformat(),
+                    'built_at': self.built_at.isoformat(),
+                }).encode('utf-8')),
+            ):
+                tmp = path.with_suffix(f'.tmp{os.getpid()}')
+                tmp.write_bytes(payload)
+                os.replace(tmp, path)
+        except OSError:
+            # The in-memory store still works; the next process just rebuilds
+            pass
+
+    def _refresh(self, full: bool) -> None:
+        started = _utcnow()
+        full = full or self.watermark is None or self.built_at is None or (
+            started - self.built_at > FULL_REBUILD_INTERVAL
+        )
+        if full:
+            changed = all_shops
+        else:
+            since = (self.watermark - WATERMARK_OVERLAP).strftime('%Y-%m-%d %H:%M:%S')
+            changed = shops_changed_since.format(since=since)
+
+        rows = run_query_uncached(shop_journeys_query.format(changed_shops=changed))
+        rows['first_review_shown_date'] = pd.to_datetime(rows['first_review_shown_date'])
+        completed = rows.dropna(subset=['first_review_shown_date'])[JOURNEY_COLUMNS]
+
+        if full:
+            journeys = completed
+            self.built_at = started
+        else:
+            # Upsert: changed shops are replaced, or dropped if no longer complete
+            kept = self.journeys[~self.journeys['shop_id'].isin(rows['shop_id'])]
+            journeys = pd.concat([kept, completed], ignore_index=True)
+
+        self.journeys = journeys.sort_values('shop_id').reset_index(drop=True)
+        self.watermark = started
+        self.refreshed_at = started
+        self._save()
+
+    def refresh(self, full: bool = False) -> None:
+        """Recompute changed shops (or every shop when ``full``) and advance the watermark."""
+        with self._lock:
+            self._refresh(full)
+
+    def ensure_fresh(self) -> None:
+        """Refresh unless another session did so within ``REFRESH_INTERVAL``."""
+        with self._lock:
+            if self.refreshed_at is None or _utcnow() - self.refreshed_at > REFRESH_INTERVAL:
+                self._refresh(full=False)
+
+
+@st.cache_resource(show_spinner=False)
+def get_journey_store() -> JourneyStore:
+    return JourneyStore()
+
+
+def weekly_first_review_metrics(journeys: pd.DataFrame, today=None) -> pd.DataFrame:
+    """Weekly aggregates matching the output of ``time_to_first_review_query``."""
+    today = pd.Timestamp(today) if today is not None else _utcnow()
+    today = today.normalize()
+    current_week = today - pd.Timedelta(days=today.weekday())
+    start = today - pd.DateOffset(months=12)
+    start = start - pd.Timedelta(days=start.weekday())
+
+    shown = pd.to_datetime(journeys['first_review_shown_date'])
+    df = journeys[(shown >= start) & (shown <= current_week)].copy()
+    df['week'] = pd.to_datetime(df['first_review_shown_date']).dt.to_period('W-SUN').dt.start_time
+
+    days = df['days_to_first_review'].astype('float64')
+    in_range = days.between(0, MAX_DAYS_TO_FIRST_REVIEW)
+    df['days'] = days.where(in_range)
+    df['days_awesome'] = df['days'].where(df['awesome'] == '1')
+    df['days_free'] = df['days'].where(df['awesome'] == '0')
+
+    out = df.groupby('week').agg(
+        shops_showing_first_review=('shop_id', 'size'),
+        avg_days_to_first_review=('days', 'mean'),
+        median_days_to_first_review=('days', 'median'),
+        avg_days_awesome_plan=('days_awesome', 'mean'),
+        avg_days_free_plan=('days_free', 'mean'),
+    )
+    metric_cols = out.columns.drop('shops_showing_first_review')
+    out[metric_cols] = np.round(out[metric_cols], 2)
+    return out.sort_index(ascending=False).reset_index()
+
+
+def weekly_time_to_first_review() -> pd.DataFrame:
+    """Refresh the journey store if due and return the weekly aggregates."""
+    store = get_journey_store()
+    store.ensure_fresh()
+    return weekly_first_review_metrics(store.journeys)
@@ -0,0 +1,201 @@
+"""Plan lifecycle engine.
+
+Fetches every core extension's lifecycle timestamps once
+(``lifecycle_extract``) and answers "how many shops were active / free /
+awesome at time t" for any set of snapshot times with a sweep-line over
+sorted interval boundaries, instead of range-joining ``pg.extensions`` to a
+month series in the warehouse.
+
+The plan rules mirror ``monthly_core_metrics`` exactly, including its quirks:
+snapshot times are midnight at the start of the period's last day, a shop is
+free once downgraded even if it upgraded again later, and ``shops.awesome``
+overrides the extension history.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.db.datasets import Dataset, load_dataset
+from src.sql.growth.lifecycle import lifecycle_extract
+
+
+# datetime64 NaT viewed as int64; stands in for SQL NULL timestamps
+NULL_TS: int = np.iinfo(np.int64).min
+OPEN_END: int = np.iinfo(np.int64).max
+
+_FREQ_ALIASES = {'week': 'W-SUN', 'month': 'M', 'quarter': 'Q'}
+
+
+@dataclass(frozen=True)
+class LifecycleExtract:
+    """Column arrays for one row per core extension; timestamps are int64 ns."""
+
+    shop_id: np.ndarray
+    created_at: np.ndarray
+    upgraded_at: np.ndarray
+    downgraded_at: np.ndarray
+    deleted_at: np.ndarray
+    shop_awesome: np.ndarray
+    is_shopify: np.ndarray
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'LifecycleExtract':
+        def ts(col: str) -> np.ndarray:
+            values = pd.to_datetime(df[col]).to_numpy(dtype='datetime64[ns]')
+            return values.view('i8')
+
+        arrays = dict(
+            shop_id=df['shop_id'].to_numpy(dtype='int64'),
+            created_at=ts('created_at'),
+            upgraded_at=ts('upgraded_at'),
+            downgraded_at=ts('downgraded_at'),
+            deleted_at=ts('deleted_at'),
+            shop_awesome=df['shop_awesome'].to_numpy(dtype='int64') == 1,
+            is_shopify=df['is_shopify'].to_numpy(dtype='int64') == 1,
+        )
+        for values in arrays.values():
+            # Shared between sessions through st.cache_resource; keep it read-only
+            values.setflags(write=False)
+        return cls(**arrays)
+
+    def __len__(self) -> int:
+        return len(self.shop_id)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _extract_for(version: str, _dataset: Dataset) -> LifecycleExtract:
+    return LifecycleExtract.from_frame(_dataset.view())
+
+
+def load_lifecycle_extract() -> LifecycleExtract:
+    """Fetch (or reuse) the lifecycle extract shared by all sessions, rebuilt only when the dataset is fetched again.
+
+    Anything derived from it can be keyed on ``load_dataset(lifecycle_extract).version``.
+    """
+    dataset = load_dataset(lifecycle_extract)
+    return _extract_for(dataset.version, dataset)
+
+
+def _plan_intervals(ex: LifecycleExtract, mask: np.ndarray) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Per-row [start, end) intervals during which each plan condition holds."""
+    created = ex.created_at[mask]
+    upgraded = ex.upgraded_at[mask]
+    downgraded = ex.downgraded_at[mask]
+    deleted = ex.deleted_at[mask]
+    awesome_shop = ex.shop_awesome[mask]
+
+    has_created = created != NULL_TS
+    active_end = np.where(deleted == NULL_TS, OPEN_END, deleted)
+    active_start = np.where(has_created, created, OPEN_END)
+
+    # Free: never upgraded, or from the downgrade on; never for awesome shops
+    never_upgraded = upgraded == NULL_TS
+    has_downgrade = downgraded != NULL_TS
+    free_start = np.where(
+        never_upgraded,
+        active_start,
+        np.where(has_downgrade, np.maximum(active_start, downgraded), OPEN_END),
+    )
+    free_start = np.where(awesome_shop, OPEN_END, free_start)
+
+    # Awesome: the whole active life for awesome shops, else from upgrade until downgrade
+    paid_start = np.where(never_upgraded, OPEN_END, np.maximum(active_start, upgraded))
+    paid_end = np.minimum(active_end, np.where(has_downgrade, downgraded, OPEN_END))
+    awesome_start = np.where(awesome_shop, active_start, paid_start)
+    awesome_end = np.where(awesome_shop, active_end, paid_end)
+
+    return {
+        'total_users': (active_start, active_end),
+        'free_users': (free_start, active_end),
+        'awesome_users': (awesome_start, awesome_end),
+    }
+
+
+def _union_per_shop(shop: np.ndarray, start: np.ndarray, end: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Merge overlapping intervals of the same shop so each shop counts once."""
+    keep = start < end
+    shop, start, end = shop[keep], start[keep], end[keep]
+    if len(shop) == 0:
+        return start, end
+    order = np.lexsort((start, shop))
+    shop, start, end = shop[order], start[order], end[order]
+
+    new_shop = np.empty(len(shop), dtype=bool)
+    new_shop[0] = True
+    new_shop[1:] = shop[1:] != shop[:-1]
+    running_end = pd.Series(end).groupby(np.cumsum(new_shop)).cummax().to_numpy()
+    prev_end = np.empty_like(running_end)
+    prev_end[0] = NULL_TS
+    prev_end[1:] = running_end[:-1]
+    opens = new_shop | (start > prev_end)
+
+    first = np.flatnonzero(opens)
+    return start[first], np.maximum.reduceat(end, first)
+
+
+def _count_at(start: np.ndarray, end: np.ndarray, at: np.ndarray) -> np.ndarray:
+    """Number of intervals with start <= t < end for every t in ``at``."""
+    starts = np.sort(start)
+    ends = np.sort(end)
+    return np.searchsorted(starts, at, side='right') - np.searchsorted(ends, at, side='right')
+
+
+def plan_counts_at(ex: LifecycleExtract, at, shopify_only: bool = True) -> pd.DataFrame:
+    """Distinct active, free and awesome shops at each snapshot time in ``at``."""
+    at_ts = pd.DatetimeIndex(at)
+    at_i8 = at_ts.to_numpy(dtype='datetime64[ns]').view('i8')
+    mask = ex.is_shopify if shopify_only else np.ones(len(ex), dtype=bool)
+    shop = ex.shop_id[mask]
+
+    out = pd.DataFrame({'at': at_ts})
+    for name, (start, end) in _plan_intervals(ex, mask).items():
+        seg_start, seg_end = _union_per_shop(shop, start, end)
+        out[name] = _count_at(seg_start, seg_end, at_i8)
+    return out
+
+
+def period_end_snapshots(freq: str = 'month', periods: int = 12, today=None) -> pd.DatetimeIndex:
+    """Midnight of the last day of each of the ``periods`` complete periods before today."""
+    today = pd.Timestamp(today) if today is not None else pd.Timestamp.now(tz='UTC').tz_localize(None)
+    current = today.normalize().to_period(_FREQ_ALIASES[freq])
+    closed = pd.period_range(end=current - 1, periods=periods, freq=current.freq)
+    return closed.end_time.normalize()
+
+
+def _pct(num: pd.Series, den: pd.Series) -> pd.Series:
+    den = den.astype('float64')
+    return (num.astype('float64') / den.where(den > 0)).mul(100).round(2)
+
+
+def plan_metrics(ex: LifecycleExtract, freq: str = 'month', periods: int = 12, today=None) -> pd.DataFrame:
+    """Period-end user counts with period-over-period changes, oldest period first."""
+    at = period_end_snapshots(freq, periods, today)
+    df = plan_counts_at(ex, at)
+    df.insert(0, 'period_start', at.to_period(_FREQ_ALIASES[freq]).start_time)
+    df = df.drop(columns='at')
+
+    for plan in ('total', 'free', 'awesome'):
+        users = df[f'{plan}_users']
+        prev = users.shift(1)
+        df[f'{plan}_change'] = users - prev
+        df[f'{plan}_growth_rate_pct'] = _pct(users - prev, prev)
+    df['free_pct_of_total'] = _pct(df['free_users'], df['total_users'])
+    df['awesome_pct_of_total'] = _pct(df['awesome_users'], df['total_users'])
+    return df
+
+
+def monthly_user_metrics(ex: LifecycleExtract, months: int = 12, today=None) -> pd.DataFrame:
+    """Drop-in replacement for the result of ``monthly_core_metrics``."""
+    df = plan_metrics(ex, 'month', months, today)
+    df.insert(0, 'month', df.pop('period_start').dt.strftime('%Y-%m'))
+    columns = [
+        'month', 'total_users', 'free_users', 'awesome_users',
+        'total_change', 'free_change', 'awesome_change',
+        'total_growth_rate_pct', 'free_growth_rate_pct', 'awesome_growth_rate_pct',
+        'free_pct_of_total', 'awesome_pct_of_total',
+    ]
+    return df[columns].iloc[::-1].reset_index(drop=True)
@@ -0,0 +1,210 @@
+"""Mergeable quantile sketches (t-digest) for time-to-value distributions.
+
+A ``TDigest`` summarizes a distribution in at most a few hundred weighted
+centroids, kept small near the tails so extreme percentiles stay accurate.
+Digests merge exactly like the data they summarize, so weekly sketches per
+plan combine into month/quarter views, and percentiles, CDFs and means
+inside arbitrary outlier cut-offs are answered from the centroids alone.
+
+Compression assigns sorted points to buckets of the arcsine scale function
+(Dunning's k1), vectorized with ``np.add.reduceat`` instead of the usual
+per-point merge loop.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.engines.journeys import get_journey_store
+
+
+DEFAULT_COMPRESSION: float = 200.0
+PLANS: tuple[str, ...] = ('awesome', 'free', 'unknown')
+
+
+@dataclass
+class TDigest:
+    """Weighted centroids (sorted by mean) plus the exact min and max."""
+
+    means: np.ndarray = field(default_factory=lambda: np.empty(0))
+    weights: np.ndarray = field(default_factory=lambda: np.empty(0))
+    min: float = np.nan
+    max: float = np.nan
+    compression: float = DEFAULT_COMPRESSION
+
+    @classmethod
+    def from_values(cls, values, compression: float = DEFAULT_COMPRESSION) -> 'TDigest':
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return cls(compression=compression)
+        return cls._compressed(values, np.ones(len(values)), values.min(), values.max(), compression)
+
+    @classmethod
+    def _compressed(cls, means, weights, lo, hi, compression) -> 'TDigest':
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Bucket by the scale function at each centroid's left edge: a bucket
+        # spans one unit of k, so centroids are tiny near q=0 and q=1
+        q_left = (np.cumsum(weights) - weights) / total
+        k = compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+        bucket = np.floor(k - k[0]).astype('int64')
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+        return cls(merged_means, merged_weights, float(lo), float(hi), compression)
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def merge(self, *others: 'TDigest') -> 'TDigest':
+        digests = [d for d in (self, *others) if d.count > 0]
+        if not digests:
+            return TDigest(compression=self.compression)
+        return TDigest._compressed(
+            np.concatenate([d.means for d in digests]),
+            np.concatenate([d.weights for d in digests]),
+            min(d.min for d in digests),
+            max(d.max for d in digests),
+            self.compression,
+        )
+
+    def _knots(self) -> tuple[np.ndarray, np.ndarray]:
+        """Piecewise-linear CDF: values at the min, every centroid centre and the max."""
+        centers = np.cumsum(self.weights) - self.weights / 2
+        xs = np.concatenate([[self.min], self.means, [self.max]])
+        ranks = np.concatenate([[0.0], centers, [self.count]])
+        return xs, ranks
+
+    def cdf(self, x) -> np.ndarray:
+        """Estimated fraction of values <= ``x``."""
+        if self.count == 0:
+            return np.full(np.shape(x), np.nan)
+        xs, ranks = self._knots()
+        return np.interp(x, xs, ranks) / self.count
+
+    def cdf_below(self, x: float) -> float:
+        """Estimated fraction of values < ``x``: the CDF's left limit, excluding a point mass at ``x``."""
+        if self.count == 0:
+            return np.nan
+        xs, ranks = self._knots()
+        # First knot at or above x; repeated knots at x (ties) contribute nothing below it
+        i = int(np.searchsorted(xs, x, side='left'))
+        if i == 0:
+            return 0.0
+        if i == len(xs):
+            return 1.0
+        step = (x - xs[i - 1]) / (xs[i] - xs[i - 1])
+        return float(ranks[i - 1] + step * (ranks[i] - ranks[i - 1])) / self.count
+
+    def quantile(self, q, low: float | None = None, high: float | None = None) -> np.ndarray:
+        """Estimated ``q`` quantile(s), optionally of only the values inside [low, high]."""
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan)
+        # Both bounds are inclusive: values equal to ``low`` stay in
+        lo_q = self.cdf_below(low) if low is not None else 0.0
+        hi_q = float(self.cdf(high)) if high is not None else 1.0
+        if hi_q <= lo_q:
+            return np.full(np.shape(q), np.nan)
+        xs, ranks = self._knots()
+        target = (lo_q + np.asarray(q, dtype='float64') * (hi_q - lo_q)) * self.count
+        return np.interp(target, ranks, xs)
+
+    def trimmed_mean(self, low: float | None = None, high: float | None = None) -> float:
+        """Estimated mean of the values inside [low, high]."""
+        if self.count == 0:
+            return np.nan
+        xs, ranks = self._knots()
+        low = xs[0] if low is None else low
+        high = xs[-1] if high is None else high
+        # Mass between consecutive knots is spread evenly over the segment
+        left, right = xs[:-1], xs[1:]
+        mass = np.diff(ranks)
+        width = right - left
+        a, b = np.maximum(left, low), np.minimum(right, high)
+        point = width == 0
+        share = np.where(point, (left >= low) & (left <= high), np.clip(b - a, 0, None) / np.where(point, 1, width))
+        kept = mass * share
+        centre = np.where(point, left, (a + b) / 2)
+        total = kept.sum()
+        return float((kept * centre).sum() / total) if total > 0 else np.nan
+
+
+def merge_all(digests) -> TDigest:
+    digests = list(digests)
+    if not digests:
+        return TDigest()
+    return digests[0].merge(*digests[1:])
+
+
+def _plan(awesome: pd.Series) -> pd.Series:
+    return pd.Series(
+        np.select([awesome == '1', awesome == '0'], ['awesome', 'free'], default='unknown'),
+        index=awesome.index,
+    )
+
+
+def build_week_sketches(journeys: pd.DataFrame, compression: float = DEFAULT_COMPRESSION) -> dict[tuple[pd.Timestamp, str], TDigest]:
+    """One digest of ``days_to_first_review`` per (week, plan), without any outlier cut."""
+    if journeys.empty:
+        return {}
+    df = pd.DataFrame({
+        'week': pd.to_datetime(journeys['first_review_shown_date']).dt.to_period('W-SUN').dt.start_time,
+        'plan': _plan(journeys['awesome']),
+        'days': journeys['days_to_first_review'].astype('float64'),
+    })
+    return {
+        (week, plan): TDigest.from_values(group['days'].to_numpy(), compression)
+        for (week, plan), group in df.groupby(['week', 'plan'])
+    }
+
+
+def rollup_sketches(
+    sketches: dict[tuple[pd.Timestamp, str], TDigest],
+    freq: str = 'week',
+    plans: tuple[str, ...] = PLANS,
+) -> dict[pd.Timestamp, TDigest]:
+    """Merge week sketches of the chosen plans into week, month or quarter sketches.
+
+    Weeks are assigned to the month/quarter their Monday falls in.
+    """
+    grouped: dict[pd.Timestamp, list[TDigest]] = {}
+    for (week, plan), digest in sketches.items():
+        if plan not in plans:
+            continue
+        period = week if freq == 'week' else week.to_period({'month': 'M', 'quarter': 'Q'}[freq]).start_time
+        grouped.setdefault(period, []).append(digest)
+    return {period: merge_all(digests) for period, digests in sorted(grouped.items())}
+
+
+def distribution_table(
+    sketches: dict[pd.Timestamp, TDigest],
+    percentiles=(50, 75, 90, 99),
+    low: float | None = 0,
+    high: float | None = 180,
+) -> pd.DataFrame:
+    """Percentiles and trimmed mean per period, within the [low, high] outlier cut."""
+    q = np.asarray(percentiles, dtype='float64') / 100
+    rows = []
+    for period, digest in sketches.items():
+        row = {'period': period, 'shops': int(digest.count), 'mean_days': digest.trimmed_mean(low, high)}
+        row.update({f'p{p:g}': v for p, v in zip(percentiles, digest.quantile(q, low, high))})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _sketches_for(watermark: pd.Timestamp | None, _journeys: pd.DataFrame) -> dict:
+    return build_week_sketches(_journeys)
+
+
+def journey_week_sketches() -> dict[tuple[pd.Timestamp, str], TDigest]:
+    """Week x plan sketches of the journey store, rebuilt only when the store refreshes."""
+    store = get_journey_store()
+    store.ensure_fresh()
+    return _sketches_for(store.watermark, store.journeys)
@@ -0,0 +1,293 @@
+"""Revenue ledger engine.
+
+Replays Awesome plan upgrade and downgrade events into a daily MRR ledger:
+one row per MRR change with its day, shop, movement type and delta, kept as
+compact numpy arrays and persisted locally. Each refresh only fetches events
+after the watermark (the newest event already applied) and replays them on
+top of the stored per-shop state; a periodic full rebuild picks up late or
+corrected events.
+
+Movement types follow the usual MRR bridge:
+
+* new: a shop's first paid month
+* reactivation: paid again after having churned
+* expansion / contraction: a paid shop's MRR going up / down
+* churned: MRR going to zero
+
+Awesome is a single flat plan (``AWESOME_MRR``, the same $15/month the LTV
+queries use), so expansion and contraction stay zero until plans carry
+prices; repeated upgrades of an already paying shop are not movements.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.db.redshift_connection import run_query_uncached
+from src.engines.rollup import rollup
+from src.sql.finance.revenue_events import revenue_events
+
+
+AWESOME_MRR: int = 15
+MOVEMENTS: tuple[str, ...] = ('new', 'reactivation', 'expansion', 'contraction', 'churned')
+
+LEDGER_DIR: Path = Path('.cache/revenue')
+REFRESH_INTERVAL: pd.Timedelta = pd.Timedelta(hours=1)
+FULL_REBUILD_INTERVAL: pd.Timedelta = pd.Timedelta(days=7)
+
+_NS_PER_DAY = 86_400 * 10**9
+_EPOCH = pd.Timestamp('1970-01-01')
+
+_ARRAYS = ('day', 'shop_id', 'kind', 'delta', 'state_shop', 'state_mrr', 'state_ever_paid')
+
+
+def _utcnow() -> pd.Timestamp:
+    return pd.Timestamp.now(tz='UTC').tz_localize(None)
+
+
+def _day_of(ts) -> int:
+    return int(pd.Timestamp(ts).normalize().value // _NS_PER_DAY)
+
+
+def replay(
+    shop_id: np.ndarray,
+    ts_i8: np.ndarray,
+    direction: np.ndarray,
+    state_shop: np.ndarray,
+    state_mrr: np.ndarray,
+    state_ever_paid: np.ndarray,
+) -> tuple[dict[str, np.ndarray], tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Ledger rows for a non-empty batch of events, plus the per-shop state after it.
+
+    ``state_*`` is the state before the batch, sorted by shop. Events are
+    applied per shop in time order, downgrades before upgrades at equal
+    timestamps.
+    """
+    order = np.lexsort((direction, ts_i8, shop_id))
+    shop, ts, direction = shop_id[order], ts_i8[order], direction[order]
+    mrr_after = np.where(direction > 0, AWESOME_MRR, 0).astype('int32')
+    paid = mrr_after > 0
+
+    first = np.empty(len(shop), dtype=bool)
+    first[:1] = True
+    first[1:] = shop[1:] != shop[:-1]
+    group = np.cumsum(first) - 1
+
+    # State carried in from earlier batches for each shop's first event
+    if len(state_shop):
+        pos = np.minimum(np.searchsorted(state_shop, shop), len(state_shop) - 1)
+        known = state_shop[pos] == shop
+        prior_mrr = np.where(known, state_mrr[pos], 0).astype('int32')
+        prior_ever_paid = known & state_ever_paid[pos]
+    else:
+        prior_mrr = np.zeros(len(shop), dtype='int32')
+        prior_ever_paid = np.zeros(len(shop), dtype=bool)
+
+    prev_mrr = np.empty_like(mrr_after)
+    prev_mrr[1:] = mrr_after[:-1]
+    prev_mrr[first] = prior_mrr[first]
+    paid_before = pd.Series(paid).groupby(group).cumsum().to_numpy() - paid
+    ever_paid = (paid_before > 0) | prior_ever_paid
+
+    delta = mrr_after - prev_mrr
+    kind = np.select(
+        [
+            (delta > 0) & (prev_mrr == 0) & ~ever_paid,
+            (delta > 0) & (prev_mrr == 0),
+            delta > 0,
+            (delta < 0) & (mrr_after > 0),
+        ],
+        [0, 1, 2, 3],
+        default=4,
+    ).astype('int8')
+    moved = delta != 0
+    rows = {
+        'day': np.floor_divide(ts[moved], _NS_PER_DAY).astype('int32'),
+        'shop_id': shop[moved],
+        'kind': kind[moved],
+        'delta': delta[moved].astype('int32'),
+    }
+
+    # New state: untouched shops keep theirs, batch shops take their last event
+    last = np.r_[first[1:], True]
+    batch_shop = shop[last]
+    batch_mrr = mrr_after[last]
+    batch_ever_paid = np.logical_or.reduceat(paid, np.flatnonzero(first)) | prior_ever_paid[first]
+    untouched = ~np.isin(state_shop, batch_shop)
+    new_shop = np.concatenate([state_shop[untouched], batch_shop])
+    new_order = np.argsort(new_shop, kind='stable')
+    state = (
+        new_shop[new_order],
+        np.concatenate([state_mrr[untouched], batch_mrr])[new_order],
+        np.concatenate([state_ever_paid[untouched], batch_ever_paid])[new_order],
+    )
+    return rows, state
+
+
+class RevenueLedger:
+    """MRR movements plus per-shop plan state, persisted under ``directory``."""
+
+    def __init__(self, directory: Path = LEDGER_DIR) -> None:
+        self.directory = directory
+        self.day = np.empty(0, dtype='int32')
+        self.shop_id = np.empty(0, dtype='int64')
+        self.kind = np.empty(0, dtype='int8')
+        self.delta = np.empty(0, dtype='int32')
+        self.state_shop = np.empty(0, dtype='int64')
+        self.state_mrr = np.empty(0, dtype='int32')
+        self.state_ever_paid = np.empty(0, dtype=bool)
+        self.watermark: pd.Timestamp | None = None
+        self.built_at: pd.Timestamp | None = None
+        self.refreshed_at: pd.Timestamp | None = None
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def _path(self) -> Path:
+        return self.directory / 'ledger.npz'
+
+    def _load(self) -> None:
+        try:
+            with np.load(self._path) as data:
+                arrays = {name: data[name] for name in _ARRAYS}
+                watermark = pd.Timestamp(int(data['watermark']))
+                built_at = pd.Timestamp(int(data['built_at']))
+        except (OSError, ValueError, KeyError):
+            return
+        for name, values in arrays.items():
+            setattr(self, name, values)
+        self.watermark, self.built_at = watermark, built_at
+
+    def _save(self) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_suffix(f'.tmp{os.getpid()}.npz')
+            np.savez_compressed(
+                tmp,
+                watermark=self.watermark.value,
+                built_at=self.built_at.value,
+                **{name: getattr(self, name) for name in _ARRAYS},
+            )
+            os.replace(tmp, self._path)
+        except OSError:
+            # The in-memory ledger still works; the next process just rebuilds
+            pass
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    def _refresh(self, full: bool) -> None:
+        started = _utcnow()
+        full = full or self.watermark is None or self.built_at is None or (
+            started - self.built_at > FULL_REBUILD_INTERVAL
+        )
+        if full:
+            for name in _ARRAYS:
+                setattr(self, name, getattr(self, name)[:0])
+            since = _EPOCH
+        else:
+            since = self.watermark
+
+        events = run_query_uncached(revenue_events.format(since=since.strftime('%Y-%m-%d %H:%M:%S.%f')))
+        if not events.empty:
+            ts = pd.to_datetime(events['created_at']).to_numpy(dtype='datetime64[ns]').view('i8')
+            rows, (self.state_shop, self.state_mrr, self.state_ever_paid) = replay(
+                events['shop_id'].to_numpy(dtype='int64'),
+                ts,
+                events['direction'].to_numpy(dtype='int64'),
+                self.state_shop,
+                self.state_mrr,
+                self.state_ever_paid,
+            )
+            order = np.argsort(np.concatenate([self.day, rows['day']]), kind='stable')
+            for name in ('day', 'shop_id', 'kind', 'delta'):
+                setattr(self, name, np.concatenate([getattr(self, name), rows[name]])[order])
+            self.watermark = pd.Timestamp(int(ts.max()))
+        elif self.watermark is None:
+            self.watermark = _EPOCH
+
+        if full:
+            self.built_at = started
+        self.refreshed_at = started
+        self._save()
+
+    def refresh(self, full: bool = False) -> None:
+        """Replay events after the watermark (or every event when ``full``)."""
+        with self._lock:
+            self._refresh(full)
+
+    def ensure_fresh(self) -> None:
+        """Refresh unless another session did so within ``REFRESH_INTERVAL``."""
+        with self._lock:
+            if self.refreshed_at is None or _utcnow() - self.refreshed_at > REFRESH_INTERVAL:
+                self._refresh(full=False)
+
+    def daily(self, today=None) -> pd.DataFrame:
+        """MRR movement per type and day, from the first ledger day up to yesterday."""
+        today = pd.Timestamp(today) if today is not None else _utcnow()
+        if len(self) == 0:
+            return pd.DataFrame(columns=['date', *MOVEMENTS, 'net_new_mrr'])
+        first = int(self.day.min())
+        days = max(_day_of(today) - first, int(self.day.max()) - first + 1)
+        width = len(MOVEMENTS)
+        sums = np.bincount(
+            (self.day.astype('int64') - first) * width + self.kind,
+            weights=self.delta,
+            minlength=days * width,
+        )[:days * width].reshape(days, width).astype('int64')
+        df = pd.DataFrame(sums, columns=list(MOVEMENTS))
+        df.insert(0, 'date', pd.date_range(_EPOCH + pd.Timedelta(days=first), periods=days, freq='D'))
+        df['net_new_mrr'] = sums.sum(axis=1)
+        return df
+
+    def mrr_at(self, at) -> np.ndarray:
+        """MRR at the start of each day in ``at``."""
+        at_day = (pd.DatetimeIndex(at).normalize() - _EPOCH).days.to_numpy()
+        running = np.concatenate([[0], np.cumsum(self.delta, dtype='int64')])
+        return running[np.searchsorted(self.day, at_day, side='left')]
+
+
+@st.cache_resource(show_spinner=False)
+def get_revenue_ledger() -> RevenueLedger:
+    return RevenueLedger()
+
+
+def mrr_movements(ledger: RevenueLedger, freq: str = 'month', periods: int | None = None, today=None) -> pd.DataFrame:
+    """MRR bridge per complete period, oldest first: starting MRR, movements, ending MRR and ARR."""
+    daily = ledger.daily(today)
+    out = rollup(daily, freq, metrics=[*MOVEMENTS, 'net_new_mrr'], today=today)
+    if periods is not None:
+        out = out.tail(periods).reset_index(drop=True)
+    out = out.drop(columns='days')
+    ends = out['period_start'].dt.to_period({'week': 'W-SUN', 'month': 'M', 'quarter': 'Q', 'year': 'Y'}[freq]) + 1
+    out.insert(1, 'starting_mrr', ledger.mrr_at(out['period_start']))
+    out['ending_mrr'] = ledger.mrr_at(ends.dt.start_time)
+    out['ending_arr'] = 12 * out['ending_mrr']
+    # Churned and contraction deltas are negative; report them as positive amounts
+    out[['contraction', 'churned']] = -out[['contraction', 'churned']]
+    return out
+
+
+def movements_between(ledger: RevenueLedger, start, end) -> dict:
+    """MRR bridge for the days in [start, end]."""
+    start = pd.Timestamp(start).normalize()
+    stop = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+    lo, hi = np.searchsorted(ledger.day, [_day_of(start), _day_of(stop)], side='left')
+    sums = np.bincount(ledger.kind[lo:hi], weights=ledger.delta[lo:hi], minlength=len(MOVEMENTS)).astype('int64')
+    out = {'starting_mrr': int(ledger.mrr_at([start])[0])}
+    out.update({kind: int(abs(value)) for kind, value in zip(MOVEMENTS, sums)})
+    out['net_new_mrr'] = int(sums.sum())
+    out['ending_mrr'] = int(ledger.mrr_at([stop])[0])
+    return out
+
+
+def revenue_ledger() -> RevenueLedger:
+    """Refresh the shared ledger if due and return it."""
+    ledger = get_revenue_ledger()
+    ledger.ensure_fresh()
+    return ledger
@@ -0,0 +1,131 @@
+"""Rollups of additive facts to coarser calendar grains.
+
+Takes a frame of additive metrics (counts, sums) at day or week grain and
+produces week, month, quarter, year or rolling-window aggregates locally, so
+each fact is fetched from the warehouse once at its finest grain instead of
+once per granularity (``*_wow`` / ``*_mom`` query pairs).
+
+Weeks start on Monday, as with ``DATE_TRUNC('week', ...)``. Week-grain input
+rolled up to months, quarters or years is split calendar-correctly: a week
+straddling a boundary contributes each of its days' share (1/7) to the
+period that day falls in. Day-grain input needs no split and is exact.
+
+Ratios are not additive; pass them as ``ratios`` and they are recomputed
+from the summed numerator and denominator.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+FREQS: tuple[str, ...] = ('week', 'month', 'quarter', 'year')
+GRAINS: tuple[str, ...] = ('day', 'week')
+
+_PERIOD_ALIASES = {'day': 'D', 'week': 'W-SUN', 'month': 'M', 'quarter': 'Q', 'year': 'Y'}
+
+
+def period_start(dates, freq: str) -> pd.DatetimeIndex:
+    """Start of the calendar period (Monday weeks) containing each date."""
+    if freq not in _PERIOD_ALIASES:
+        raise ValueError(f'Unknown freq {freq!r}; expected one of {tuple(_PERIOD_ALIASES)}')
+    return pd.DatetimeIndex(dates).normalize().to_period(_PERIOD_ALIASES[freq]).start_time
+
+
+def _daily(facts: pd.DataFrame, date_col: str, metrics: list[str], grain: str) -> pd.DataFrame:
+    """Facts spread over a complete daily calendar, zero where there are no rows."""
+    if grain not in GRAINS:
+        raise ValueError(f'Unknown grain {grain!r}; expected one of {GRAINS}')
+    dates = pd.DatetimeIndex(pd.to_datetime(facts[date_col])).normalize()
+    values = facts[metrics].to_numpy(dtype='float64')
+    if grain == 'week':
+        # Each week row becomes seven day rows carrying a seventh of its values
+        dates = pd.DatetimeIndex(
+            np.repeat(period_start(dates, 'week').to_numpy(), 7)
+            + np.tile(np.arange(7), len(dates)).astype('timedelta64[D]')
+        )
+        values = np.repeat(values, 7, axis=0) / 7
+
+    daily = pd.DataFrame(values, columns=metrics).groupby(dates.to_numpy()).sum()
+    if daily.empty:
+        return daily
+    calendar = pd.date_range(daily.index.min(), daily.index.max(), freq='D')
+    return daily.reindex(calendar, fill_value=0.0)
+
+
+def _integral(df: pd.DataFrame, facts: pd.DataFrame, metrics: list[str], grain: str) -> pd.DataFrame:
+    # Keep integer metrics integer when no fractional split happened
+    if grain == 'day':
+        for col in metrics:
+            if pd.api.types.is_integer_dtype(facts[col]):
+                df[col] = df[col].round().astype('int64')
+    return df
+
+
+def with_ratios(df: pd.DataFrame, ratios: dict[str, tuple[str, str]] | None) -> pd.DataFrame:
+    """Recompute ``ratio = 100 * numerator / denominator`` (NaN for empty denominators)."""
+    for name, (num, den) in (ratios or {}).items():
+        den_values = df[den].astype('float64')
+        df[name] = (100.0 * df[num] / den_values.where(den_values > 0)).round(2)
+    return df
+
+
+def rollup(
+    facts: pd.DataFrame,
+    freq: str = 'month',
+    metrics: list[str] | None = None,
+    date_col: str = 'date',
+    grain: str = 'day',
+    ratios: dict[str, tuple[str, str]] | None = None,
+    complete_only: bool = True,
+    today=None,
+) -> pd.DataFrame:
+    """Sum additive ``metrics`` per calendar period, oldest period first.
+
+    ``metrics`` defaults to every numeric column. The result has one row per
+    period between the first and last fact (empty periods are zeros), with
+    ``days`` giving how many of the period's days the facts cover. With
+    ``complete_only`` periods the facts only partly cover, and the period
+    containing ``today``, are dropped.
+    """
+    if freq not in FREQS:
+        raise ValueError(f'Unknown freq {freq!r}; expected one of {FREQS}')
+    if metrics is None:
+        metrics = [c for c in facts.columns if c != date_col and pd.api.types.is_numeric_dtype(facts[c])]
+    daily = _daily(facts, date_col, metrics, grain)
+    if daily.empty:
+        return pd.DataFrame(columns=['period_start', 'days', *metrics])
+
+    starts = period_start(daily.index, freq)
+    grouped = daily.groupby(starts.to_numpy())
+    out = grouped.sum()
+    out.insert(0, 'days', grouped.size())
+    out.index.name = 'period_start'
+    out = out.reset_index()
+
+    if complete_only:
+        today = pd.Timestamp(today) if today is not None else pd.Timestamp.now(tz='UTC').tz_localize(None)
+        periods = out['period_start'].dt.to_period(_PERIOD_ALIASES[freq])
+        length = ((periods + 1).dt.start_time - periods.dt.start_time).dt.days
+        out = out[(out['days'] == length) & (out['period_start'] < period_start([today], freq)[0])]
+
+    out = _integral(out.reset_index(drop=True), facts, metrics, grain)
+    return with_ratios(out, ratios)
+
+
+def rolling(
+    facts: pd.DataFrame,
+    window_days: int = 28,
+    metrics: list[str] | None = None,
+    date_col: str = 'date',
+    grain: str = 'day',
+    ratios: dict[str, tuple[str, str]] | None = None,
+) -> pd.DataFrame:
+    """Trailing ``window_days`` sums ending on each day the facts fully cover."""
+    if metrics is None:
+        metrics = [c for c in facts.columns if c != date_col and pd.api.types.is_numeric_dtype(facts[c])]
+    daily = _daily(facts, date_col, metrics, grain)
+    out = daily.rolling(window_days, min_periods=window_days).sum().dropna()
+    out.index.name = 'window_end'
+    out = _integral(out.reset_index(), facts, metrics, grain)
+    return with_ratios(out, ratios)
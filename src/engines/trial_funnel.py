@@ -0,0 +1,157 @@
+"""Trial funnel engine.
+
+Completed trials, conversions and CVR per trial week and campaign type, in
+long format, computed from a trial-start extract and the lifecycle extract.
+It replaces the ``weekly_trial_starts`` / ``trial_conversions`` /
+``trial_conversion_pivot`` CTEs that ``core_metrics`` used to run.
+
+Campaign types come from ``CAMPAIGN_RULES``, the SQL ``LIKE`` chain as data:
+the first rule whose patterns match wins. Each distinct handle is classified
+once, so adding a campaign type is a one-line rule change with no new SQL.
+
+Counting mirrors the SQL, including its join multiplicity: a trial is
+counted once per core extension row of the shop that was not deleted before
+the trial started (and once when there is none).
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.db.datasets import Dataset, load_dataset
+from src.engines.lifecycle import LifecycleExtract
+from src.sql.upgrade.trial_starts import trial_starts_extract
+
+
+DEFAULT_LOOKBACK_WEEKS: int = 30
+OTHER_CAMPAIGN: str = 'other'
+
+
+@dataclass(frozen=True)
+class CampaignRule:
+    """``campaign`` applies when any ``like`` pattern matches and no ``not_like`` does."""
+
+    campaign: str
+    like: tuple[str, ...]
+    not_like: tuple[str, ...] = ()
+
+
+CAMPAIGN_RULES: tuple[CampaignRule, ...] = (
+    CampaignRule('home', ('%home%',)),
+    CampaignRule('upsell', ('%upsell%',)),
+    CampaignRule('optin', ('%opt-in%',), ('%home%',)),
+    CampaignRule('article', ('%article%',)),
+    CampaignRule('welcome', ('%welcome%',), ('%opt-in%',)),
+    CampaignRule('cs', ('%cs_%', '%cs-%')),
+)
+
+
+def like_to_regex(pattern: str) -> re.Pattern:
+    """Compile a SQL ``LIKE`` pattern (case-sensitive, ``%`` and ``_`` wildcards)."""
+    parts = []
+    for char in pattern:
+        if char == '%':
+            parts.append('.*')
+        elif char == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(char))
+    return re.compile(''.join(parts), re.DOTALL)
+
+
+_COMPILED_RULES = tuple(
+    (
+        rule.campaign,
+        tuple(like_to_regex(p) for p in rule.like),
+        tuple(like_to_regex(p) for p in rule.not_like),
+    )
+    for rule in CAMPAIGN_RULES
+)
+
+
+@lru_cache(maxsize=4096)
+def classify_handle(handle: str | None) -> str:
+    """Campaign type for one ``trial_campaign_handle``."""
+    if handle is None:
+        # LIKE on NULL is never true in SQL
+        return OTHER_CAMPAIGN
+    for campaign, like, not_like in _COMPILED_RULES:
+        if any(p.fullmatch(handle) for p in like) and not any(p.fullmatch(handle) for p in not_like):
+            return campaign
+    return OTHER_CAMPAIGN
+
+
+def classify_handles(handles: pd.Series) -> pd.Series:
+    """Vectorized ``classify_handle``: each distinct handle is classified once."""
+    codes, uniques = pd.factorize(handles, use_na_sentinel=True)
+    labels = np.array([classify_handle(h) for h in uniques] + [OTHER_CAMPAIGN], dtype=object)
+    # Sentinel -1 (missing handle) indexes the trailing OTHER_CAMPAIGN
+    return pd.Series(labels[codes], index=handles.index, name='campaign_type')
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _trial_starts_for(version: str, _dataset: Dataset) -> pd.DataFrame:
+    df = _dataset.view()
+    df['trial_start_date'] = pd.to_datetime(df['trial_start_date'])
+    df['trial_expiration_date'] = pd.to_datetime(df['trial_expiration_date'])
+    df['campaign_type'] = classify_handles(df['trial_campaign_handle'])
+    return df
+
+
+def load_trial_starts_frame() -> pd.DataFrame:
+    """Trial starts with their campaign type resolved, keyed on ``load_dataset(trial_starts_extract).version``."""
+    dataset = load_dataset(trial_starts_extract)
+    return _trial_starts_for(dataset.version, dataset)
+
+
+def trial_funnel(
+    trials: pd.DataFrame,
+    ex: LifecycleExtract,
+    today=None,
+    lookback_weeks: int = DEFAULT_LOOKBACK_WEEKS,
+) -> pd.DataFrame:
+    """Completed trials, conversions and CVR per ``trial_week`` and ``campaign_type``."""
+    today = pd.Timestamp(today) if today is not None else pd.Timestamp.now(tz='UTC').tz_localize(None)
+    today = today.normalize()
+    current_week = today - pd.Timedelta(days=today.weekday())
+
+    trials = trials[trials['trial_start_date'] >= today - pd.Timedelta(weeks=lookback_weeks)]
+    trials = trials.assign(trial_week=trials['trial_start_date'].dt.to_period('W-SUN').dt.start_time)
+    trials = trials[trials['trial_week'] < current_week].reset_index(drop=True)
+    trials['trial_row'] = np.arange(len(trials))
+
+    extensions = pd.DataFrame({
+        'shop_id': ex.shop_id,
+        'upgraded_at': ex.upgraded_at.view('datetime64[ns]'),
+        'downgraded_at': ex.downgraded_at.view('datetime64[ns]'),
+        'deleted_at': ex.deleted_at.view('datetime64[ns]'),
+    })
+    extensions = extensions[extensions['shop_id'].isin(trials['shop_id'])]
+
+    # LEFT JOIN ... ON shop AND (deleted_at IS NULL OR deleted_at > trial_start_date)
+    joined = trials.merge(extensions, on='shop_id', how='inner')
+    joined = joined[joined['deleted_at'].isna() | (joined['deleted_at'] > joined['trial_start_date'])]
+    unmatched = trials[~trials['trial_row'].isin(joined['trial_row'])]
+    joined = pd.concat([joined, unmatched], ignore_index=True)
+
+    expiry = joined['trial_expiration_date']
+    completed = expiry < today
+    converted = (
+        joined['upgraded_at'].notna()
+        & (joined['downgraded_at'].isna() | (joined['downgraded_at'] > expiry))
+        & (joined['deleted_at'].isna() | (joined['deleted_at'] > expiry))
+        & completed
+    )
+    out = (
+        joined.assign(completed_trials=completed.astype('int64'), successful_conversions=converted.astype('int64'))
+        .groupby(['trial_week', 'campaign_type'], as_index=False)[['completed_trials', 'successful_conversions']]
+        .sum()
+    )
+    completed_trials = out['completed_trials'].astype('float64')
+    out['cvr_pct'] = (100.0 * out['successful_conversions'] / completed_trials.where(completed_trials > 0)).round(2)
+    return out.sort_values(['trial_week', 'campaign_type']).reset_index(drop=True)
@@ -0,0 +1,141 @@
+"""Upgrade classification engine.
+
+Labels every recent upgrade as "Shop Reopened", "Free Trial" or "Direct
+Upgrade" with as-of lookups (``pd.merge_asof`` by shop) against sorted
+downgrade and trial-start events. It replaces the inequality self-joins of
+the ``prior_downgrades`` / ``recent_trials`` CTEs that ``core_metrics`` used
+to run; the upgrade and home pages add its weekly counts to ``core_metrics``
+with ``with_upgrade_breakdown``.
+
+The rules match the SQL exactly:
+
+* reopened: some extension row of the shop was created and downgraded
+  before the upgrade. As in the SQL this is decided per (shop, week), so
+  every upgrade of that shop in that week counts as reopened.
+* free trial: a trial started strictly before the upgrade and strictly after
+  ``upgraded_at - trial_window``.
+* direct: everything else.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.db.datasets import Dataset, load_dataset
+from src.engines.lifecycle import NULL_TS, LifecycleExtract
+from src.sql.growth.lifecycle import lifecycle_extract
+from src.sql.upgrade.shop_trials import shop_trials_extract
+
+
+UPGRADE_TYPES: tuple[str, ...] = ('Direct Upgrade', 'Free Trial', 'Shop Reopened')
+# Weekly count columns of each type, in UPGRADE_TYPES order
+UPGRADE_COLUMNS: tuple[str, ...] = ('direct_upgrades', 'trial_conversions', 'reopened_shops')
+DEFAULT_TRIAL_WINDOW: pd.Timedelta = pd.Timedelta(days=30)
+DEFAULT_LOOKBACK_WEEKS: int = 30
+
+
+@dataclass(frozen=True)
+class TrialStarts:
+    """Trial start events as int64 arrays (timestamps in ns)."""
+
+    shop_id: np.ndarray
+    created_at: np.ndarray
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'TrialStarts':
+        shop_id = df['shop_id'].to_numpy(dtype='int64')
+        created_at = pd.to_datetime(df['created_at']).to_numpy(dtype='datetime64[ns]').view('i8')
+        for values in (shop_id, created_at):
+            values.setflags(write=False)
+        return cls(shop_id=shop_id, created_at=created_at)
+
+
+def _ts(values: np.ndarray) -> np.ndarray:
+    return values.view('datetime64[ns]')
+
+
+def recent_upgrades(ex: LifecycleExtract, today=None, lookback_weeks: int = DEFAULT_LOOKBACK_WEEKS) -> pd.DataFrame:
+    """Upgrades since ``today - lookback_weeks``, excluding the current week."""
+    today = pd.Timestamp(today) if today is not None else pd.Timestamp.now(tz='UTC').tz_localize(None)
+    today = today.normalize()
+    current_week = today - pd.Timedelta(days=today.weekday())
+    since = today - pd.Timedelta(weeks=lookback_weeks)
+
+    upgraded = _ts(ex.upgraded_at)
+    keep = (ex.upgraded_at != NULL_TS) & (upgraded >= since.to_datetime64())
+    df = pd.DataFrame({'shop_id': ex.shop_id[keep], 'upgraded_at': upgraded[keep]})
+    df['week_start'] = df['upgraded_at'].dt.to_period('W-SUN').dt.start_time
+    return df[df['week_start'] < current_week].reset_index(drop=True)
+
+
+def classify_upgrades(
+    ex: LifecycleExtract,
+    trials: TrialStarts,
+    today=None,
+    lookback_weeks: int = DEFAULT_LOOKBACK_WEEKS,
+    trial_window: pd.Timedelta = DEFAULT_TRIAL_WINDOW,
+) -> pd.DataFrame:
+    """One row per recent upgrade with its ``upgrade_type``."""
+    upgrades = recent_upgrades(ex, today, lookback_weeks)
+    upgrades['row'] = np.arange(len(upgrades))
+    upgrades = upgrades.sort_values('upgraded_at', kind='stable')
+
+    # A downgrade row counts once both its creation and downgrade precede the upgrade
+    has_downgrade = (ex.downgraded_at != NULL_TS) & (ex.created_at != NULL_TS)
+    downgrades = pd.DataFrame({
+        'shop_id': ex.shop_id[has_downgrade],
+        'downgrade_key': _ts(np.maximum(ex.created_at, ex.downgraded_at)[has_downgrade]),
+    }).sort_values('downgrade_key', kind='stable')
+    trial_df = pd.DataFrame({
+        'shop_id': trials.shop_id,
+        'trial_started_at': _ts(trials.created_at),
+    }).sort_values('trial_started_at', kind='stable')
+
+    asof = dict(left_on='upgraded_at', by='shop_id', direction='backward', allow_exact_matches=False)
+    upgrades = pd.merge_asof(upgrades, downgrades, right_on='downgrade_key', **asof)
+    upgrades = pd.merge_asof(upgrades, trial_df, right_on='trial_started_at', **asof)
+    upgrades = upgrades.sort_values('row').drop(columns='row').reset_index(drop=True)
+
+    reopened = upgrades['downgrade_key'].notna().groupby(
+        [upgrades['shop_id'], upgrades['week_start']]
+    ).transform('any')
+    trial = upgrades['trial_started_at'] > upgrades['upgraded_at'] - trial_window
+
+    upgrades['upgrade_type'] = np.select(
+        [reopened.to_numpy(), trial.to_numpy()],
+        ['Shop Reopened', 'Free Trial'],
+        default='Direct Upgrade',
+    )
+    return upgrades[['week_start', 'shop_id', 'upgraded_at', 'upgrade_type']]
+
+
+def upgrade_breakdown(classified: pd.DataFrame) -> pd.DataFrame:
+    """Weekly counts per upgrade type, shaped like the ``upgrade_breakdown`` query."""
+    counts = pd.crosstab(classified['week_start'], classified['upgrade_type'])
+    counts = counts.reindex(columns=list(UPGRADE_TYPES), fill_value=0)
+    counts.columns = list(UPGRADE_COLUMNS)
+    return counts.sort_index(ascending=False).reset_index()
+
+
+@st.cache_resource(ttl='1h', max_entries=2, show_spinner=False)
+def _breakdown_for(lifecycle_version: str, trials_version: str, _lifecycle: Dataset, _trials: Dataset) -> Dataset:
+    ex = LifecycleExtract.from_frame(_lifecycle.view())
+    trials = TrialStarts.from_frame(_trials.view())
+    frame = upgrade_breakdown(classify_upgrades(ex, trials))
+    return Dataset(frame, version=f'{lifecycle_version}+{trials_version}')
+
+
+def load_upgrade_breakdown() -> Dataset:
+    """Weekly upgrade counts by type, rebuilt only when either extract is fetched again."""
+    lifecycle = load_dataset(lifecycle_extract)
+    trials = load_dataset(shop_trials_extract)
+    return _breakdown_for(lifecycle.version, trials.version, lifecycle, trials)
+
+
+def with_upgrade_breakdown(core: pd.DataFrame, breakdown: pd.DataFrame) -> pd.DataFrame:
+    """``core`` (weekly, ``week`` parsed) plus the ``UPGRADE_COLUMNS``; weeks without upgrades count 0."""
+    counts = breakdown.set_index('week_start').reindex(pd.DatetimeIndex(core['week']), fill_value=0)
+    return core.assign(**{column: counts[column].to_numpy() for column in UPGRADE_COLUMNS})
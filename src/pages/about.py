@@ -1,5 +1,10 @@
+import pandas as pd
 import streamlit as st
 
+from src.app.boot import boot
+from src.db.normalize import normalize_reports
+from src.utils.formatting import column_formats
+
 
 def about_page() -> None:
     st.title('About')
@@ -9,6 +14,48 @@ def about_page() -> None:
     # link to google doc
     st.write('https://docs.google.com/spreadsheets/d/1GXRbXjlpIa9r3z85wr_sUmue_V9-7XSzjiFb_opYOvk/edit?gid=730103567#gid=730103567')
 
+    # Startup report for this server process
+    st.subheader('Startup')
+    status = boot()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric(
+        'Startup', f"{status.startup_seconds:.1f}s",
+        help='From process start to the end of the warm-up, which runs on the first signed-in visit',
+    )
+    c2.metric('Boot warm-up', f"{status.boot_seconds:.1f}s")
+    c3.metric(
+        'First warm page',
+        f"{status.first_page_seconds:.1f}s" if status.first_page_seconds is not None else '—',
+    )
+    c4.metric('Snapshots restored', f"{status.snapshots_restored:,}")
+    st.caption(f"Hot datasets resident: {', '.join(status.warmed) or 'none'}")
+    if not status.ready:
+        st.warning('Warm-up incomplete: some hot datasets load on first use instead.')
+    if status.errors:
+        with st.expander('Warm-up errors'):
+            for name, error in status.errors.items():
+                st.write(f"**{name}**: {error}")
+
+    # Memory saved by the fetch-time dtype normalization, per dataset fetched by this process
+    reports = normalize_reports()
+    if reports:
+        st.subheader('Dataset memory')
+        table = pd.DataFrame({
+            'Dataset': list(reports),
+            'Rows': [r.rows for r in reports.values()],
+            'Fetched MB': [r.bytes_before / 2**20 for r in reports.values()],
+            'Normalized MB': [r.bytes_after / 2**20 for r in reports.values()],
+            'Converted columns': [', '.join(f'{c}: {d}' for c, d in r.converted.items()) for r in reports.values()],
+        })
+        table['Saved %'] = (1 - table['Normalized MB'] / table['Fetched MB']) * 100
+        saved = sum(r.bytes_saved for r in reports.values()) / 2**20
+        st.caption(f"{saved:,.1f} MB saved across {len(reports)} datasets")
+        st.dataframe(
+            table,
+            hide_index=True,
+            column_config=column_formats({'Rows': 'localized', 'Fetched MB': '%.2f', 'Normalized MB': '%.2f', 'Saved %': 'percent'}),
+        )
+
 
 
     # growth target
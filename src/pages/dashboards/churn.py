@@ -1,14 +1,103 @@
 import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from src.engines.cohorts import cohort_retention, retention_curve
 
 
 def churn_page() -> None:
     st.title('Churn')
-    st.info('Churn metrics coming soon.')
-    st.selectbox('Churn', ['Churn', 'Churn Rate'])
+    st.caption('Share of each install cohort still installed (or still on Awesome) by age since install (or upgrade)')
+
+    ctrl1, ctrl2, ctrl3, ctrl4 = st.columns(4)
+    with ctrl1:
+        granularity = st.selectbox('Cohort', ['Weekly', 'Monthly'], key='churn_granularity')
+    with ctrl2:
+        plan_options = {'All installs': 'installs', 'Awesome plan': 'awesome'}
+        plan_label = st.selectbox('Plan', list(plan_options), key='churn_plan')
+    with ctrl3:
+        measure = st.selectbox('Metric', ['Retention', 'Churn'], key='churn_measure')
+    with ctrl4:
+        cohort_count = st.number_input('Cohorts', min_value=2, max_value=52, value=16, key='churn_cohorts')
+
+    freq = 'week' if granularity == 'Weekly' else 'month'
+    unit = 'Week' if freq == 'week' else 'Month'
+
+    matrix = cohort_retention(freq, plan_options[plan_label], cohorts=int(cohort_count))
+    if matrix.empty or matrix['cohort_size'].sum() == 0:
+        st.info('No cohort data available yet.')
+        return
 
+    curve = retention_curve(matrix)
+    ages = matrix.drop(columns='cohort_size')
+    if measure == 'Churn':
+        ages = (100 - ages).round(2)
+        curve = (100 - curve).round(2)
 
-    st.multiselect('Churn', ['Churn', 'Churn Rate'])
+    # KPIs from the size-weighted curve at a few milestone ages
+    milestones = [1, 4, 12] if freq == 'week' else [1, 3, 6]
+    kpi_cols = st.columns(len(milestones) + 1)
+    with kpi_cols[0]:
+        st.metric(label='Shops in Cohorts', value=f"{int(matrix['cohort_size'].sum()):,}")
+    for col, age in zip(kpi_cols[1:], milestones):
+        with col:
+            value = curve.get(age)
+            st.metric(
+                label=f'{measure} at {unit} {age}',
+                value=f'{value:.1f}%' if value is not None and pd.notna(value) else '—'
+            )
 
+    # Heatmap: cohorts (rows) x age (columns)
+    st.subheader(f'{measure} by Cohort')
+    heat = ages.set_axis(ages.index.strftime('%Y-%m-%d' if freq == 'week' else '%Y-%m'))
+    last_age = heat.columns[heat.notna().any()].max()
+    heat = heat.loc[:, :last_age] if pd.notna(last_age) else heat
+    fig_heat = px.imshow(
+        heat,
+        labels=dict(x=f'{unit}s since start', y='Cohort', color=f'{measure} %'),
+        color_continuous_scale='Blues' if measure == 'Retention' else 'Reds',
+        aspect='auto',
+        text_auto='.0f'
+    )
+    fig_heat.update_layout(
+        height=max(340, 24 * len(heat)),
+        margin=dict(l=10, r=10, t=30, b=0),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    st.plotly_chart(fig_heat, use_container_width=True, config={'displayModeBar': False})
 
+    # Curves: each cohort plus the size-weighted average
+    st.subheader(f'{measure} Curves')
+    curves = ages.set_axis(ages.index.strftime('%Y-%m-%d' if freq == 'week' else '%Y-%m'))
+    curves_long = curves.reset_index().melt(id_vars='cohort_start', var_name='age', value_name='pct').dropna()
+    fig_curves = px.line(
+        curves_long,
+        x='age',
+        y='pct',
+        color='cohort_start',
+        labels={'age': f'{unit}s since start', 'pct': f'{measure} %', 'cohort_start': 'Cohort'}
+    )
+    fig_curves.update_traces(opacity=0.35)
+    fig_curves.add_scatter(
+        x=curve.dropna().index,
+        y=curve.dropna().values,
+        mode='lines+markers',
+        name='Weighted average',
+        line=dict(color='#f59db1', width=4)
+    )
+    fig_curves.update_layout(
+        height=400,
+        margin=dict(l=10, r=10, t=30, b=0),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        yaxis=dict(ticksuffix='%')
+    )
+    fig_curves.update_xaxes(showgrid=False)
+    fig_curves.update_yaxes(showgrid=False)
+    st.plotly_chart(fig_curves, use_container_width=True, config={'displayModeBar': False})
 
-    # filter types examples
\ No newline at end of file
+    with st.expander('Cohort table'):
+        table = ages.rename(columns=lambda age: f'{unit} {age}')
+        table.insert(0, 'Cohort Size', matrix['cohort_size'])
+        st.dataframe(table, use_container_width=True)
@@ -1,15 +1,18 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-from src.db.redshift_connection import run_query, get_redshift_connection
+from src.db.redshift_connection import get_redshift_connection
+from src.db.datasets import load_dataset
 from src.sql.core_metrics.core_metrics import core_metrics
+from src.engines.kpi import kpi_deltas
 
 
 def downgrade_page() -> None:
     st.title('Downgrade')
 
     # Get core metrics data
-    df = run_query(core_metrics)
+    core = load_dataset(core_metrics)
+    df = core.view()
     
     if df.empty:
         st.info('No data available yet.')
@@ -26,7 +29,7 @@ def downgrade_page() -> None:
     
     # Transform core metrics data for downgrade visualization
     # Since core_metrics only has total downgrades, we'll create a simple structure
-    df_down = df[['week', 'core_downgrades']].copy()
+    df_down = df[['week', 'core_downgrades']]
     df_down['week_start'] = df_down['week']
     df_down['downgrade_path'] = 'downgrade'
     df_down['count_of_downgrades'] = df_down['core_downgrades']
@@ -41,27 +44,12 @@ def downgrade_page() -> None:
     )
 
     # KPI metrics with WoW deltas using original df columns
-    def latest_with_delta_direct(df_orig: pd.DataFrame, col: str):
-        temp = df_orig[['week', col]].dropna().copy()
-        if temp.empty:
-            return None, None
-        temp = temp.sort_values('week')
-        latest_val = temp.iloc[-1][col]
-        if len(temp) < 2:
-            return latest_val, None
-        prev_val = temp.iloc[-2][col]
-        try:
-            delta_val = float(latest_val) - float(prev_val)
-        except Exception:
-            delta_val = None
-        return latest_val, delta_val
-
     kpi_label_map = {
         'total': 'Total Downgrades',
     }
     
     # Get downgrade metrics
-    total_latest, total_delta = latest_with_delta_direct(df, 'core_downgrades')
+    total_latest, total_delta = kpi_deltas(core.version, df, 'week', ('core_downgrades',)).loc['core_downgrades', ['latest', 'delta']]
     
     kpi_cols = st.columns(1)
     kpis = [
@@ -1,8 +1,127 @@
 import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.engines.revenue import AWESOME_MRR, movements_between, mrr_movements, revenue_ledger
 
 
 def finance_page() -> None:
     st.title('Finance')
-    st.info('Finance metrics coming soon.')
+    st.caption(f'MRR replayed from Awesome plan upgrade and downgrade events at ${AWESOME_MRR}/month per shop')
+
+    ledger = revenue_ledger()
+    if len(ledger) == 0:
+        st.info('No revenue data available yet.')
+        return
+
+    ctrl1, ctrl2 = st.columns(2)
+    with ctrl1:
+        granularity_options = {'Monthly': 'month', 'Weekly': 'week', 'Quarterly': 'quarter'}
+        granularity = st.selectbox('Granularity', list(granularity_options), key='finance_granularity')
+    with ctrl2:
+        periods = st.number_input('Periods', min_value=2, max_value=104, value=12, key='finance_periods')
+
+    freq = granularity_options[granularity]
+    df = mrr_movements(ledger, freq, int(periods))
+    if df.empty:
+        st.info('Not enough revenue history for this granularity yet.')
+        return
+
+    # KPIs for the latest complete period
+    latest = df.iloc[-1]
+    prev = df.iloc[-2] if len(df) >= 2 else None
+    kpi_cols = st.columns(4)
+    with kpi_cols[0]:
+        st.metric(
+            label='MRR',
+            value=f"${int(latest['ending_mrr']):,}",
+            delta=f"${int(latest['net_new_mrr']):,}"
+        )
+    with kpi_cols[1]:
+        st.metric(label='ARR', value=f"${int(latest['ending_arr']):,}")
+    with kpi_cols[2]:
+        st.metric(
+            label='New + Reactivated MRR',
+            value=f"${int(latest['new'] + latest['reactivation']):,}",
+            delta=(f"${int(latest['new'] + latest['reactivation'] - prev['new'] - prev['reactivation']):,}" if prev is not None else None)
+        )
+    with kpi_cols[3]:
+        st.metric(
+            label='Churned MRR',
+            value=f"${int(latest['churned']):,}",
+            delta=(f"${int(latest['churned'] - prev['churned']):,}" if prev is not None else None),
+            delta_color='inverse'
+        )
+
+    # MRR bridge: gains up, losses down, ending MRR on a second axis
+    st.subheader('MRR Movements')
+    fig = go.Figure()
+    bars = [
+        ('new', 'New', '#72a7ff', 1),
+        ('reactivation', 'Reactivation', '#b8b8ff', 1),
+        ('expansion', 'Expansion', '#2ca02c', 1),
+        ('contraction', 'Contraction', '#ffb347', -1),
+        ('churned', 'Churned', '#f59db1', -1),
+    ]
+    for col, label, color, sign in bars:
+        if df[col].any():
+            fig.add_trace(go.Bar(x=df['period_start'], y=sign * df[col], name=label, marker_color=color))
+    fig.add_trace(go.Scatter(
+        x=df['period_start'],
+        y=df['ending_mrr'],
+        mode='lines+markers',
+        name='Ending MRR',
+        line=dict(color='#444444', width=3),
+        yaxis='y2'
+    ))
+    fig.update_layout(
+        height=420,
+        barmode='relative',
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='left', x=0),
+        margin=dict(l=10, r=10, t=30, b=0),
+        xaxis_title=freq.title(),
+        yaxis=dict(title='MRR Movement ($)', tickformat=',', showgrid=False),
+        yaxis2=dict(title='Ending MRR ($)', tickformat=',', overlaying='y', side='right', showgrid=False),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+    fig.update_xaxes(showgrid=False)
+    st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
 
+    # Bridge for any date range
+    st.subheader('MRR Bridge')
+    today = pd.Timestamp.now(tz='UTC').tz_localize(None).normalize()
+    date_range = st.date_input(
+        'Date range',
+        value=(today - pd.Timedelta(days=30), today - pd.Timedelta(days=1)),
+        key='finance_range'
+    )
+    if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
+        bridge = movements_between(ledger, *date_range)
+        bridge_cols = st.columns(5)
+        bridge_items = [
+            ('Starting MRR', bridge['starting_mrr']),
+            ('New + Reactivated', bridge['new'] + bridge['reactivation']),
+            ('Churned', bridge['churned']),
+            ('Net New MRR', bridge['net_new_mrr']),
+            ('Ending MRR', bridge['ending_mrr']),
+        ]
+        for col, (label, value) in zip(bridge_cols, bridge_items):
+            with col:
+                st.metric(label=label, value=f'${value:,}')
 
+    with st.expander('Movement table'):
+        table = df.rename(columns={
+            'period_start': 'Period',
+            'starting_mrr': 'Starting MRR',
+            'new': 'New',
+            'reactivation': 'Reactivation',
+            'expansion': 'Expansion',
+            'contraction': 'Contraction',
+            'churned': 'Churned',
+            'net_new_mrr': 'Net New MRR',
+            'ending_mrr': 'Ending MRR',
+            'ending_arr': 'Ending ARR',
+        })
+        st.dataframe(table.iloc[::-1], use_container_width=True, hide_index=True)
@@ -4,7 +4,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from src.db.redshift_connection import run_query, get_redshift_connection
-from src.sql.core_metrics.general_metrics import general_metrics
+from src.engines.general_metrics import load_general_metrics
 
 
 def general_metrics_page():
@@ -15,29 +15,13 @@ def general_metrics_page():
     
     st.title('General Business Metrics')
     
-    df = run_query(general_metrics)
-
-    df['week'] = pd.to_datetime(df['week'])
+    # Week x key values with growth for every metric, shared by all sessions
+    metrics = load_general_metrics()
     
-    if df.empty:
+    if metrics.empty:
         st.info('No general metrics data available yet.')
         return
     
-    # Calculate WOW growth for each metric
-    def calculate_wow_growth(data, metric_key):
-        metric_data = data[data['key'] == metric_key].copy()
-        if len(metric_data) < 2:
-            return None, None, None
-        
-        metric_data = metric_data.sort_values('week')
-        current_value = metric_data.iloc[-1]['value']
-        previous_value = metric_data.iloc[-2]['value']
-        
-        wow_change = current_value - previous_value
-        wow_percent = (wow_change / previous_value * 100) if previous_value != 0 else 0
-        
-        return current_value, wow_change, wow_percent
-    
     # Key metrics for KPI cards
     key_metrics = [
         ('active_shops_count', 'Active Shops', '{:,.0f}'),
@@ -50,18 +34,23 @@ def general_metrics_page():
     # Display KPI cards
     st.subheader('Key Performance Indicators - Week over Week')
     
+    kpis = metrics.kpis.reindex([metric_key for metric_key, _, _ in key_metrics])
+    
     kpi_cols = st.columns(len(key_metrics))
     
     for i, (metric_key, display_name, format_str) in enumerate(key_metrics):
-        current_value, wow_change, wow_percent = calculate_wow_growth(df, metric_key)
+        current_value, wow_change, wow_percent = kpis.loc[metric_key, ['latest', 'delta', 'delta_pct']]
+        
+        if pd.isna(wow_change):
+            delta = None
+        elif pd.isna(wow_percent):
+            delta = f"{wow_change:+,.0f}"
+        else:
+            delta = f"{wow_change:+,.0f} ({wow_percent:+.1f}%)"
         
         with kpi_cols[i]:
-            if current_value is not None:
-                st.metric(
-                    label=display_name,
-                    value=format_str.format(current_value),
-                    delta=f"{wow_change:+,.0f} ({wow_percent:+.1f}%)" if wow_change is not None else None
-                )
+            if pd.notna(current_value):
+                st.metric(label=display_name, value=format_str.format(current_value), delta=delta)
             else:
                 st.metric(label=display_name, value="—", delta=None)
     
@@ -81,7 +70,7 @@ def general_metrics_page():
     with col1:
         st.write("**Business Growth Metrics**")
         
-        business_data = df[df['key'].isin(business_metrics)].copy()
+        business_data = metrics.series(business_metrics)
         
         if not business_data.empty:
             # Create separate charts for different scales
@@ -116,7 +105,7 @@ def general_metrics_page():
     with col2:
         st.write("**Annual Revenue**")
         
-        revenue_data = df[df['key'] == 'annual_revenue']
+        revenue_data = metrics.series(['annual_revenue'])
         
         if not revenue_data.empty:
             fig_revenue = px.line(
@@ -152,7 +141,7 @@ def general_metrics_page():
     with col1:
         st.write("**Homepage Line Items**")
         
-        line_items_data = df[df['key'] == 'homepage_metrics__line_items_count']
+        line_items_data = metrics.series(['homepage_metrics__line_items_count'])
         
         if not line_items_data.empty:
             fig_line_items = px.line(
@@ -183,7 +172,7 @@ def general_metrics_page():
     with col2:
         st.write("**Real Awesome Count**")
         
-        awesome_data = df[df['key'] == 'real_awesome_count']
+        awesome_data = metrics.series(['real_awesome_count'])
         
         if not awesome_data.empty:
             fig_awesome = px.line(
@@ -214,7 +203,7 @@ def general_metrics_page():
     # Review Metrics
     st.subheader('App Reviews Metrics')
     
-    review_data = df[df['key'].isin(review_metrics)]
+    review_data = metrics.series(review_metrics)
     
     if not review_data.empty:
         fig_reviews = px.line(
@@ -265,28 +254,13 @@ def general_metrics_page():
         ('annual_revenue', 'Annual Revenue', '#2ca02c')
     ]
     
-    # Function to calculate net growth
-    def calculate_net_growth(data, metric_key):
-        metric_data = data[data['key'] == metric_key].copy()
-        if len(metric_data) < 2:
-            return pd.DataFrame()
-        
-        metric_data = metric_data.sort_values('week')
-        
-        # Calculate week-over-week net growth
-        metric_data['previous_value'] = metric_data['value'].shift(1)
-        metric_data['net_growth'] = metric_data['value'] - metric_data['previous_value']
-        metric_data['growth_rate'] = (metric_data['net_growth'] / metric_data['previous_value'] * 100).fillna(0)
-        
-        return metric_data.dropna()
-    
     # Create net growth charts
     col1, col2, col3 = st.columns(3)
     
     with col1:
         st.write("**Active Shops Net Growth**")
         
-        active_shops_growth = calculate_net_growth(df, 'active_shops_count')
+        active_shops_growth = metrics.growth(['active_shops_count'])
         
         if not active_shops_growth.empty:
             fig_shops_growth = px.line(
@@ -326,7 +300,7 @@ def general_metrics_page():
     with col2:
         st.write("**Real Awesome Count Net Growth**")
         
-        awesome_growth = calculate_net_growth(df, 'real_awesome_count')
+        awesome_growth = metrics.growth(['real_awesome_count'])
         
         if not awesome_growth.empty:
             fig_awesome_growth = px.line(
@@ -366,7 +340,7 @@ def general_metrics_page():
     with col3:
         st.write("**Annual Revenue Net Growth**")
         
-        revenue_growth = calculate_net_growth(df, 'annual_revenue')
+        revenue_growth = metrics.growth(['annual_revenue'])
         
         if not revenue_growth.empty:
             fig_revenue_growth = px.line(
@@ -407,21 +381,11 @@ def general_metrics_page():
     st.subheader('Combined Net Growth Trends')
     
     # Create a combined chart showing all three metrics (normalized)
-    combined_growth_data = []
-    
-    for metric_key, display_name, color in target_metrics:
-        growth_data = calculate_net_growth(df, metric_key)
-        if not growth_data.empty:
-            for _, row in growth_data.iterrows():
-                combined_growth_data.append({
-                    'week': row['week'],
-                    'metric': display_name,
-                    'growth_rate': row['growth_rate'],
-                    'net_growth': row['net_growth']
-                })
-    
-    if combined_growth_data:
-        combined_df = pd.DataFrame(combined_growth_data)
+    display_names = {metric_key: display_name for metric_key, display_name, _ in target_metrics}
+    combined_df = metrics.growth(display_names)
+    combined_df['metric'] = combined_df['key'].map(display_names)
+    
+    if not combined_df.empty:
         
         # Growth rate comparison chart
         fig_combined_rate = px.line(
@@ -460,28 +424,17 @@ def general_metrics_page():
     # Growth Summary Table
     st.subheader('Growth Summary Statistics')
     
-    growth_summary = []
-    
-    for metric_key, display_name, _ in target_metrics:
-        growth_data = calculate_net_growth(df, metric_key)
-        if not growth_data.empty:
-            avg_growth = growth_data['net_growth'].mean()
-            avg_growth_rate = growth_data['growth_rate'].mean()
-            total_growth = growth_data['net_growth'].sum()
-            positive_weeks = (growth_data['net_growth'] > 0).sum()
-            total_weeks = len(growth_data)
-            
-            growth_summary.append({
-                'Metric': display_name,
-                'Avg Weekly Growth': f"{avg_growth:+,.0f}",
-                'Avg Growth Rate': f"{avg_growth_rate:+.2f}%",
-                'Total Net Growth': f"{total_growth:+,.0f}",
-                'Positive Growth Weeks': f"{positive_weeks}/{total_weeks}",
-                'Growth Success Rate': f"{(positive_weeks/total_weeks*100):.1f}%"
-            })
-    
-    if growth_summary:
-        summary_df = pd.DataFrame(growth_summary)
+    summary = metrics.summary(display_names)
+    
+    if not summary.empty:
+        summary_df = pd.DataFrame({
+            'Metric': summary.index.map(display_names),
+            'Avg Weekly Growth': summary['avg_growth'].map('{:+,.0f}'.format),
+            'Avg Growth Rate': summary['avg_growth_rate'].map('{:+.2f}%'.format),
+            'Total Net Growth': summary['total_growth'].map('{:+,.0f}'.format),
+            'Positive Growth Weeks': summary['positive_weeks'].astype(str) + '/' + summary['total_weeks'].astype(str),
+            'Growth Success Rate': summary['success_rate'].map('{:.1f}%'.format),
+        })
         st.dataframe(summary_df, use_container_width=True, hide_index=True)
     
     # # Data Quality and Coverage
@@ -3,10 +3,39 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from src.db.bigquery_connection import run_query
-from src.sql.google_analytics.google_analytics import ga_installs, ga_view_app
+from src.engines.ga_frames import date_window, load_ga_frames, period_comparison, week_ordinal, weekly_conversion
+from src.engines.kpi import kpi_deltas
+from src.utils.formatting import column_formats
 from src.utils.plotly_config import render_plotly_chart, BRAND_COLORS, CHART_COLOR_SEQUENCE, DUAL_CHART_COLORS
 
+# Week-over-week breakdown tables stay numeric; formats are applied by the grid
+COMPARISON_FORMATS = column_formats({
+    'Page Views': 'localized',
+    'Page Views Δ': 'count_delta',
+    'Page Views Δ %': 'percent_change',
+    'Installs': 'localized',
+    'Installs Δ': 'count_delta',
+    'Installs Δ %': 'percent_change',
+    'Conversion Rate': 'rate',
+    'Conversion Δ': 'rate_delta',
+})
+
+
+def comparison_table(table: pd.DataFrame, label: str) -> pd.DataFrame:
+    """Display columns of a period_comparison table, first column named ``label``"""
+    return pd.DataFrame({
+        label: table.iloc[:, 0],
+        'Page Views': table['views'],
+        'Page Views Δ': table['views_delta'],
+        'Page Views Δ %': table['views_pct'],
+        'Installs': table['installs'],
+        'Installs Δ': table['installs_delta'],
+        'Installs Δ %': table['installs_pct'],
+        'Conversion Rate': table['conversion'],
+        'Conversion Δ': table['conversion_delta'],
+    })
+
+
 def google_analytics_page() -> None:
     st.set_page_config(
         page_title='Google Analytics',
@@ -15,68 +44,44 @@ def google_analytics_page() -> None:
     
     st.title('Listing Analytics')
     
-    df = run_query(ga_installs)
+    # Dates parsed, dimensions categorical (shared by installs and views) and
+    # indexed by (dimension, event_date); shared between sessions, so the page
+    # works on Copy-on-Write views whose writes stay local
+    ga = load_ga_frames()
+    df = ga.installs.view()
     if df.empty:
         st.info('No data available yet.')
     else:
-        # Convert event_date from YYYYMMDD format to datetime
-        df['event_date'] = pd.to_datetime(df['event_date'], format='%Y%m%d')
-        df['week'] = df['event_date'].dt.to_period('W').dt.start_time
-        
         # Get views data for top metrics
-        views_df = run_query(ga_view_app)
+        views_df = ga.views.view()
         
         # Function to calculate week-over-week metrics
         def calculate_wow_metrics(df_installs, df_views):
-            # Aggregate weekly data for both datasets
-            weekly_installs = df_installs.groupby('week')['events_count'].sum().reset_index().sort_values('week')
-            
-            if not df_views.empty:
-                df_views['event_date'] = pd.to_datetime(df_views['event_date'], format='%Y%m%d')
-                df_views['week'] = df_views['event_date'].dt.to_period('W').dt.start_time
-                weekly_views = df_views.groupby('week')['events_count'].sum().reset_index().sort_values('week')
-            else:
-                weekly_views = pd.DataFrame(columns=['week', 'events_count'])
-            
-            # Get last two weeks of data
-            if len(weekly_installs) >= 2:
-                last_week_installs = weekly_installs.iloc[-1]['events_count']
-                prev_week_installs = weekly_installs.iloc[-2]['events_count']
-                installs_delta = last_week_installs - prev_week_installs
-            else:
-                last_week_installs = weekly_installs.iloc[-1]['events_count'] if len(weekly_installs) > 0 else 0
-                installs_delta = None
-            
-            if len(weekly_views) >= 2:
-                last_week_views = weekly_views.iloc[-1]['events_count']
-                prev_week_views = weekly_views.iloc[-2]['events_count']
-                views_delta = last_week_views - prev_week_views
-            else:
-                last_week_views = weekly_views.iloc[-1]['events_count'] if len(weekly_views) > 0 else 0
-                views_delta = None
-            
+            # Weekly totals side by side; each series keeps its own last two weeks
+            weekly = pd.DataFrame({
+                'installs': df_installs.groupby('week', observed=True)['events_count'].sum(),
+                'views': df_views.groupby('week', observed=True)['events_count'].sum() if not df_views.empty else pd.Series(dtype='int64'),
+            }).rename_axis('week').reset_index()
+            kpis = kpi_deltas(f'{ga.version}:weekly', weekly, 'week', ('views', 'installs'))
+            views, installs = kpis.loc['views'], kpis.loc['installs']
+
+            last_week_views = views['latest'] if pd.notna(views['latest']) else 0
+            last_week_installs = installs['latest'] if pd.notna(installs['latest']) else 0
+
             # Calculate conversion rates
-            if last_week_views > 0:
-                last_week_conversion = (last_week_installs / last_week_views) * 100
-            else:
-                last_week_conversion = 0
-                
-            if len(weekly_views) >= 2 and len(weekly_installs) >= 2 and prev_week_views > 0:
-                prev_week_conversion = (prev_week_installs / prev_week_views) * 100
-                conversion_delta = last_week_conversion - prev_week_conversion
+            last_week_conversion = (last_week_installs / last_week_views) * 100 if last_week_views > 0 else 0
+            if pd.notna(installs['previous']) and views['previous'] > 0:
+                conversion_delta = last_week_conversion - (installs['previous'] / views['previous']) * 100
             else:
                 conversion_delta = None
-            
-            # Total events (views + installs)
+
+            # Total events (views + installs); NaN unless both have a previous week
             total_events = last_week_views + last_week_installs
-            if views_delta is not None and installs_delta is not None:
-                total_delta = views_delta + installs_delta
-            else:
-                total_delta = None
-            
+            total_delta = views['delta'] + installs['delta']
+
             return {
-                'views': (last_week_views, views_delta),
-                'installs': (last_week_installs, installs_delta),
+                'views': (last_week_views, views['delta']),
+                'installs': (last_week_installs, installs['delta']),
                 'conversion': (last_week_conversion, conversion_delta),
                 'total': (total_events, total_delta)
             }
@@ -121,7 +126,7 @@ def google_analytics_page() -> None:
             col1, col2, col3, col4 = st.columns(4)
             
             # Start with full dataset for first filter
-            current_df = df.copy()
+            current_df = df
             
             with col1:
                 medium_options = sorted(current_df['medium_aggregated'].dropna().unique().tolist())
@@ -152,7 +157,7 @@ def google_analytics_page() -> None:
                 selected_campaign_details = st.multiselect('Campaign Details', campaign_details_options, default=[])
             
             # Apply all filters to original dataframe
-            filtered_df = df.copy()
+            filtered_df = df
             
             if selected_mediums:
                 filtered_df = filtered_df[filtered_df['medium_aggregated'].isin(selected_mediums)]
@@ -188,12 +193,9 @@ def google_analytics_page() -> None:
                 color_column = None
                 title = 'Weekly Events Count'
             
-            # Add week column for grouping
-            filtered_df['week'] = filtered_df['event_date'].dt.to_period('W').dt.start_time
-            
             if color_column:
                 # Aggregate by week and the selected dimension
-                weekly_events = filtered_df.groupby(['week', color_column])['events_count'].sum().reset_index()
+                weekly_events = filtered_df.groupby(['week', color_column], observed=True)['events_count'].sum().reset_index()
                 
                 # Create stacked bar chart with brand colors
                 fig = px.bar(
@@ -216,7 +218,7 @@ def google_analytics_page() -> None:
                 )
             else:
                 # Aggregate by week only for simple bar chart
-                weekly_events = filtered_df.groupby('week')['events_count'].sum().reset_index()
+                weekly_events = filtered_df.groupby('week', observed=True)['events_count'].sum().reset_index()
                 
                 # Create simple bar chart with primary brand color
                 fig = px.bar(
@@ -255,12 +257,8 @@ def google_analytics_page() -> None:
             st.divider()
             
             if not views_df.empty:
-                # Convert event_date and add week column for views
-                views_df['event_date'] = pd.to_datetime(views_df['event_date'], format='%Y%m%d')
-                views_df['week'] = views_df['event_date'].dt.to_period('W').dt.start_time
-                
                 # Apply same filters to views data
-                filtered_views_df = views_df.copy()
+                filtered_views_df = views_df
                 
                 if selected_mediums:
                     filtered_views_df = filtered_views_df[filtered_views_df['medium_aggregated'].isin(selected_mediums)]
@@ -275,10 +273,10 @@ def google_analytics_page() -> None:
                     filtered_views_df = filtered_views_df[filtered_views_df['campaign_details_aggregated'].isin(selected_campaign_details)]
                 
                 # Aggregate weekly data
-                weekly_views = filtered_views_df.groupby('week')['events_count'].sum().reset_index()
+                weekly_views = filtered_views_df.groupby('week', observed=True)['events_count'].sum().reset_index()
                 weekly_views.columns = ['week', 'views']
                 
-                weekly_installs = filtered_df.groupby('week')['events_count'].sum().reset_index()
+                weekly_installs = filtered_df.groupby('week', observed=True)['events_count'].sum().reset_index()
                 weekly_installs.columns = ['week', 'installs']
                 
                 # Merge views and installs data
@@ -370,9 +368,9 @@ def google_analytics_page() -> None:
             last_monday = today - pd.Timedelta(days=days_since_monday + 7)  # Previous week's Monday
             last_sunday = last_monday + pd.Timedelta(days=6)  # Previous week's Sunday
             
-            # Get available date range from data
-            min_date = filtered_df['event_date'].min().date()
-            max_date = filtered_df['event_date'].max().date()
+            # Get available date range from data (first and last rows, the frame is date-sorted)
+            min_date = filtered_df['event_date'].iloc[0].date()
+            max_date = filtered_df['event_date'].iloc[-1].date()
             
             # Use last completed week as default, but allow user to change
             default_start = max(last_monday.date(), min_date)
@@ -385,10 +383,7 @@ def google_analytics_page() -> None:
                 end_date = st.date_input('End Date', value=default_end, min_value=min_date, max_value=max_date)
             
             # Filter by date range for current period
-            table_df = filtered_df[
-                (filtered_df['event_date'].dt.date >= start_date) & 
-                (filtered_df['event_date'].dt.date <= end_date)
-            ]
+            table_df = date_window(filtered_df, start_date, end_date)
             
             # Calculate previous period for WoW comparison
             period_length = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
@@ -396,17 +391,14 @@ def google_analytics_page() -> None:
             prev_end_date = pd.Timestamp(start_date) - pd.Timedelta(days=1)
             
             # Filter for previous period
-            prev_table_df = filtered_df[
-                (filtered_df['event_date'].dt.date >= prev_start_date.date()) & 
-                (filtered_df['event_date'].dt.date <= prev_end_date.date())
-            ]
+            prev_table_df = date_window(filtered_df, prev_start_date, prev_end_date)
             
             # Aggregate current period by source
-            current_sources = table_df.groupby('source_aggregated')['events_count'].sum().reset_index()
+            current_sources = table_df.groupby('source_aggregated', observed=True)['events_count'].sum().reset_index()
             current_sources.columns = ['Source', 'Current_Events']
             
             # Aggregate previous period by source
-            prev_sources = prev_table_df.groupby('source_aggregated')['events_count'].sum().reset_index()
+            prev_sources = prev_table_df.groupby('source_aggregated', observed=True)['events_count'].sum().reset_index()
             prev_sources.columns = ['Source', 'Previous_Events']
             
             # Merge current and previous data
@@ -425,7 +417,7 @@ def google_analytics_page() -> None:
             sources_table = sources_table.sort_values('Current_Events', ascending=False)
             
             # Create display table with formatted columns
-            display_table = sources_table[['Source', 'Current_Events', 'WoW_Delta', 'WoW_Percent']].copy()
+            display_table = sources_table[['Source', 'Current_Events', 'WoW_Delta', 'WoW_Percent']]
             display_table.columns = ['Source', 'Events Count', 'WoW Δ', 'WoW %']
             
             # Format the WoW % column to show percentage with proper handling of None values
@@ -442,10 +434,10 @@ def google_analytics_page() -> None:
             st.subheader('Installs - last 30 days')
             
             # Filter to installs events only (last 30 days)
-            installs_last_30 = df[df['event_date'] >= (df['event_date'].max() - pd.Timedelta(days=30))].copy()
+            installs_last_30 = ga.installs.window(ga.installs.latest - pd.Timedelta(days=30))
             
             # Aggregate by date
-            installs_daily = installs_last_30.groupby('event_date')['events_count'].sum().reset_index()
+            installs_daily = installs_last_30.groupby('event_date', observed=True)['events_count'].sum().reset_index()
             
             fig_installs = px.line(
                 installs_daily,
@@ -473,21 +465,14 @@ def google_analytics_page() -> None:
             
             st.divider()
             
-            # Prepare data for trends - combine both installs and view_item data
-            combined_trends_df = df.copy()
-            combined_trends_df['event_type'] = 'installs'
-            
-            if not views_df.empty:
-                views_trends_df = views_df.copy()
-                views_trends_df['event_date'] = pd.to_datetime(views_trends_df['event_date'], format='%Y%m%d')
-                views_trends_df['event_type'] = 'view_item'
-                combined_trends_df = pd.concat([combined_trends_df, views_trends_df], ignore_index=True)
+            # Trends combine installs and view_item data
+            trend_frames = [frame for frame in (ga.installs, ga.views) if not frame.empty]
             
             # Language Trends - Last 8 completed weeks (top 10)
             st.subheader('Language - Last 8 completed weeks (top 10)')
             
             # Calculate last 8 completed weeks
-            latest_date = combined_trends_df['event_date'].max()
+            latest_date = max(frame.latest for frame in trend_frames)
             # Find the start of the current week (Monday)
             current_week_start = latest_date - pd.Timedelta(days=latest_date.weekday())
             # Go back 8 weeks from the start of current week to get 8 completed weeks
@@ -495,20 +480,17 @@ def google_analytics_page() -> None:
             last_completed_week_end = current_week_start - pd.Timedelta(days=1)
             
             # Filter to last 8 completed weeks
-            language_df = combined_trends_df[
-                (combined_trends_df['event_date'] >= eight_weeks_ago) & 
-                (combined_trends_df['event_date'] <= last_completed_week_end)
-            ].copy()
-            
-            # Add week column for weekly aggregation
-            language_df['week'] = language_df['event_date'].dt.to_period('W').dt.start_time
+            this_week = week_ordinal(current_week_start)
+            language_df = pd.concat(
+                [frame.weeks(this_week - 8, this_week - 1) for frame in trend_frames], ignore_index=True
+            )
             
             # Get top 10 languages by total events
-            top_languages = language_df.groupby('locale_aggregated')['events_count'].sum().nlargest(10).index.tolist()
+            top_languages = language_df.groupby('locale_aggregated', observed=True)['events_count'].sum().nlargest(10).index.tolist()
             language_df = language_df[language_df['locale_aggregated'].isin(top_languages)]
             
             # Aggregate by week and language
-            language_weekly = language_df.groupby(['week', 'locale_aggregated'])['events_count'].sum().reset_index()
+            language_weekly = language_df.groupby(['week', 'locale_aggregated'], observed=True)['events_count'].sum().reset_index()
             
             # Create language trends chart with brand colors
             fig_language = px.line(
@@ -545,49 +527,16 @@ def google_analytics_page() -> None:
             # Create 2 columns for the grid
             col1, col2 = st.columns(2)
             
+            # Every language's weekly installs, views and conversion in one aligned frame
+            language_grid = weekly_conversion(
+                ga.installs.rows('locale_aggregated', top_languages, eight_weeks_ago, last_completed_week_end),
+                ga.views.rows('locale_aggregated', top_languages, eight_weeks_ago, last_completed_week_end),
+                'locale_aggregated',
+            )
+            language_slices = dict(list(language_grid.groupby('locale_aggregated', observed=True, sort=False)))
+            
             for i, language in enumerate(top_languages):
-                # Get installs data for this language (from ga_installs - last 8 completed weeks)
-                installs_lang_data = df[
-                    (df['locale_aggregated'] == language) & 
-                    (df['event_date'] >= eight_weeks_ago) & 
-                    (df['event_date'] <= last_completed_week_end)
-                ].copy()
-                installs_lang_data['week'] = installs_lang_data['event_date'].dt.to_period('W').dt.start_time
-                installs_weekly = installs_lang_data.groupby('week')['events_count'].sum().reset_index()
-                installs_weekly = installs_weekly.rename(columns={'events_count': 'installs_count'})
-                
-                # Get views data for this language (from ga_view_app - last 8 completed weeks)
-                if not views_df.empty:
-                    views_df_processed = views_df.copy()
-                    views_df_processed['event_date'] = pd.to_datetime(views_df_processed['event_date'], format='%Y%m%d')
-                    views_lang_data = views_df_processed[
-                        (views_df_processed['locale_aggregated'] == language) & 
-                        (views_df_processed['event_date'] >= eight_weeks_ago) & 
-                        (views_df_processed['event_date'] <= last_completed_week_end)
-                    ].copy()
-                    views_lang_data['week'] = views_lang_data['event_date'].dt.to_period('W').dt.start_time
-                    views_weekly = views_lang_data.groupby('week')['events_count'].sum().reset_index()
-                    views_weekly = views_weekly.rename(columns={'events_count': 'views_count'})
-                    
-                    # Merge installs and views data properly
-                    combined_data = pd.merge(installs_weekly, views_weekly, on='week', how='outer').fillna(0)
-                    
-                    # Calculate proper conversion rate
-                    combined_data['conversion_rate'] = combined_data.apply(
-                        lambda row: (row['installs_count'] / row['views_count'] * 100) 
-                        if row['views_count'] > 0 
-                        else 0, axis=1
-                    ).round(2)
-                else:
-                    combined_data = installs_weekly.copy()
-                    combined_data = combined_data.rename(columns={'installs_count': 'installs_count'})
-                    combined_data['views_count'] = 0
-                    combined_data['conversion_rate'] = 0
-                
-                # Calculate WoW change for installs
-                combined_data = combined_data.sort_values('week')
-                combined_data['prev_week_installs'] = combined_data['installs_count'].shift(1)
-                combined_data['wow_change'] = ((combined_data['installs_count'] - combined_data['prev_week_installs']) / combined_data['prev_week_installs'] * 100).round(1)
+                combined_data = language_slices.get(language, language_grid.iloc[0:0])
                 
                 # Create subplot with secondary y-axis
                 fig_individual = make_subplots(
@@ -602,7 +551,7 @@ def google_analytics_page() -> None:
                         y=combined_data['installs_count'],
                         name='Installs',
                         marker_color=BRAND_COLORS['primary']['keppel'],
-                        text=combined_data['installs_count'].apply(lambda x: f"{int(x):,}" if pd.notna(x) else ""),
+                        text=combined_data['installs_label'],
                         textposition='outside',
                         hovertemplate='<b>Week:</b> %{x}<br><b>Installs:</b> %{y}<br><b>WoW Change:</b> %{customdata:.1f}%<extra></extra>',
                         customdata=combined_data['wow_change']
@@ -620,7 +569,7 @@ def google_analytics_page() -> None:
                             name='Conversion Rate',
                             line=dict(color='#DC2626', width=3),  # Bright red for maximum line visibility
                             marker=dict(size=8, color='#DC2626'),  # Bright red for maximum line visibility
-                            text=combined_data['conversion_rate'].apply(lambda x: f"{x:.1f}%" if pd.notna(x) and x > 0 else ""),
+                            text=combined_data['conversion_label'],
                             textposition='top center',
                             hovertemplate='<b>Week:</b> %{x}<br><b>Conversion Rate:</b> %{y:.2f}%<br><b>Views:</b> %{customdata[0]}<br><b>Installs:</b> %{customdata[1]}<extra></extra>',
                             customdata=list(zip(combined_data['views_count'], combined_data['installs_count']))
@@ -676,7 +625,7 @@ def google_analytics_page() -> None:
             st.subheader('Medium - Last 8 completed weeks')
             
             # Aggregate by date and medium
-            medium_daily = language_df.groupby(['event_date', 'medium_aggregated'])['events_count'].sum().reset_index()
+            medium_daily = language_df.groupby(['event_date', 'medium_aggregated'], observed=True)['events_count'].sum().reset_index()
             
             # Get all mediums for individual charts
             all_mediums = medium_daily['medium_aggregated'].unique()
@@ -716,48 +665,16 @@ def google_analytics_page() -> None:
             # Create grid layout for medium charts
             cols = st.columns(2)
             
+            # Every medium's weekly installs, views and conversion in one aligned frame
+            medium_grid = weekly_conversion(
+                ga.installs.rows('medium_aggregated', all_mediums, eight_weeks_ago, last_completed_week_end),
+                ga.views.rows('medium_aggregated', all_mediums, eight_weeks_ago, last_completed_week_end),
+                'medium_aggregated',
+            )
+            medium_slices = dict(list(medium_grid.groupby('medium_aggregated', observed=True, sort=False)))
+            
             for i, medium in enumerate(all_mediums):
-                # Get installs data for this medium (from ga_installs - last 8 completed weeks)
-                installs_medium_data = df[
-                    (df['medium_aggregated'] == medium) & 
-                    (df['event_date'] >= eight_weeks_ago) & 
-                    (df['event_date'] <= last_completed_week_end)
-                ].copy()
-                installs_medium_data['week'] = installs_medium_data['event_date'].dt.to_period('W').dt.start_time
-                installs_weekly = installs_medium_data.groupby('week')['events_count'].sum().reset_index()
-                installs_weekly = installs_weekly.rename(columns={'events_count': 'installs_count'})
-                
-                # Get views data for this medium (from ga_view_app - last 8 completed weeks)
-                if not views_df.empty:
-                    views_df_processed = views_df.copy()
-                    views_df_processed['event_date'] = pd.to_datetime(views_df_processed['event_date'], format='%Y%m%d')
-                    views_medium_data = views_df_processed[
-                        (views_df_processed['medium_aggregated'] == medium) & 
-                        (views_df_processed['event_date'] >= eight_weeks_ago) & 
-                        (views_df_processed['event_date'] <= last_completed_week_end)
-                    ].copy()
-                    views_medium_data['week'] = views_medium_data['event_date'].dt.to_period('W').dt.start_time
-                    views_weekly = views_medium_data.groupby('week')['events_count'].sum().reset_index()
-                    views_weekly = views_weekly.rename(columns={'events_count': 'views_count'})
-                    
-                    # Merge installs and views data properly
-                    combined_data = pd.merge(installs_weekly, views_weekly, on='week', how='outer').fillna(0)
-                    
-                    # Calculate proper conversion rate
-                    combined_data['conversion_rate'] = combined_data.apply(
-                        lambda row: (row['installs_count'] / row['views_count'] * 100) 
-                        if row['views_count'] > 0 
-                        else 0, axis=1
-                    ).round(2)
-                else:
-                    combined_data = installs_weekly.copy()
-                    combined_data['views_count'] = 0
-                    combined_data['conversion_rate'] = 0
-                
-                # Calculate WoW change for installs
-                combined_data = combined_data.sort_values('week')
-                combined_data['prev_week_installs'] = combined_data['installs_count'].shift(1)
-                combined_data['wow_change'] = ((combined_data['installs_count'] - combined_data['prev_week_installs']) / combined_data['prev_week_installs'] * 100).round(1)
+                combined_data = medium_slices.get(medium, medium_grid.iloc[0:0])
                 
                 # Create subplot with secondary y-axis
                 fig_medium_individual = make_subplots(
@@ -772,7 +689,7 @@ def google_analytics_page() -> None:
                         y=combined_data['installs_count'],
                         name='Installs',
                         marker_color=BRAND_COLORS['secondary']['light_green'],
-                        text=combined_data['installs_count'].apply(lambda x: f"{int(x):,}" if pd.notna(x) else ""),
+                        text=combined_data['installs_label'],
                         textposition='outside',
                         hovertemplate='<b>Week:</b> %{x}<br><b>Installs:</b> %{y}<br><b>WoW Change:</b> %{customdata:.1f}%<extra></extra>',
                         customdata=combined_data['wow_change']
@@ -790,7 +707,7 @@ def google_analytics_page() -> None:
                             name='Conversion Rate',
                             line=dict(color=DUAL_CHART_COLORS['line_secondary'], width=2),
                             marker=dict(size=6, color=DUAL_CHART_COLORS['line_secondary']),
-                            text=combined_data['conversion_rate'].apply(lambda x: f"{x:.1f}%" if pd.notna(x) and x > 0 else ""),
+                            text=combined_data['conversion_label'],
                             textposition='top center',
                             hovertemplate='<b>Week:</b> %{x}<br><b>Conversion Rate:</b> %{y:.2f}%<br><b>Views:</b> %{customdata[0]}<br><b>Installs:</b> %{customdata[1]}<extra></extra>',
                             customdata=list(zip(combined_data['views_count'], combined_data['installs_count']))
@@ -845,7 +762,7 @@ def google_analytics_page() -> None:
             st.subheader('Organic Traffic Analysis')
             
             # Filter data for organic traffic only
-            organic_df = df[df['medium_aggregated'].isin(['organic_search', 'organic_placement', 'organic_uncategorised'])].copy()
+            organic_df = ga.installs.rows('medium_aggregated', ['organic_search', 'organic_placement', 'organic_uncategorised'])
             
             if organic_df.empty:
                 st.info('No organic traffic data available.')
@@ -858,7 +775,7 @@ def google_analytics_page() -> None:
                 st.subheader('Organic - Search')
                 
                 # Filter for organic search only
-                search_df = organic_df[organic_df['medium_aggregated'] == 'organic_search'].copy()
+                search_df = ga.installs.rows('medium_aggregated', 'organic_search')
                 
                 if not search_df.empty:
                     # Campaign performance table
@@ -867,17 +784,14 @@ def google_analytics_page() -> None:
                     with col1:
                         st.write("**Campaign Performance**")
                         
-                        # Calculate week-over-week changes for campaigns
-                        search_df['week'] = search_df['event_date'].dt.to_period('W').dt.start_time
-                        
-                        # Get last two weeks of data
+                        # Get last two weeks of data for week-over-week changes
                         weeks = sorted(search_df['week'].unique())
                         if len(weeks) >= 2:
                             current_week = weeks[-1]
                             previous_week = weeks[-2]
                             
-                            current_data = search_df[search_df['week'] == current_week].groupby('campaign_aggregated')['events_count'].sum()
-                            previous_data = search_df[search_df['week'] == previous_week].groupby('campaign_aggregated')['events_count'].sum()
+                            current_data = date_window(search_df, current_week, current_week, 'week').groupby('campaign_aggregated', observed=True)['events_count'].sum()
+                            previous_data = date_window(search_df, previous_week, previous_week, 'week').groupby('campaign_aggregated', observed=True)['events_count'].sum()
                             
                             # Calculate percentage changes
                             campaign_performance = pd.DataFrame({
@@ -900,7 +814,7 @@ def google_analytics_page() -> None:
                             st.dataframe(campaign_performance, width='stretch', hide_index=True)
                         else:
                             # Fallback if not enough weeks of data
-                            campaign_totals = search_df.groupby('campaign_aggregated')['events_count'].sum().reset_index()
+                            campaign_totals = search_df.groupby('campaign_aggregated', observed=True)['events_count'].sum().reset_index()
                             campaign_totals.columns = ['Campaign', 'Installs']
                             campaign_totals = campaign_totals.sort_values('Installs', ascending=False)
                             st.dataframe(campaign_totals, width='stretch', hide_index=True)
@@ -909,7 +823,7 @@ def google_analytics_page() -> None:
                         st.write("**Campaign Trends**")
                         
                         # Campaign trends chart
-                        campaign_daily = search_df.groupby(['event_date', 'campaign_aggregated'])['events_count'].sum().reset_index()
+                        campaign_daily = search_df.groupby(['event_date', 'campaign_aggregated'], observed=True)['events_count'].sum().reset_index()
                         
                         fig_search_trends = px.line(
                             campaign_daily,
@@ -946,13 +860,13 @@ def google_analytics_page() -> None:
                         (search_df['campaign_details_aggregated'].notna()) & 
                         (search_df['campaign_details_aggregated'] != '') &
                         (search_df['campaign_aggregated'] == 'search')
-                    ].copy()
+                    ]
                     
                     if not keywords_df.empty:
                         # Calculate keyword performance with week-over-week changes
                         if len(weeks) >= 2:
-                            current_kw_data = keywords_df[keywords_df['week'] == current_week].groupby('campaign_details_aggregated')['events_count'].sum()
-                            previous_kw_data = keywords_df[keywords_df['week'] == previous_week].groupby('campaign_details_aggregated')['events_count'].sum()
+                            current_kw_data = date_window(keywords_df, current_week, current_week, 'week').groupby('campaign_details_aggregated', observed=True)['events_count'].sum()
+                            previous_kw_data = date_window(keywords_df, previous_week, previous_week, 'week').groupby('campaign_details_aggregated', observed=True)['events_count'].sum()
                             
                             keyword_performance = pd.DataFrame({
                                 'Search-KWs': current_kw_data.index,
@@ -974,7 +888,7 @@ def google_analytics_page() -> None:
                             st.dataframe(keyword_performance, width='stretch', hide_index=True)
                         else:
                             # Fallback for keywords
-                            keyword_totals = keywords_df.groupby('campaign_details_aggregated')['events_count'].sum().reset_index()
+                            keyword_totals = keywords_df.groupby('campaign_details_aggregated', observed=True)['events_count'].sum().reset_index()
                             keyword_totals.columns = ['Search-KWs', 'Installs']
                             keyword_totals = keyword_totals.sort_values('Installs', ascending=False)
                             st.dataframe(keyword_totals, width='stretch', hide_index=True)
@@ -987,7 +901,7 @@ def google_analytics_page() -> None:
                 st.subheader('Organic - Explore')
                 
                 # Filter for organic placement (exploration)
-                explore_df = organic_df[organic_df['medium_aggregated'] == 'organic_placement'].copy()
+                explore_df = ga.installs.rows('medium_aggregated', 'organic_placement')
                 
                 if not explore_df.empty:
                     # Campaign performance for explore
@@ -996,15 +910,14 @@ def google_analytics_page() -> None:
                     with col1:
                         st.write("**Campaign Performance**")
                         
-                        explore_df['week'] = explore_df['event_date'].dt.to_period('W').dt.start_time
                         weeks = sorted(explore_df['week'].unique())
                         
                         if len(weeks) >= 2:
                             current_week = weeks[-1]
                             previous_week = weeks[-2]
                             
-                            current_explore_data = explore_df[explore_df['week'] == current_week].groupby('campaign_aggregated')['events_count'].sum()
-                            previous_explore_data = explore_df[explore_df['week'] == previous_week].groupby('campaign_aggregated')['events_count'].sum()
+                            current_explore_data = date_window(explore_df, current_week, current_week, 'week').groupby('campaign_aggregated', observed=True)['events_count'].sum()
+                            previous_explore_data = date_window(explore_df, previous_week, previous_week, 'week').groupby('campaign_aggregated', observed=True)['events_count'].sum()
                             
                             explore_performance = pd.DataFrame({
                                 'Campaign': current_explore_data.index,
@@ -1025,7 +938,7 @@ def google_analytics_page() -> None:
                             
                             st.dataframe(explore_performance, width='stretch', hide_index=True)
                         else:
-                            explore_totals = explore_df.groupby('campaign_aggregated')['events_count'].sum().reset_index()
+                            explore_totals = explore_df.groupby('campaign_aggregated', observed=True)['events_count'].sum().reset_index()
                             explore_totals.columns = ['Campaign', 'Installs']
                             explore_totals = explore_totals.sort_values('Installs', ascending=False)
                             st.dataframe(explore_totals, width='stretch', hide_index=True)
@@ -1033,7 +946,7 @@ def google_analytics_page() -> None:
                     with col2:
                         st.write("**Campaign Trends**")
                         
-                        explore_daily = explore_df.groupby(['event_date', 'campaign_aggregated'])['events_count'].sum().reset_index()
+                        explore_daily = explore_df.groupby(['event_date', 'campaign_aggregated'], observed=True)['events_count'].sum().reset_index()
                         
                         fig_explore_trends = px.line(
                             explore_daily,
@@ -1071,13 +984,13 @@ def google_analytics_page() -> None:
                         previous_week = weeks[-2]
                         
                         # Current week placement data
-                        current_placement_data = explore_df[explore_df['week'] == current_week].groupby(['campaign_aggregated', 'campaign_details_aggregated'])['events_count'].sum().reset_index()
+                        current_placement_data = date_window(explore_df, current_week, current_week, 'week').groupby(['campaign_aggregated', 'campaign_details_aggregated'], observed=True)['events_count'].sum().reset_index()
                         current_placement_data = current_placement_data[current_placement_data['campaign_details_aggregated'].notna() & 
                                                                       (current_placement_data['campaign_details_aggregated'] != '')]
                         current_placement_data.columns = ['Campaign', 'Placement', 'Current_Installs']
                         
                         # Previous week placement data
-                        previous_placement_data = explore_df[explore_df['week'] == previous_week].groupby(['campaign_aggregated', 'campaign_details_aggregated'])['events_count'].sum().reset_index()
+                        previous_placement_data = date_window(explore_df, previous_week, previous_week, 'week').groupby(['campaign_aggregated', 'campaign_details_aggregated'], observed=True)['events_count'].sum().reset_index()
                         previous_placement_data = previous_placement_data[previous_placement_data['campaign_details_aggregated'].notna() & 
                                                                         (previous_placement_data['campaign_details_aggregated'] != '')]
                         previous_placement_data.columns = ['Campaign', 'Placement', 'Previous_Installs']
@@ -1098,7 +1011,7 @@ def google_analytics_page() -> None:
                         placement_df = placement_df.sort_values('Current_Installs', ascending=False)
                         
                         # Create display table
-                        display_placement_df = placement_df[['Campaign', 'Placement', 'Current_Installs', 'WoW_Delta', 'WoW_Percent']].copy()
+                        display_placement_df = placement_df[['Campaign', 'Placement', 'Current_Installs', 'WoW_Delta', 'WoW_Percent']]
                         display_placement_df.columns = ['Campaign', 'Placement', 'Installs', 'WoW Δ', 'WoW %']
                         
                         # Format the WoW % column
@@ -1112,7 +1025,7 @@ def google_analytics_page() -> None:
                             st.info("No detailed placement data available.")
                     else:
                         # Fallback if not enough weeks of data
-                        placement_df = explore_df.groupby(['campaign_aggregated', 'campaign_details_aggregated'])['events_count'].sum().reset_index()
+                        placement_df = explore_df.groupby(['campaign_aggregated', 'campaign_details_aggregated'], observed=True)['events_count'].sum().reset_index()
                         placement_df = placement_df[placement_df['campaign_details_aggregated'].notna() & 
                                                   (placement_df['campaign_details_aggregated'] != '')]
                         placement_df.columns = ['Campaign', 'Placement', 'Installs']
@@ -1134,12 +1047,12 @@ def google_analytics_page() -> None:
                             previous_week = weeks[-2]
                             
                             # Current week category data
-                            current_category_data = explore_df[explore_df['week'] == current_week].groupby('surface_type_parsed')['events_count'].sum().reset_index()
+                            current_category_data = date_window(explore_df, current_week, current_week, 'week').groupby('surface_type_parsed', observed=True)['events_count'].sum().reset_index()
                             current_category_data = current_category_data[current_category_data['surface_type_parsed'].notna()]
                             current_category_data.columns = ['Category', 'Current_Installs']
                             
                             # Previous week category data
-                            previous_category_data = explore_df[explore_df['week'] == previous_week].groupby('surface_type_parsed')['events_count'].sum().reset_index()
+                            previous_category_data = date_window(explore_df, previous_week, previous_week, 'week').groupby('surface_type_parsed', observed=True)['events_count'].sum().reset_index()
                             previous_category_data = previous_category_data[previous_category_data['surface_type_parsed'].notna()]
                             previous_category_data.columns = ['Category', 'Previous_Installs']
                             
@@ -1153,7 +1066,7 @@ def google_analytics_page() -> None:
                             
                             # Format for display
                             category_df = category_df.sort_values('Current_Installs', ascending=False)
-                            display_category_df = category_df[['Category', 'Current_Installs', 'WoW_Delta', 'WoW_Percent']].copy()
+                            display_category_df = category_df[['Category', 'Current_Installs', 'WoW_Delta', 'WoW_Percent']]
                             display_category_df.columns = ['Category', 'Installs', 'WoW Δ', 'WoW %']
                             display_category_df['WoW %'] = display_category_df['WoW %'].apply(
                                 lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
@@ -1165,7 +1078,7 @@ def google_analytics_page() -> None:
                                 st.info("No category data available.")
                         else:
                             # Fallback if not enough weeks of data
-                            category_df = explore_df.groupby('surface_type_parsed')['events_count'].sum().reset_index()
+                            category_df = explore_df.groupby('surface_type_parsed', observed=True)['events_count'].sum().reset_index()
                             category_df = category_df[category_df['surface_type_parsed'].notna()]
                             category_df.columns = ['Category', 'Installs']
                             category_df = category_df.sort_values('Installs', ascending=False)
@@ -1183,12 +1096,12 @@ def google_analytics_page() -> None:
                             previous_week = weeks[-2]
                             
                             # Current week story data
-                            current_story_data = explore_df[explore_df['week'] == current_week].groupby('surface_detail_parsed')['events_count'].sum().reset_index()
+                            current_story_data = date_window(explore_df, current_week, current_week, 'week').groupby('surface_detail_parsed', observed=True)['events_count'].sum().reset_index()
                             current_story_data = current_story_data[current_story_data['surface_detail_parsed'].notna()]
                             current_story_data.columns = ['Story', 'Current_Installs']
                             
                             # Previous week story data
-                            previous_story_data = explore_df[explore_df['week'] == previous_week].groupby('surface_detail_parsed')['events_count'].sum().reset_index()
+                            previous_story_data = date_window(explore_df, previous_week, previous_week, 'week').groupby('surface_detail_parsed', observed=True)['events_count'].sum().reset_index()
                             previous_story_data = previous_story_data[previous_story_data['surface_detail_parsed'].notna()]
                             previous_story_data.columns = ['Story', 'Previous_Installs']
                             
@@ -1202,7 +1115,7 @@ def google_analytics_page() -> None:
                             
                             # Format for display
                             story_df = story_df.sort_values('Current_Installs', ascending=False)
-                            display_story_df = story_df[['Story', 'Current_Installs', 'WoW_Delta', 'WoW_Percent']].copy()
+                            display_story_df = story_df[['Story', 'Current_Installs', 'WoW_Delta', 'WoW_Percent']]
                             display_story_df.columns = ['Story', 'Installs', 'WoW Δ', 'WoW %']
                             display_story_df['WoW %'] = display_story_df['WoW %'].apply(
                                 lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
@@ -1214,7 +1127,7 @@ def google_analytics_page() -> None:
                                 st.info("No story data available.")
                         else:
                             # Fallback if not enough weeks of data
-                            story_df = explore_df.groupby('surface_detail_parsed')['events_count'].sum().reset_index()
+                            story_df = explore_df.groupby('surface_detail_parsed', observed=True)['events_count'].sum().reset_index()
                             story_df = story_df[story_df['surface_detail_parsed'].notna()]
                             story_df.columns = ['Story', 'Installs']
                             story_df = story_df.sort_values('Installs', ascending=False)
@@ -1230,7 +1143,7 @@ def google_analytics_page() -> None:
                 st.subheader('Organic - Uncategorised (check - disregard)')
                 
                 # Filter for uncategorised organic traffic
-                uncategorised_df = organic_df[organic_df['medium_aggregated'] == 'organic_uncategorised'].copy()
+                uncategorised_df = ga.installs.rows('medium_aggregated', 'organic_uncategorised')
                 
                 if not uncategorised_df.empty:
                     # Show raw data for investigation
@@ -1244,7 +1157,7 @@ def google_analytics_page() -> None:
                     ]
                     
                     # Aggregate by the analysis columns
-                    uncategorised_summary = uncategorised_df.groupby([col for col in analysis_columns if col != 'events_count'])['events_count'].sum().reset_index()
+                    uncategorised_summary = uncategorised_df.groupby([col for col in analysis_columns if col != 'events_count'], observed=True)['events_count'].sum().reset_index()
                     uncategorised_summary = uncategorised_summary.sort_values('events_count', ascending=False)
                     
                     # Rename columns for display
@@ -1272,24 +1185,24 @@ def google_analytics_page() -> None:
             st.subheader('Organic Trends Analysis')
             
             # Filter data for organic traffic only
-            organic_trends_df = df[df['medium_aggregated'].isin(['organic_search', 'organic_placement'])].copy()
+            organic_trends_df = ga.installs.rows('medium_aggregated', ['organic_search', 'organic_placement'])
             
             if organic_trends_df.empty:
                 st.info('No organic trends data available.')
                 return
             
-            # Filter to last 30 days for trends
-            last_30_days = organic_trends_df['event_date'] >= (organic_trends_df['event_date'].max() - pd.Timedelta(days=30))
-            organic_trends_df = organic_trends_df[last_30_days].copy()
+            # Filter to last 30 days for trends (rows of several mediums are ordered by medium, then date)
+            trends_start = organic_trends_df['event_date'].max() - pd.Timedelta(days=30)
+            organic_trends_df = ga.installs.rows('medium_aggregated', ['organic_search', 'organic_placement'], trends_start)
             
             # Organic Search Trends - Last 30 Days
             st.subheader('Organic_Search - Last 30 Days')
             
-            search_trends_df = organic_trends_df[organic_trends_df['medium_aggregated'] == 'organic_search'].copy()
+            search_trends_df = ga.installs.rows('medium_aggregated', 'organic_search', trends_start)
             
             if not search_trends_df.empty:
                 # Aggregate by date and campaign for organic search
-                search_daily = search_trends_df.groupby(['event_date', 'campaign_aggregated'])['events_count'].sum().reset_index()
+                search_daily = search_trends_df.groupby(['event_date', 'campaign_aggregated'], observed=True)['events_count'].sum().reset_index()
                 
                 # Create the organic search trends chart with brand colors
                 fig_organic_search = px.line(
@@ -1325,7 +1238,7 @@ def google_analytics_page() -> None:
             # Organic Explore Trends - Last 30 Days
             st.subheader('Organic_Explore - Last 30 Days')
             
-            explore_trends_df = organic_trends_df[organic_trends_df['medium_aggregated'] == 'organic_placement'].copy()
+            explore_trends_df = ga.installs.rows('medium_aggregated', 'organic_placement', trends_start)
             
             # Initialize color_column for later use
             color_column = 'campaign_aggregated'  # default
@@ -1335,8 +1248,9 @@ def google_analytics_page() -> None:
                 # First, let's try campaign_aggregated, then fall back to surface_type_parsed
                 
                 # Check if we have meaningful campaign data
-                campaign_data = explore_trends_df.groupby(['event_date', 'campaign_aggregated'])['events_count'].sum().reset_index()
+                campaign_data = explore_trends_df.groupby(['event_date', 'campaign_aggregated'], observed=True)['events_count'].sum().reset_index()
                 campaign_counts = campaign_data['campaign_aggregated'].value_counts()
+                campaign_counts = campaign_counts[campaign_counts > 0]  # categorical: skip unobserved campaigns
                 
                 # If we have good campaign diversity, use campaigns
                 if len(campaign_counts) > 1 and campaign_counts.iloc[0] < len(campaign_data) * 0.8:
@@ -1344,7 +1258,7 @@ def google_analytics_page() -> None:
                     color_column = 'campaign_aggregated'
                 else:
                     # Otherwise use surface_type as it represents different placement types
-                    explore_daily = explore_trends_df.groupby(['event_date', 'surface_type_parsed'])['events_count'].sum().reset_index()
+                    explore_daily = explore_trends_df.groupby(['event_date', 'surface_type_parsed'], observed=True)['events_count'].sum().reset_index()
                     explore_daily = explore_daily[explore_daily['surface_type_parsed'].notna()]
                     color_column = 'surface_type_parsed'
                 
@@ -1409,7 +1323,7 @@ def google_analytics_page() -> None:
                 with col1:
                     st.write("**Top Organic Search Campaigns**")
                     if not search_trends_df.empty:
-                        top_search = search_trends_df.groupby('campaign_aggregated')['events_count'].sum().sort_values(ascending=False).head(5)
+                        top_search = search_trends_df.groupby('campaign_aggregated', observed=True)['events_count'].sum().sort_values(ascending=False).head(5)
                         search_df_display = pd.DataFrame({
                             'Campaign': top_search.index,
                             'Events': top_search.values
@@ -1423,13 +1337,13 @@ def google_analytics_page() -> None:
                     if not explore_trends_df.empty:
                         # Use the same logic as the chart for consistency
                         if color_column == 'campaign_aggregated':
-                            top_explore = explore_trends_df.groupby('campaign_aggregated')['events_count'].sum().sort_values(ascending=False).head(5)
+                            top_explore = explore_trends_df.groupby('campaign_aggregated', observed=True)['events_count'].sum().sort_values(ascending=False).head(5)
                             explore_df_display = pd.DataFrame({
                                 'Campaign': top_explore.index,
                                 'Events': top_explore.values
                             })
                         else:
-                            top_explore = explore_trends_df.groupby('surface_type_parsed')['events_count'].sum().sort_values(ascending=False).head(5)
+                            top_explore = explore_trends_df.groupby('surface_type_parsed', observed=True)['events_count'].sum().sort_values(ascending=False).head(5)
                             explore_df_display = pd.DataFrame({
                                 'Surface Type': top_explore.index,
                                 'Events': top_explore.values
@@ -1447,7 +1361,7 @@ def google_analytics_page() -> None:
             partner_df = df[
                 (df['surface_type_parsed'] == 'partners') | 
                 (df['campaign_aggregated'] == 'partners')
-            ].copy()
+            ]
             
             # Also get partner views data
             partner_views_df = pd.DataFrame()
@@ -1455,7 +1369,7 @@ def google_analytics_page() -> None:
                 partner_views_df = views_df[
                     (views_df['surface_type_parsed'] == 'partners') | 
                     (views_df['campaign_aggregated'] == 'partners')
-                ].copy()
+                ]
             
             if partner_df.empty and partner_views_df.empty:
                 st.info('No partner traffic data available.')
@@ -1472,15 +1386,15 @@ def google_analytics_page() -> None:
             st.subheader('Partner Trends by Source - Last 6 months')
             
             # Filter to last 6 months (approximately 180 days)
-            six_months_ago = df['event_date'].max() - pd.Timedelta(days=180)
+            six_months_ago = ga.installs.latest - pd.Timedelta(days=180)
             
             # Filter partner data for last 6 months
-            partner_trends_df = partner_df[partner_df['event_date'] >= six_months_ago].copy()
-            partner_views_trends_df = partner_views_df[partner_views_df['event_date'] >= six_months_ago].copy() if not partner_views_df.empty else pd.DataFrame()
+            partner_trends_df = date_window(partner_df, six_months_ago)
+            partner_views_trends_df = date_window(partner_views_df, six_months_ago)
             
             if not partner_trends_df.empty:
                 # Create trend lines by source
-                source_daily = partner_trends_df.groupby(['event_date', 'source_aggregated'])['events_count'].sum().reset_index()
+                source_daily = partner_trends_df.groupby(['event_date', 'source_aggregated'], observed=True)['events_count'].sum().reset_index()
                 
                 fig_partner_sources = px.line(
                     source_daily,
@@ -1516,95 +1430,34 @@ def google_analytics_page() -> None:
             st.subheader('Partner Performance - Last Week vs Previous Week')
             
             # Calculate week boundaries
-            latest_date = df['event_date'].max()
+            latest_date = ga.installs.latest
             current_week_start = latest_date - pd.Timedelta(days=latest_date.weekday())  # Start of current week (Monday)
             last_week_start = current_week_start - pd.Timedelta(days=7)
             last_week_end = current_week_start - pd.Timedelta(days=1)
             previous_week_start = last_week_start - pd.Timedelta(days=7)
             previous_week_end = last_week_start - pd.Timedelta(days=1)
             
-            # Filter data for last week and previous week
-            last_week_installs = partner_df[
-                (partner_df['event_date'] >= last_week_start) & 
-                (partner_df['event_date'] <= last_week_end)
-            ].copy()
-            
-            previous_week_installs = partner_df[
-                (partner_df['event_date'] >= previous_week_start) & 
-                (partner_df['event_date'] <= previous_week_end)
-            ].copy()
-            
-            last_week_views = partner_views_df[
-                (partner_views_df['event_date'] >= last_week_start) & 
-                (partner_views_df['event_date'] <= last_week_end)
-            ].copy() if not partner_views_df.empty else pd.DataFrame()
-            
-            previous_week_views = partner_views_df[
-                (partner_views_df['event_date'] >= previous_week_start) & 
-                (partner_views_df['event_date'] <= previous_week_end)
-            ].copy() if not partner_views_df.empty else pd.DataFrame()
-            
-            # Create performance comparison table
-            performance_data = []
-            
-            # Get all unique sources from both weeks
-            all_sources = set()
-            if not last_week_installs.empty:
-                all_sources.update(last_week_installs['source_aggregated'].unique())
-            if not previous_week_installs.empty:
-                all_sources.update(previous_week_installs['source_aggregated'].unique())
-            if not last_week_views.empty:
-                all_sources.update(last_week_views['source_aggregated'].unique())
-            if not previous_week_views.empty:
-                all_sources.update(previous_week_views['source_aggregated'].unique())
-            
-            for source in all_sources:
-                # Calculate metrics for last week
-                lw_installs = last_week_installs[last_week_installs['source_aggregated'] == source]['events_count'].sum()
-                lw_views = last_week_views[last_week_views['source_aggregated'] == source]['events_count'].sum() if not last_week_views.empty else 0
-                
-                # Calculate metrics for previous week
-                pw_installs = previous_week_installs[previous_week_installs['source_aggregated'] == source]['events_count'].sum()
-                pw_views = previous_week_views[previous_week_views['source_aggregated'] == source]['events_count'].sum() if not previous_week_views.empty else 0
-                
-                # Calculate deltas
-                installs_delta = lw_installs - pw_installs
-                views_delta = lw_views - pw_views
-                
-                # Calculate percentage changes
-                installs_pct = (installs_delta / pw_installs * 100) if pw_installs > 0 else 0
-                views_pct = (views_delta / pw_views * 100) if pw_views > 0 else 0
-                
-                # Calculate conversion rates
-                lw_conversion = (lw_installs / lw_views * 100) if lw_views > 0 else 0
-                pw_conversion = (pw_installs / pw_views * 100) if pw_views > 0 else 0
-                conversion_delta = lw_conversion - pw_conversion
-                
-                performance_data.append({
-                    'Source': source,
-                    'Page Views': f"{lw_views:,}",
-                    'Page Views Δ': f"{views_delta:+,} ({views_pct:+.1f}%)" if pw_views > 0 else f"{views_delta:+,}",
-                    'Installs': f"{lw_installs:,}",
-                    'Installs Δ': f"{installs_delta:+,} ({installs_pct:+.1f}%)" if pw_installs > 0 else f"{installs_delta:+,}",
-                    'Conversion Rate': f"{lw_conversion:.2f}%",
-                    'Conversion Δ': f"{conversion_delta:+.2f}%" if pw_views > 0 and lw_views > 0 else "N/A"
-                })
-            
-            if performance_data:
-                performance_df = pd.DataFrame(performance_data)
-                performance_df = performance_df.sort_values('Installs', key=lambda x: x.str.replace(',', '').astype(int), ascending=False)
-                
-                st.dataframe(performance_df, width='stretch', hide_index=True)
+            # Views, installs and conversion per source, last week vs the week before
+            performance_df = period_comparison(
+                partner_df,
+                partner_views_df,
+                'source_aggregated',
+                (last_week_start, last_week_end),
+                (previous_week_start, previous_week_end),
+            )
+            
+            if not performance_df.empty:
+                st.dataframe(comparison_table(performance_df, 'Source'), width='stretch', hide_index=True, column_config=COMPARISON_FORMATS)
                 
                 # Summary metrics
                 st.subheader('Partner Summary - Last Week')
                 
                 col1, col2, col3, col4 = st.columns(4)
                 
-                total_lw_views = last_week_views['events_count'].sum() if not last_week_views.empty else 0
-                total_pw_views = previous_week_views['events_count'].sum() if not previous_week_views.empty else 0
-                total_lw_installs = last_week_installs['events_count'].sum() if not last_week_installs.empty else 0
-                total_pw_installs = previous_week_installs['events_count'].sum() if not previous_week_installs.empty else 0
+                total_lw_views = performance_df['views'].sum()
+                total_pw_views = performance_df['views_prev'].sum()
+                total_lw_installs = performance_df['installs'].sum()
+                total_pw_installs = performance_df['installs_prev'].sum()
                 
                 views_change = total_lw_views - total_pw_views
                 installs_change = total_lw_installs - total_pw_installs
@@ -1623,7 +1476,7 @@ def google_analytics_page() -> None:
                     st.metric("Overall Conversion Rate", f"{overall_lw_conversion:.2f}%", delta=f"{conversion_change:.2f}%")
                 
                 with col4:
-                    partner_sources_count = len(all_sources)
+                    partner_sources_count = len(performance_df)
                     st.metric("Active Partner Sources", partner_sources_count)
             else:
                 st.info("No partner performance data available for the selected time periods.")
@@ -1634,12 +1487,12 @@ def google_analytics_page() -> None:
             # Filter data for paid traffic
             # Note: Based on actual data analysis, there's currently no paid_search traffic in the dataset
             # This section will show a message about data availability
-            paid_df = df[df['medium_aggregated'] == 'paid_search'].copy()
+            paid_df = ga.installs.rows('medium_aggregated', 'paid_search')
             
             # Also get paid views data
             paid_views_df = pd.DataFrame()
             if not views_df.empty:
-                paid_views_df = views_df[views_df['medium_aggregated'] == 'paid_search'].copy()
+                paid_views_df = ga.views.rows('medium_aggregated', 'paid_search')
             
             if paid_df.empty and paid_views_df.empty:
                 st.info('No paid search traffic data available in the current dataset.')
@@ -1663,21 +1516,21 @@ def google_analytics_page() -> None:
             st.subheader('Paid Keywords Trends - Last 6 months (Top 10)')
             
             # Filter to last 6 months (approximately 180 days)
-            six_months_ago = df['event_date'].max() - pd.Timedelta(days=180)
+            six_months_ago = ga.installs.latest - pd.Timedelta(days=180)
             
             # Filter paid data for last 6 months
-            paid_trends_df = paid_df[paid_df['event_date'] >= six_months_ago].copy()
-            paid_views_trends_df = paid_views_df[paid_views_df['event_date'] >= six_months_ago].copy() if not paid_views_df.empty else pd.DataFrame()
+            paid_trends_df = date_window(paid_df, six_months_ago)
+            paid_views_trends_df = date_window(paid_views_df, six_months_ago)
             
             if not paid_trends_df.empty:
                 # Get top 10 keywords/campaigns by total installs
-                top_keywords = paid_trends_df.groupby('campaign_aggregated')['events_count'].sum().nlargest(10).index.tolist()
+                top_keywords = paid_trends_df.groupby('campaign_aggregated', observed=True)['events_count'].sum().nlargest(10).index.tolist()
                 
                 # Filter data to top 10 keywords only
                 top_keywords_df = paid_trends_df[paid_trends_df['campaign_aggregated'].isin(top_keywords)]
                 
                 # Create trend lines by keywords
-                keyword_daily = top_keywords_df.groupby(['event_date', 'campaign_aggregated'])['events_count'].sum().reset_index()
+                keyword_daily = top_keywords_df.groupby(['event_date', 'campaign_aggregated'], observed=True)['events_count'].sum().reset_index()
                 
                 fig_paid_keywords = px.line(
                     keyword_daily,
@@ -1713,100 +1566,34 @@ def google_analytics_page() -> None:
             st.subheader('Paid Keywords Performance - Last Week vs Previous Week')
             
             # Calculate week boundaries
-            latest_date = df['event_date'].max()
+            latest_date = ga.installs.latest
             current_week_start = latest_date - pd.Timedelta(days=latest_date.weekday())
             last_week_start = current_week_start - pd.Timedelta(days=7)
             last_week_end = current_week_start - pd.Timedelta(days=1)
             previous_week_start = last_week_start - pd.Timedelta(days=7)
             previous_week_end = last_week_start - pd.Timedelta(days=1)
             
-            # Filter data for last week and previous week
-            last_week_paid_installs = paid_df[
-                (paid_df['event_date'] >= last_week_start) & 
-                (paid_df['event_date'] <= last_week_end)
-            ].copy()
-            
-            previous_week_paid_installs = paid_df[
-                (paid_df['event_date'] >= previous_week_start) & 
-                (paid_df['event_date'] <= previous_week_end)
-            ].copy()
-            
-            last_week_paid_views = paid_views_df[
-                (paid_views_df['event_date'] >= last_week_start) & 
-                (paid_views_df['event_date'] <= last_week_end)
-            ].copy() if not paid_views_df.empty else pd.DataFrame()
-            
-            previous_week_paid_views = paid_views_df[
-                (paid_views_df['event_date'] >= previous_week_start) & 
-                (paid_views_df['event_date'] <= previous_week_end)
-            ].copy() if not paid_views_df.empty else pd.DataFrame()
-            
-            # Create performance comparison table by campaign
-            paid_performance_data = []
-            
-            # Get all unique campaigns from both weeks
-            all_campaigns = set()
-            if not last_week_paid_installs.empty:
-                all_campaigns.update(last_week_paid_installs['campaign_aggregated'].unique())
-            if not previous_week_paid_installs.empty:
-                all_campaigns.update(previous_week_paid_installs['campaign_aggregated'].unique())
-            if not last_week_paid_views.empty:
-                all_campaigns.update(last_week_paid_views['campaign_aggregated'].unique())
-            if not previous_week_paid_views.empty:
-                all_campaigns.update(previous_week_paid_views['campaign_aggregated'].unique())
-            
-            for campaign in all_campaigns:
-                # Calculate metrics for last week
-                lw_installs = last_week_paid_installs[last_week_paid_installs['campaign_aggregated'] == campaign]['events_count'].sum()
-                lw_views = last_week_paid_views[last_week_paid_views['campaign_aggregated'] == campaign]['events_count'].sum() if not last_week_paid_views.empty else 0
-                
-                # Calculate metrics for previous week
-                pw_installs = previous_week_paid_installs[previous_week_paid_installs['campaign_aggregated'] == campaign]['events_count'].sum()
-                pw_views = previous_week_paid_views[previous_week_paid_views['campaign_aggregated'] == campaign]['events_count'].sum() if not previous_week_paid_views.empty else 0
-                
-                # Calculate deltas
-                installs_delta = lw_installs - pw_installs
-                views_delta = lw_views - pw_views
-                
-                # Calculate percentage changes
-                installs_pct = (installs_delta / pw_installs * 100) if pw_installs > 0 else 0
-                views_pct = (views_delta / pw_views * 100) if pw_views > 0 else 0
-                
-                # Calculate conversion rates
-                lw_conversion = (lw_installs / lw_views * 100) if lw_views > 0 else 0
-                pw_conversion = (pw_installs / pw_views * 100) if pw_views > 0 else 0
-                conversion_delta = lw_conversion - pw_conversion
-                
-                # Calculate cost metrics (simulated - would need actual cost data)
-                # For now, we'll show placeholder values
-                cpc = "N/A"  # Cost per click
-                cpa = "N/A"  # Cost per acquisition
-                
-                paid_performance_data.append({
-                    'Keywords': campaign,
-                    'Page Views': f"{lw_views:,}",
-                    'Page Views Δ': f"{views_delta:+,} ({views_pct:+.1f}%)" if pw_views > 0 else f"{views_delta:+,}",
-                    'Installs': f"{lw_installs:,}",
-                    'Installs Δ': f"{installs_delta:+,} ({installs_pct:+.1f}%)" if pw_installs > 0 else f"{installs_delta:+,}",
-                    'Conversion Rate': f"{lw_conversion:.2f}%",
-                    'Conversion Δ': f"{conversion_delta:+.2f}%" if pw_views > 0 and lw_views > 0 else "N/A"
-                })
-            
-            if paid_performance_data:
-                paid_performance_df = pd.DataFrame(paid_performance_data)
-                paid_performance_df = paid_performance_df.sort_values('Installs', key=lambda x: x.str.replace(',', '').astype(int), ascending=False)
-                
-                st.dataframe(paid_performance_df, width='stretch', hide_index=True)
+            # Views, installs and conversion per keywords, last week vs the week before
+            paid_performance_df = period_comparison(
+                paid_df,
+                paid_views_df,
+                'campaign_aggregated',
+                (last_week_start, last_week_end),
+                (previous_week_start, previous_week_end),
+            )
+            
+            if not paid_performance_df.empty:
+                st.dataframe(comparison_table(paid_performance_df, 'Keywords'), width='stretch', hide_index=True, column_config=COMPARISON_FORMATS)
                 
                 # Summary metrics
                 st.subheader('Paid Summary - Last Week')
                 
                 col1, col2, col3, col4 = st.columns(4)
                 
-                total_lw_clicks = last_week_paid_views['events_count'].sum() if not last_week_paid_views.empty else 0
-                total_pw_clicks = previous_week_paid_views['events_count'].sum() if not previous_week_paid_views.empty else 0
-                total_lw_installs = last_week_paid_installs['events_count'].sum() if not last_week_paid_installs.empty else 0
-                total_pw_installs = previous_week_paid_installs['events_count'].sum() if not previous_week_paid_installs.empty else 0
+                total_lw_clicks = paid_performance_df['views'].sum()
+                total_pw_clicks = paid_performance_df['views_prev'].sum()
+                total_lw_installs = paid_performance_df['installs'].sum()
+                total_pw_installs = paid_performance_df['installs_prev'].sum()
                 
                 clicks_change = total_lw_clicks - total_pw_clicks
                 installs_change = total_lw_installs - total_pw_installs
@@ -1825,7 +1612,7 @@ def google_analytics_page() -> None:
                     st.metric("Overall CVR", f"{overall_lw_cvr:.2f}%", delta=f"{cvr_change:.2f}%")
                 
                 with col4:
-                    active_campaigns = len(all_campaigns)
+                    active_campaigns = len(paid_performance_df)
                     st.metric("Active Campaigns", active_campaigns)
             else:
                 st.info("No paid performance data available for the selected time periods.")
@@ -1834,12 +1621,12 @@ def google_analytics_page() -> None:
             st.subheader('Top Performing Campaigns - Last 30 Days')
             
             # Filter to last 30 days
-            thirty_days_ago = df['event_date'].max() - pd.Timedelta(days=30)
-            paid_30d_df = paid_df[paid_df['event_date'] >= thirty_days_ago].copy()
+            thirty_days_ago = ga.installs.latest - pd.Timedelta(days=30)
+            paid_30d_df = date_window(paid_df, thirty_days_ago)
             
             if not paid_30d_df.empty:
                 # Top campaigns by installs
-                top_campaigns = paid_30d_df.groupby('campaign_aggregated')['events_count'].sum().sort_values(ascending=False).head(10)
+                top_campaigns = paid_30d_df.groupby('campaign_aggregated', observed=True)['events_count'].sum().sort_values(ascending=False).head(10)
                 
                 col1, col2 = st.columns(2)
                 
@@ -1881,12 +1668,12 @@ def google_analytics_page() -> None:
             st.subheader('Website Traffic Analysis')
             
             # Filter data for website traffic
-            website_df = df[df['medium_aggregated'] == 'website'].copy()
+            website_df = ga.installs.rows('medium_aggregated', 'website')
             
             # Also get website views data
             website_views_df = pd.DataFrame()
             if not views_df.empty:
-                website_views_df = views_df[views_df['medium_aggregated'] == 'website'].copy()
+                website_views_df = ga.views.rows('medium_aggregated', 'website')
             
             if website_df.empty and website_views_df.empty:
                 st.info('No website traffic data available.')
@@ -1900,7 +1687,7 @@ def google_analytics_page() -> None:
             
             if not website_df.empty:
                 # Create trend line by campaign (page type) since source is always 'judgeme'
-                campaign_daily = website_df.groupby(['event_date', 'campaign_aggregated'])['events_count'].sum().reset_index()
+                campaign_daily = website_df.groupby(['event_date', 'campaign_aggregated'], observed=True)['events_count'].sum().reset_index()
                 
                 fig_website_trend = px.line(
                     campaign_daily,
@@ -1939,95 +1726,34 @@ def google_analytics_page() -> None:
             st.subheader('Website Performance - Last Week vs Previous Week')
             
             # Calculate week boundaries
-            latest_date = df['event_date'].max()
+            latest_date = ga.installs.latest
             current_week_start = latest_date - pd.Timedelta(days=latest_date.weekday())
             last_week_start = current_week_start - pd.Timedelta(days=7)
             last_week_end = current_week_start - pd.Timedelta(days=1)
             previous_week_start = last_week_start - pd.Timedelta(days=7)
             previous_week_end = last_week_start - pd.Timedelta(days=1)
             
-            # Filter data for last week and previous week
-            last_week_website_installs = website_df[
-                (website_df['event_date'] >= last_week_start) & 
-                (website_df['event_date'] <= last_week_end)
-            ].copy()
-            
-            previous_week_website_installs = website_df[
-                (website_df['event_date'] >= previous_week_start) & 
-                (website_df['event_date'] <= previous_week_end)
-            ].copy()
-            
-            last_week_website_views = website_views_df[
-                (website_views_df['event_date'] >= last_week_start) & 
-                (website_views_df['event_date'] <= last_week_end)
-            ].copy() if not website_views_df.empty else pd.DataFrame()
-            
-            previous_week_website_views = website_views_df[
-                (website_views_df['event_date'] >= previous_week_start) & 
-                (website_views_df['event_date'] <= previous_week_end)
-            ].copy() if not website_views_df.empty else pd.DataFrame()
-            
-            # Create performance comparison table by source
-            website_performance_data = []
-            
-            # Get all unique sources from both weeks
-            all_website_sources = set()
-            if not last_week_website_installs.empty:
-                all_website_sources.update(last_week_website_installs['source_aggregated'].unique())
-            if not previous_week_website_installs.empty:
-                all_website_sources.update(previous_week_website_installs['source_aggregated'].unique())
-            if not last_week_website_views.empty:
-                all_website_sources.update(last_week_website_views['source_aggregated'].unique())
-            if not previous_week_website_views.empty:
-                all_website_sources.update(previous_week_website_views['source_aggregated'].unique())
-            
-            for source in all_website_sources:
-                # Calculate metrics for last week
-                lw_installs = last_week_website_installs[last_week_website_installs['source_aggregated'] == source]['events_count'].sum()
-                lw_views = last_week_website_views[last_week_website_views['source_aggregated'] == source]['events_count'].sum() if not last_week_website_views.empty else 0
-                
-                # Calculate metrics for previous week
-                pw_installs = previous_week_website_installs[previous_week_website_installs['source_aggregated'] == source]['events_count'].sum()
-                pw_views = previous_week_website_views[previous_week_website_views['source_aggregated'] == source]['events_count'].sum() if not previous_week_website_views.empty else 0
-                
-                # Calculate deltas
-                installs_delta = lw_installs - pw_installs
-                views_delta = lw_views - pw_views
-                
-                # Calculate percentage changes
-                installs_pct = (installs_delta / pw_installs * 100) if pw_installs > 0 else 0
-                views_pct = (views_delta / pw_views * 100) if pw_views > 0 else 0
-                
-                # Calculate conversion rates
-                lw_conversion = (lw_installs / lw_views * 100) if lw_views > 0 else 0
-                pw_conversion = (pw_installs / pw_views * 100) if pw_views > 0 else 0
-                conversion_delta = lw_conversion - pw_conversion
-                
-                website_performance_data.append({
-                    'Source': source,
-                    'Page Views': f"{lw_views:,}",
-                    'Page Views Δ': f"{views_delta:+,} ({views_pct:+.1f}%)" if pw_views > 0 else f"{views_delta:+,}",
-                    'Installs': f"{lw_installs:,}",
-                    'Installs Δ': f"{installs_delta:+,} ({installs_pct:+.1f}%)" if pw_installs > 0 else f"{installs_delta:+,}",
-                    'Conversion Rate': f"{lw_conversion:.2f}%",
-                    'Conversion Δ': f"{conversion_delta:+.2f}%" if pw_views > 0 and lw_views > 0 else "N/A"
-                })
-            
-            if website_performance_data:
-                website_performance_df = pd.DataFrame(website_performance_data)
-                website_performance_df = website_performance_df.sort_values('Installs', key=lambda x: x.str.replace(',', '').astype(int), ascending=False)
-                
-                st.dataframe(website_performance_df, width='stretch', hide_index=True)
+            # Views, installs and conversion per source, last week vs the week before
+            website_performance_df = period_comparison(
+                website_df,
+                website_views_df,
+                'source_aggregated',
+                (last_week_start, last_week_end),
+                (previous_week_start, previous_week_end),
+            )
+            
+            if not website_performance_df.empty:
+                st.dataframe(comparison_table(website_performance_df, 'Source'), width='stretch', hide_index=True, column_config=COMPARISON_FORMATS)
                 
                 # Summary metrics
                 st.subheader('Website Summary - Last Week')
                 
                 col1, col2, col3, col4 = st.columns(4)
                 
-                total_lw_views = last_week_website_views['events_count'].sum() if not last_week_website_views.empty else 0
-                total_pw_views = previous_week_website_views['events_count'].sum() if not previous_week_website_views.empty else 0
-                total_lw_installs = last_week_website_installs['events_count'].sum() if not last_week_website_installs.empty else 0
-                total_pw_installs = previous_week_website_installs['events_count'].sum() if not previous_week_website_installs.empty else 0
+                total_lw_views = website_performance_df['views'].sum()
+                total_pw_views = website_performance_df['views_prev'].sum()
+                total_lw_installs = website_performance_df['installs'].sum()
+                total_pw_installs = website_performance_df['installs_prev'].sum()
                 
                 views_change = total_lw_views - total_pw_views
                 installs_change = total_lw_installs - total_pw_installs
@@ -2046,7 +1772,7 @@ def google_analytics_page() -> None:
                     st.metric("Overall Conversion Rate", f"{overall_lw_conversion:.2f}%", delta=f"{conversion_change:.2f}%")
                 
                 with col4:
-                    website_sources_count = len(all_website_sources)
+                    website_sources_count = len(website_performance_df)
                     st.metric("Active Website Sources", website_sources_count)
             else:
                 st.info("No website performance data available for the selected time periods.")
@@ -2055,9 +1781,9 @@ def google_analytics_page() -> None:
             st.subheader('Top Website Sources - Last 30 Days')
             
             # Filter to last 30 days
-            thirty_days_ago = df['event_date'].max() - pd.Timedelta(days=30)
-            website_30d_df = website_df[website_df['event_date'] >= thirty_days_ago].copy()
-            website_views_30d_df = website_views_df[website_views_df['event_date'] >= thirty_days_ago].copy() if not website_views_df.empty else pd.DataFrame()
+            thirty_days_ago = ga.installs.latest - pd.Timedelta(days=30)
+            website_30d_df = date_window(website_df, thirty_days_ago)
+            website_views_30d_df = date_window(website_views_df, thirty_days_ago)
             
             if not website_30d_df.empty or not website_views_30d_df.empty:
                 col1, col2 = st.columns(2)
@@ -2065,7 +1791,7 @@ def google_analytics_page() -> None:
                 with col1:
                     st.write("**Top Sources by Installs**")
                     if not website_30d_df.empty:
-                        top_sources_installs = website_30d_df.groupby('source_aggregated')['events_count'].sum().sort_values(ascending=False).head(10)
+                        top_sources_installs = website_30d_df.groupby('source_aggregated', observed=True)['events_count'].sum().sort_values(ascending=False).head(10)
                         
                         top_sources_installs_df = pd.DataFrame({
                             'Source': top_sources_installs.index,
@@ -2078,7 +1804,7 @@ def google_analytics_page() -> None:
                 with col2:
                     st.write("**Top Sources by Page Views**")
                     if not website_views_30d_df.empty:
-                        top_sources_views = website_views_30d_df.groupby('source_aggregated')['events_count'].sum().sort_values(ascending=False).head(10)
+                        top_sources_views = website_views_30d_df.groupby('source_aggregated', observed=True)['events_count'].sum().sort_values(ascending=False).head(10)
                         
                         top_sources_views_df = pd.DataFrame({
                             'Source': top_sources_views.index,
@@ -2093,7 +1819,7 @@ def google_analytics_page() -> None:
                     st.subheader('Website Source Performance Chart - Last 30 Days')
                     
                     # Create a horizontal bar chart for top sources
-                    top_5_sources = website_30d_df.groupby('source_aggregated')['events_count'].sum().sort_values(ascending=False).head(5)
+                    top_5_sources = website_30d_df.groupby('source_aggregated', observed=True)['events_count'].sum().sort_values(ascending=False).head(5)
                     
                     fig_website_sources = px.bar(
                         x=top_5_sources.values,
@@ -3,16 +3,22 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
-from src.db.redshift_connection import run_query
+from src.db.datasets import load_dataset
 from src.sql.core_metrics.core_metrics import core_metrics
-from src.sql.core_metrics.monthly_core_metrics import monthly_core_metrics
+from src.sql.growth.lifecycle import lifecycle_extract
+from src.engines.kpi import kpi_deltas
+from src.engines.lifecycle import load_lifecycle_extract, monthly_user_metrics
+from src.engines.flows import period_flows
+from src.engines.rollup import rollup, rolling
+from src.engines.hll import BOUND_Z, distinct_shops_between, distinct_shops_by_period, lifecycle_hll_store
 
 
 def growth_page() -> None:
     st.title('Growth')
     
     # Get core metrics data
-    df = run_query(core_metrics)
+    core = load_dataset(core_metrics)
+    df, version = core.view(), core.version
     
     if df.empty:
         st.info('No data available yet.')
@@ -21,37 +27,58 @@ def growth_page() -> None:
     # Convert week to datetime and sort
     df['week'] = pd.to_datetime(df['week'])
     df = df.sort_values('week')
+
+    # Weekly view comes from core_metrics; coarser views are rolled up from
+    # daily lifecycle flows, so every granularity shares one extract
+    views = {
+        'Weekly': ('WoW', 'Week', None),
+        'Monthly': ('MoM', 'Month', 'month'),
+        'Quarterly': ('QoQ', 'Quarter', 'quarter'),
+        'Rolling 28 days': ('28-day', 'Window End', 'rolling'),
+    }
+    view = st.selectbox('View', list(views), key='growth_view')
+    view_suffix, period_label, view_freq = views[view]
+    # core_metrics only subtracts uninstalls of shops installed in its 30 weeks;
+    # the rolled-up flows subtract every uninstall, so they get their own label
+    net_installs_label = 'Net Installs'
+    if view_freq is not None:
+        today = pd.Timestamp.now(tz='UTC').tz_localize(None).normalize()
+        daily_flows = period_flows(load_lifecycle_extract(), 'day', 800, today).rename(columns={'period_start': 'date'})
+        version = f'{load_dataset(lifecycle_extract).version}:{today:%Y-%m-%d}:{view_freq}'
+        if view_freq == 'rolling':
+            # One trailing window per week, ending yesterday
+            rolled = rolling(daily_flows, 28).rename(columns={'window_end': 'week'})
+            rolled = rolled.iloc[::-7].head(30).iloc[::-1]
+        else:
+            rolled = rollup(daily_flows, view_freq).rename(columns={'period_start': 'week'})
+        df = rolled.rename(columns={
+            'upgrades': 'core_upgrades',
+            'downgrades': 'core_downgrades',
+            'net_upgrades': 'core_net_upgrades',
+        })
+        net_installs_label = 'Net Installs (all uninstalls)'
+        st.caption(
+            'Rolled up from daily lifecycle flows. Net installs here subtract every uninstall in the period; '
+            'the weekly view only subtracts uninstalls of shops installed in its last 30 weeks'
+        )
     
-    # Helper function for latest value with WoW delta
-    def latest_with_delta(df_orig: pd.DataFrame, col: str):
-        temp = df_orig[['week', col]].dropna().copy()
-        if temp.empty:
-            return None, None
-        temp = temp.sort_values('week')
-        latest_val = temp.iloc[-1][col]
-        if len(temp) < 2:
-            return latest_val, None
-        prev_val = temp.iloc[-2][col]
-        try:
-            delta_val = float(latest_val) - float(prev_val)
-        except Exception:
-            delta_val = None
-        return latest_val, delta_val
-    
-    # Net Growth WoW — Overall (New – Lost) users this week (all users)
-    st.subheader('Net Growth WoW — Overall')
-    st.caption('(New – Lost) users this week (all users)')
+    # Latest value and change for every KPI card, one pass over the frame
+    kpis = kpi_deltas(version, df, 'week', ('net_installs', 'core_net_upgrades', 'core_upgrades', 'core_downgrades'))
+    
+    # Net Growth — Overall (New – Lost) users per period (all users)
+    st.subheader(f'Net Growth {view_suffix} — Overall')
+    st.caption(f'(New – Lost) users per {period_label.lower()} (all users)')
     
     # KPI for net installs
-    net_installs_latest, net_installs_delta = latest_with_delta(df, 'net_installs')
+    net_installs_latest, net_installs_delta = kpis.loc['net_installs', ['latest', 'delta']]
     
     kpi_col1, kpi_col2, kpi_col3 = st.columns(3)
     with kpi_col1:
         if net_installs_latest is None or pd.isna(net_installs_latest):
-            st.metric(label='Net Installs', value='—', delta=None)
+            st.metric(label=net_installs_label, value='—', delta=None)
         else:
             st.metric(
-                label='Net Installs',
+                label=net_installs_label,
                 value=f"{int(net_installs_latest):,}",
                 delta=(int(net_installs_delta) if net_installs_delta is not None and pd.notna(net_installs_delta) else None)
             )
@@ -79,8 +106,8 @@ def growth_page() -> None:
         height=340,
         showlegend=False,
         margin=dict(l=10, r=10, t=30, b=0),
-        xaxis_title='Week',
-        yaxis_title='Net Installs',
+        xaxis_title=period_label,
+        yaxis_title=net_installs_label,
         plot_bgcolor="rgba(0,0,0,0)",
         paper_bgcolor="rgba(0,0,0,0)",
         yaxis=dict(tickformat=',')
@@ -91,14 +118,14 @@ def growth_page() -> None:
     
     st.plotly_chart(fig_overall, use_container_width=True, config={'displayModeBar': False})
     
-    # Net Growth WoW — Awesome (New – Lost) users this week (paid users only)
-    st.subheader('Net Growth WoW — Awesome')
-    st.caption('(New – Lost) users this week (paid users only)')
+    # Net Growth — Awesome (New – Lost) users per period (paid users only)
+    st.subheader(f'Net Growth {view_suffix} — Awesome')
+    st.caption(f'(New – Lost) users per {period_label.lower()} (paid users only)')
     
     # KPI for net upgrades (awesome users)
-    net_upgrades_latest, net_upgrades_delta = latest_with_delta(df, 'core_net_upgrades')
-    upgrades_latest, upgrades_delta = latest_with_delta(df, 'core_upgrades')
-    downgrades_latest, downgrades_delta = latest_with_delta(df, 'core_downgrades')
+    net_upgrades_latest, net_upgrades_delta = kpis.loc['core_net_upgrades', ['latest', 'delta']]
+    upgrades_latest, upgrades_delta = kpis.loc['core_upgrades', ['latest', 'delta']]
+    downgrades_latest, downgrades_delta = kpis.loc['core_downgrades', ['latest', 'delta']]
     
     # Display net awesome KPIs
     awesome_kpi_cols = st.columns(3)
@@ -144,7 +171,7 @@ def growth_page() -> None:
         height=340,
         showlegend=False,
         margin=dict(l=10, r=10, t=30, b=0),
-        xaxis_title='Week',
+        xaxis_title=period_label,
         yaxis_title='Net Awesome Users',
         plot_bgcolor="rgba(0,0,0,0)",
         paper_bgcolor="rgba(0,0,0,0)",
@@ -155,13 +182,87 @@ def growth_page() -> None:
     fig_awesome.update_yaxes(showgrid=False)
     
     st.plotly_chart(fig_awesome, use_container_width=True, config={'displayModeBar': False})
-    
+
+    # Distinct shops per period, merged from daily HyperLogLog sketches
+    st.subheader('Distinct Shops')
+    st.caption('Estimated from daily sketches; the band is the 95% error bound')
+
+    hll_store = lifecycle_hll_store()
+    metric_options = {
+        'Installs': 'installs',
+        'Uninstalls': 'uninstalls',
+        'Upgrades': 'upgrades',
+        'Downgrades': 'downgrades',
+    }
+    dist_col1, dist_col2 = st.columns(2)
+    with dist_col1:
+        metric_label = st.selectbox('Event', list(metric_options), key='distinct_metric')
+    with dist_col2:
+        distinct_freq = st.selectbox('Granularity', ['week', 'month', 'quarter'], key='distinct_granularity')
+
+    distinct_df = distinct_shops_by_period(
+        hll_store,
+        metric_options[metric_label],
+        distinct_freq,
+        periods=8 if distinct_freq == 'quarter' else None,
+    ).sort_values('period_start')
+
+    fig_distinct = go.Figure()
+    fig_distinct.add_trace(go.Scatter(
+        x=pd.concat([distinct_df['period_start'], distinct_df['period_start'][::-1]]),
+        y=pd.concat([distinct_df['upper'], distinct_df['lower'][::-1]]),
+        fill='toself',
+        fillcolor='rgba(114, 167, 255, 0.2)',
+        line=dict(width=0),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+    fig_distinct.add_trace(go.Scatter(
+        x=distinct_df['period_start'],
+        y=distinct_df['distinct_shops'],
+        mode='lines+markers',
+        name='Distinct Shops',
+        line=dict(color='#72a7ff', width=3),
+        showlegend=False
+    ))
+    fig_distinct.update_layout(
+        height=340,
+        margin=dict(l=10, r=10, t=30, b=0),
+        xaxis_title=distinct_freq.title(),
+        yaxis_title=f'Shops ({metric_label})',
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        yaxis=dict(tickformat=',')
+    )
+    fig_distinct.update_xaxes(showgrid=False)
+    fig_distinct.update_yaxes(showgrid=False)
+
+    st.plotly_chart(fig_distinct, use_container_width=True, config={'displayModeBar': False})
+
+    # Any date range, merged from the same daily sketches
+    today = pd.Timestamp.now(tz='UTC').tz_localize(None).normalize()
+    date_range = st.date_input(
+        'Date range',
+        value=(today - pd.Timedelta(days=90), today - pd.Timedelta(days=1)),
+        key='distinct_range'
+    )
+    if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
+        range_count = distinct_shops_between(hll_store, metric_options[metric_label], *date_range)
+        st.metric(
+            label=f'Distinct Shops ({metric_label}, {date_range[0]:%b %d, %Y} – {date_range[1]:%b %d, %Y})',
+            value=f"{range_count['distinct_shops']:,}",
+        )
+        st.caption(
+            f"95% bound: {range_count['lower']:,} – {range_count['upper']:,} "
+            f"(±{BOUND_Z * range_count['relative_error']:.1%})"
+        )
+
     # Monthly Growth Rate — Free vs Awesome
     st.subheader('Monthly Growth Rate — Free vs Awesome')
     st.caption('(This month\'s users – Last month\'s users) ÷ Last month\'s users')
     
-    # Get monthly metrics data
-    monthly_df = run_query(monthly_core_metrics)
+    # Get monthly metrics data (computed locally from the lifecycle extract)
+    monthly_df = monthly_user_metrics(load_lifecycle_extract())
     
     if monthly_df.empty:
         st.info('No monthly data available yet.')
@@ -172,7 +273,7 @@ def growth_page() -> None:
     monthly_df = monthly_df.sort_values('month_date')
     
     # Filter out rows where we don't have growth rates (first month)
-    monthly_df_filtered = monthly_df[monthly_df['total_growth_rate_pct'].notna()].copy()
+    monthly_df_filtered = monthly_df[monthly_df['total_growth_rate_pct'].notna()]
     
     if monthly_df_filtered.empty:
         st.info('Not enough monthly data to calculate growth rates yet.')
@@ -5,8 +5,8 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from src.db.redshift_connection import run_query, get_redshift_connection
-from src.sql.core_metrics.integrations import integrations
+from src.engines.integrations import integration_performance, load_integration_index
+from src.utils.formatting import column_formats, format_value
 
 
 def integrations_page():
@@ -14,50 +14,13 @@ def integrations_page():
     
     # Load data
     with st.spinner('Loading integration data...'):
-        df = run_query(integrations)
+        index = load_integration_index()
+        df = integration_performance(index)
     
     if df.empty:
         st.error("No integration data available")
         return
     
-    # Clean and prepare data
-    df = df.copy()
-    
-    def safe_convert_percentage(series):
-        """Safely convert percentage strings to floats"""
-        return pd.to_numeric(
-            series.astype(str).str.replace('%', '').str.replace('None', '').str.strip(),
-            errors='coerce'
-        )
-    
-    def safe_convert_currency(series):
-        """Safely convert currency strings to floats"""
-        return pd.to_numeric(
-            series.astype(str).str.replace('$', '').str.replace(',', '').str.replace('None', '').str.strip(),
-            errors='coerce'
-        )
-    
-    def safe_convert_days(series):
-        """Safely convert day strings to integers"""
-        return pd.to_numeric(
-            series.astype(str).str.replace(' days', '').str.replace('None', '').str.strip(),
-            errors='coerce'
-        )
-    
-    # Convert percentage strings to floats
-    percentage_cols = ['Downgrade %', 'Churn %', 'Free Churn %', 'Awesome Conv %']
-    for col in percentage_cols:
-        if col in df.columns:
-            df[col] = safe_convert_percentage(df[col])
-    
-    # Convert LTV strings to floats
-    if 'LTV' in df.columns:
-        df['LTV'] = safe_convert_currency(df['LTV'])
-    
-    # Convert lifetime strings to integers
-    if 'Lifetime' in df.columns:
-        df['Lifetime'] = safe_convert_days(df['Lifetime'])
-    
     # Overview metrics
     col1, col2, col3, col4 = st.columns(4)
     
@@ -88,6 +51,7 @@ def integrations_page():
     with col1:
         st.subheader("Integration Distribution by Tier")
         tier_counts = df['Tier'].value_counts()
+        tier_counts = tier_counts[tier_counts > 0]
         fig_tier = px.pie(
             values=tier_counts.values,
             names=tier_counts.index,
@@ -103,7 +67,7 @@ def integrations_page():
     
     with col2:
         st.subheader("Shop Volume by Tier")
-        tier_shops = df.groupby('Tier')['Total Shops'].sum()
+        tier_shops = df.groupby('Tier', observed=True)['Total Shops'].sum()
         fig_shops = px.bar(
             x=tier_shops.index,
             y=tier_shops.values,
@@ -149,7 +113,7 @@ def integrations_page():
         st.write("**Awesome Conversion Rates by Integration**")
         
         # Filter for integrations with meaningful data
-        conv_data = df[df['Awesome Conv %'].notna() & (df['Total Shops'] >= 20)].copy()
+        conv_data = df[df['Awesome Conv %'].notna() & (df['Total Shops'] >= 20)]
         conv_data = conv_data.sort_values('Awesome Conv %', ascending=True).tail(20)
         
         fig_conv = px.bar(
@@ -174,7 +138,7 @@ def integrations_page():
         st.write("**Churn Rate Analysis**")
         
         # Awesome vs Free churn comparison
-        churn_data = df[(df['Churn %'].notna()) & (df['Free Churn %'].notna()) & (df['Total Shops'] >= 20)].copy()
+        churn_data = df[(df['Churn %'].notna()) & (df['Free Churn %'].notna()) & (df['Total Shops'] >= 20)]
         
         fig_churn = go.Figure()
         
@@ -214,7 +178,7 @@ def integrations_page():
     with tab3:
         st.write("**Lifetime Value Analysis**")
         
-        ltv_data = df[(df['LTV'].notna()) & (df['Total Shops'] >= 20)].copy()
+        ltv_data = df[(df['LTV'].notna()) & (df['Total Shops'] >= 20)]
         ltv_data = ltv_data.sort_values('LTV', ascending=True).tail(20)
         
         fig_ltv = px.bar(
@@ -238,7 +202,7 @@ def integrations_page():
     with tab4:
         st.write("**Customer Lifetime Analysis**")
         
-        lifetime_data = df[(df['Lifetime'].notna()) & (df['Total Shops'] >= 20)].copy()
+        lifetime_data = df[(df['Lifetime'].notna()) & (df['Total Shops'] >= 20)]
         lifetime_data = lifetime_data.sort_values('Lifetime', ascending=True).tail(20)
         
         fig_lifetime = px.bar(
@@ -288,7 +252,7 @@ def integrations_page():
         )
     
     # Apply filters
-    filtered_df = df[df['Total Shops'] >= min_shops].copy()
+    filtered_df = df[df['Total Shops'] >= min_shops]
     if tier_filter != 'All':
         filtered_df = filtered_df[filtered_df['Tier'] == tier_filter]
     
@@ -296,29 +260,83 @@ def integrations_page():
     if sort_by in filtered_df.columns:
         filtered_df = filtered_df.sort_values(sort_by, ascending=False)
     
-    # Display table with formatting
+    # Display table; values stay numeric so the grid sorts them as numbers
     display_df = filtered_df[[
         'Integration', 'Tier', 'Total Shops', 'Awesome', 'Free',
-        'Downgrade %', 'Churn %', 'LTV', 'Lifetime', 'Free Churn %', 'Awesome Conv %'
-    ]].copy()
-    
-    # Format the display
-    for col in ['Downgrade %', 'Churn %', 'Free Churn %', 'Awesome Conv %']:
-        if col in display_df.columns:
-            display_df[col] = display_df[col].apply(lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A")
-    
-    if 'LTV' in display_df.columns:
-        display_df['LTV'] = display_df['LTV'].apply(lambda x: f"${x:.0f}" if pd.notna(x) else "N/A")
-    
-    if 'Lifetime' in display_df.columns:
-        display_df['Lifetime'] = display_df['Lifetime'].apply(lambda x: f"{x} days" if pd.notna(x) else "N/A")
+        'Downgrade %', 'Downgrade % vs Avg', 'Churn %', 'Churn % vs Avg',
+        'LTV', 'LTV vs Avg', 'Lifetime', 'Lifetime vs Avg',
+        'Free Churn %', 'Free Churn % vs Avg', 'Awesome Conv %'
+    ]]
     
     st.dataframe(
         display_df,
         width='stretch',
-        height=400
+        height=400,
+        hide_index=True,
+        column_config=column_formats({
+            'Downgrade %': 'percent',
+            'Downgrade % vs Avg': 'pp',
+            'Churn %': 'percent',
+            'Churn % vs Avg': 'pp',
+            'LTV': 'currency',
+            'LTV vs Avg': 'currency_delta',
+            'Lifetime': 'days',
+            'Lifetime vs Avg': 'days_delta',
+            'Free Churn %': 'percent',
+            'Free Churn % vs Avg': 'pp',
+            'Awesome Conv %': 'percent',
+        })
     )
     
+    # Overlap between integrations, from intersections of the shop bitsets
+    st.subheader("🧩 Integration Overlap")
+    
+    overlap_names = st.multiselect(
+        "Integrations",
+        options=sorted(df['Integration'].unique()),
+        default=list(df.nlargest(5, 'Total Shops')['Integration'].unique()),
+        key='integrations_overlap'
+    )
+    
+    if len(overlap_names) >= 2:
+        overlap = index.overlap(overlap_names)
+        fig_overlap = px.imshow(
+            overlap,
+            labels=dict(x='Integration', y='Integration', color='Shops'),
+            color_continuous_scale='Blues',
+            aspect='auto',
+            text_auto=','
+        )
+        fig_overlap.update_layout(height=max(340, 60 * len(overlap_names)), margin=dict(l=10, r=10, t=30, b=0))
+        st.plotly_chart(fig_overlap, use_container_width=True, config={'displayModeBar': False})
+        
+        combo = index.metrics(index.combination(overlap_names)).iloc[0]
+        benchmark = index.benchmark()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Shops Using All Selected", f"{int(combo['total_shops']):,}")
+        with col2:
+            st.metric(
+                "Awesome Conv %",
+                format_value(combo['awesome_conversion_rate'], 'percent'),
+                delta=format_value(combo['awesome_conversion_rate'] - benchmark['awesome_conversion_rate'], 'pp', missing=None)
+            )
+        with col3:
+            st.metric(
+                "Awesome Churn %",
+                format_value(combo['awesome_churn_rate'], 'percent'),
+                delta=format_value(combo['awesome_churn_rate'] - benchmark['awesome_churn_rate'], 'pp', missing=None),
+                delta_color='inverse'
+            )
+        with col4:
+            st.metric(
+                "LTV",
+                format_value(combo['awesome_ltv'], 'currency'),
+                delta=format_value(combo['awesome_ltv'] - benchmark['awesome_ltv'], 'currency_delta', missing=None)
+            )
+    else:
+        st.info("Select at least two integrations to see their overlap.")
+    
     # Summary insights
     st.subheader("🔍 Key Insights")
     
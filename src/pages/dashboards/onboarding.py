@@ -2,7 +2,8 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 from src.db.redshift_connection import run_query, get_redshift_connection
-from src.sql.sql import time_to_first_review_query
+from src.engines.journeys import weekly_time_to_first_review
+from src.engines.quantiles import distribution_table, journey_week_sketches, rollup_sketches
 
 
 
@@ -12,8 +13,8 @@ def onboarding_page() -> None:
     st.title('Onboarding')
 
 
-    # Fetch weekly metrics from Redshift
-    df = run_query(time_to_first_review_query)
+    # Weekly metrics from the incremental shop-journey store
+    df = weekly_time_to_first_review()
 
     if df.empty:
         st.info('No data available yet.')
@@ -66,3 +67,40 @@ def onboarding_page() -> None:
             )
             st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
             
+
+            # Distribution from per-week quantile sketches: any percentile,
+            # cut-off or granularity without another warehouse query
+            st.subheader('Time to first review distribution')
+            ctrl1, ctrl2, ctrl3, ctrl4 = st.columns(4)
+            with ctrl1:
+                granularity = st.selectbox('Granularity', ['week', 'month', 'quarter'], key='ttfr_granularity')
+            with ctrl2:
+                plan_options = {'All plans': ('awesome', 'free', 'unknown'), 'Awesome': ('awesome',), 'Free': ('free',)}
+                plan_label = st.selectbox('Plan', list(plan_options), key='ttfr_plan')
+            with ctrl3:
+                percentiles = st.multiselect(
+                    'Percentiles', [50, 75, 90, 95, 99], default=[50, 75, 90], key='ttfr_percentiles'
+                )
+            with ctrl4:
+                max_days = st.number_input('Outlier cut-off (days)', min_value=1, max_value=3650, value=180, key='ttfr_cutoff')
+
+            sketches = rollup_sketches(journey_week_sketches(), granularity, plan_options[plan_label])
+            dist_df = distribution_table(sketches, sorted(percentiles), low=0, high=max_days)
+
+            if dist_df.empty or not percentiles:
+                st.info('Select at least one percentile to display.')
+            else:
+                pct_cols = [f'p{p}' for p in sorted(percentiles)]
+                fig_dist = px.line(
+                    dist_df,
+                    x='period',
+                    y=pct_cols + ['mean_days'],
+                    labels={'value': 'Days', 'period': granularity.title(), 'variable': 'Metric'},
+                    markers=True,
+                )
+                fig_dist.update_layout(
+                    height=340,
+                    legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='left', x=0),
+                    margin=dict(t=10),
+                )
+                st.plotly_chart(fig_dist, use_container_width=True, config={'displayModeBar': False})
@@ -1,14 +1,22 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-from src.db.redshift_connection import run_query, get_redshift_connection
+from src.db.redshift_connection import get_redshift_connection
+from src.db.datasets import load_dataset
 from src.sql.core_metrics.core_metrics import core_metrics
+from src.engines.kpi import kpi_deltas
+from src.engines.lifecycle import load_lifecycle_extract
+from src.engines.trial_funnel import CAMPAIGN_RULES, OTHER_CAMPAIGN, load_trial_starts_frame, trial_funnel
+from src.engines.upgrades import load_upgrade_breakdown, with_upgrade_breakdown
+from src.sql.growth.lifecycle import lifecycle_extract
+from src.sql.upgrade.trial_starts import trial_starts_extract
 
 def upgrade_page() -> None:
     st.title('Upgrade')
     
     # Get core metrics data
-    df = run_query(core_metrics)
+    core = load_dataset(core_metrics)
+    df = core.view()
     
     if df.empty:
         st.info('No data available yet.')
@@ -17,6 +25,10 @@ def upgrade_page() -> None:
     # Convert week to datetime and sort
     df['week'] = pd.to_datetime(df['week'])
     df = df.sort_values('week')
+
+    # Upgrades by type, classified locally from the lifecycle and trial extracts
+    breakdown = load_upgrade_breakdown()
+    df = with_upgrade_breakdown(df, breakdown.frame)
     
     # Header row for Trial Categories: title + inline selector
     tc_left, tc_right = st.columns([3, 2])
@@ -35,6 +47,13 @@ def upgrade_page() -> None:
     # Filter to available columns only
     existing_cols = [c for c in category_cols if c in df.columns]
 
+    # Latest value and change for every weekly KPI card, one pass over the frame
+    core_kpis = kpi_deltas(f'{core.version}+{breakdown.version}', df, 'week', (
+        *category_cols,
+        'direct_upgrades', 'trial_conversions', 'reopened_shops',
+        'core_net_upgrades', 'core_upgrades', 'core_downgrades',
+    ))
+
     # Friendly category labels (reused for KPIs and chart)
     label_map = {
         'home_trials': 'Home',
@@ -47,24 +66,9 @@ def upgrade_page() -> None:
     # KPI metrics with WoW deltas
     if existing_cols:
 
-        def latest_with_delta(df_cat: pd.DataFrame, value_col: str) -> tuple[pd.Series | None, float | None]:
-            temp = df_cat[['week', value_col]].dropna().copy()
-            if temp.empty:
-                return None, None
-            temp = temp.sort_values('week')
-            latest_val = temp.iloc[-1][value_col]
-            if len(temp) < 2:
-                return latest_val, None
-            prev_val = temp.iloc[-2][value_col]
-            try:
-                delta_val = float(latest_val) - float(prev_val)
-            except Exception:
-                delta_val = None
-            return latest_val, delta_val
-
         cols = st.columns(len(existing_cols))
         for idx, col in enumerate(existing_cols):
-            latest, delta = latest_with_delta(df, col)
+            latest, delta = core_kpis.loc[col, ['latest', 'delta']]
             with cols[idx]:
                 if latest is None or pd.isna(latest):
                     st.metric(label=label_map.get(col, col), value='—', delta=None)
@@ -112,7 +116,7 @@ def upgrade_page() -> None:
         st.subheader('Upgrades by source')
     
     # Transform core metrics data for upgrade visualization
-    df_up = df[['week', 'direct_upgrades', 'trial_conversions', 'reopened_shops']].copy()
+    df_up = df[['week', 'direct_upgrades', 'trial_conversions', 'reopened_shops']]
     df_up = df_up.melt(id_vars=['week'], var_name='upgrade_path', value_name='count_of_upgrades')
     df_up['week_start'] = df_up['week']
     
@@ -134,34 +138,13 @@ def upgrade_page() -> None:
         df_up['upgrade_path'], categories=category_order, ordered=True
     )
 
-    # KPI metrics with WoW deltas using original df columns
-    def latest_with_delta_direct(df_orig: pd.DataFrame, col: str):
-        temp = df_orig[['week', col]].dropna().copy()
-        if temp.empty:
-            return None, None
-        temp = temp.sort_values('week')
-        latest_val = temp.iloc[-1][col]
-        if len(temp) < 2:
-            return latest_val, None
-        prev_val = temp.iloc[-2][col]
-        try:
-            delta_val = float(latest_val) - float(prev_val)
-        except Exception:
-            delta_val = None
-        return latest_val, delta_val
-
     # Compute totals and format KPIs
-    direct_latest, direct_delta = latest_with_delta_direct(df, 'direct_upgrades')
-    free_trial_latest, free_trial_delta = latest_with_delta_direct(df, 'trial_conversions')
-    reopened_latest, reopened_delta = latest_with_delta_direct(df, 'reopened_shops')
-    total_latest = sum(v for v in [direct_latest, free_trial_latest, reopened_latest] if v is not None) if any(v is not None for v in [direct_latest, free_trial_latest, reopened_latest]) else None
-    total_delta = (
-        (direct_delta if direct_delta is not None else 0)
-        + (free_trial_delta if free_trial_delta is not None else 0)
-        + (reopened_delta if reopened_delta is not None else 0)
-        if all(d is not None for d in [direct_delta, free_trial_delta, reopened_delta])
-        else None
-    )
+    sources = core_kpis.loc[['direct_upgrades', 'trial_conversions', 'reopened_shops']]
+    direct_latest, free_trial_latest, reopened_latest = sources['latest']
+    direct_delta, free_trial_delta, reopened_delta = sources['delta']
+    # Total counts whichever sources have a value; its delta needs all three
+    total_latest = sources['latest'].sum(min_count=1)
+    total_delta = sources['delta'].sum(skipna=False)
     
     kpi_label_map = {
         'direct': 'Direct',
@@ -225,12 +208,12 @@ def upgrade_page() -> None:
     st.subheader('Net Awesome (Upgrades - Downgrades)')
     
     # Create net upgrades chart data
-    net_df = df[['week', 'core_upgrades', 'core_downgrades', 'core_net_upgrades']].copy()
+    net_df = df[['week', 'core_upgrades', 'core_downgrades', 'core_net_upgrades']]
     
     # KPI for net upgrades with WoW delta
-    net_latest, net_delta = latest_with_delta_direct(df, 'core_net_upgrades')
-    upgrades_latest, upgrades_delta = latest_with_delta_direct(df, 'core_upgrades')
-    downgrades_latest, downgrades_delta = latest_with_delta_direct(df, 'core_downgrades')
+    net_latest, net_delta = core_kpis.loc['core_net_upgrades', ['latest', 'delta']]
+    upgrades_latest, upgrades_delta = core_kpis.loc['core_upgrades', ['latest', 'delta']]
+    downgrades_latest, downgrades_delta = core_kpis.loc['core_downgrades', ['latest', 'delta']]
     
     # Display net upgrades KPIs
     net_kpi_cols = st.columns(3)
@@ -289,105 +272,70 @@ def upgrade_page() -> None:
     
     st.plotly_chart(fig_net, use_container_width=True, config={'displayModeBar': False})
 
-    # Trial Conversions by Type
+    # Trial Conversions by Type (long format: one row per week x campaign type)
     st.subheader('Trial Conversion Rates by Type')
-    
-    # Define conversion rate columns that should be available from the query
-    cvr_cols = {
-        'home': 'home_cvr_pct',
-        'upsell': 'upsell_cvr_pct', 
-        'optin': 'optin_cvr_pct',
-        'article': 'article_cvr_pct',
-        'welcome': 'welcome_cvr_pct'
-    }
-    
-    # Define completed and conversion columns
-    completed_cols = {
-        'home': 'home_completed',
-        'upsell': 'upsell_completed',
-        'optin': 'optin_completed', 
-        'article': 'article_completed',
-        'welcome': 'welcome_completed'
-    }
-    
-    conversion_cols = {
-        'home': 'home_conversions',
-        'upsell': 'upsell_conversions',
-        'optin': 'optin_conversions',
-        'article': 'article_conversions', 
-        'welcome': 'welcome_conversions'
-    }
-    
-    # Filter to only include trial types that have data
-    available_cvr_types = [trial_type for trial_type in cvr_cols.keys() 
-                          if cvr_cols[trial_type] in df.columns and completed_cols[trial_type] in df.columns]
-    
+
+    today = pd.Timestamp.now(tz='UTC').tz_localize(None).normalize()
+    funnel = trial_funnel(load_trial_starts_frame(), load_lifecycle_extract(), today)
+    funnel_version = (
+        f'{load_dataset(trial_starts_extract).version}+{load_dataset(lifecycle_extract).version}:{today:%Y-%m-%d}'
+    )
+    funnel = funnel[funnel['campaign_type'] != OTHER_CAMPAIGN].rename(columns={'trial_week': 'week'})
+
+    # New campaign types show up automatically; known ones keep their labels
+    campaign_labels = {'cs': 'CS'}
+
+    def campaign_label(campaign_type: str) -> str:
+        return label_map.get(f'{campaign_type}_trials', campaign_labels.get(campaign_type, campaign_type.title()))
+
+    available_cvr_types = [
+        rule.campaign for rule in CAMPAIGN_RULES
+        if funnel.loc[funnel['campaign_type'] == rule.campaign, 'cvr_pct'].notna().any()
+    ]
+
     if available_cvr_types:
-        # KPI metrics for conversion rates with WoW deltas
-        def latest_with_delta_cvr(df_orig: pd.DataFrame, col: str):
-            temp = df_orig[['week', col]].dropna().copy()
-            if temp.empty:
-                return None, None
-            temp = temp.sort_values('week')
-            latest_val = temp.iloc[-1][col]
-            if len(temp) < 2:
-                return latest_val, None
-            prev_val = temp.iloc[-2][col]
-            try:
-                delta_val = float(latest_val) - float(prev_val)
-            except Exception:
-                delta_val = None
-            return latest_val, delta_val
-        
         # Display conversion rate KPIs
         conv_kpi_cols = st.columns(len(available_cvr_types))
         for idx, trial_type in enumerate(available_cvr_types):
-            cvr_col = cvr_cols[trial_type]
-            completed_col = completed_cols[trial_type]
-            conversions_col = conversion_cols[trial_type]
-            
-            latest_cvr, delta_cvr = latest_with_delta_cvr(df, cvr_col)
-            latest_completed, _ = latest_with_delta_cvr(df, completed_col)
-            latest_conversions, _ = latest_with_delta_cvr(df, conversions_col)
-            
+            type_df = funnel[funnel['campaign_type'] == trial_type]
+
+            type_kpis = kpi_deltas(f'{funnel_version}:{trial_type}', type_df, 'week', ('cvr_pct', 'completed_trials', 'successful_conversions'))
+            latest_cvr, delta_cvr = type_kpis.loc['cvr_pct', ['latest', 'delta']]
+            latest_completed = type_kpis.at['completed_trials', 'latest']
+            latest_conversions = type_kpis.at['successful_conversions', 'latest']
+
             with conv_kpi_cols[idx]:
                 if latest_cvr is None or pd.isna(latest_cvr):
-                    st.metric(label=f"{label_map.get(f'{trial_type}_trials', trial_type.title())} CVR", value='—', delta=None)
+                    st.metric(label=f"{campaign_label(trial_type)} CVR", value='—', delta=None)
                 else:
                     # Show additional context in help text
                     help_text = None
-                    if latest_completed is not None and latest_conversions is not None:
+                    if pd.notna(latest_completed) and pd.notna(latest_conversions):
                         help_text = f"{int(latest_conversions)} conversions / {int(latest_completed)} completed trials"
-                    
+
                     st.metric(
-                        label=f"{label_map.get(f'{trial_type}_trials', trial_type.title())} CVR",
+                        label=f"{campaign_label(trial_type)} CVR",
                         value=f"{latest_cvr:.1f}%",
                         delta=(f"{delta_cvr:.1f}pp" if delta_cvr is not None and pd.notna(delta_cvr) else None),
                         help=help_text
                     )
-        
-        # Create conversion rate chart
-        cvr_chart_cols = ['week'] + [cvr_cols[t] for t in available_cvr_types]
-        conv_chart_df = df[cvr_chart_cols].melt(
-            id_vars='week', var_name='trial_type', value_name='conversion_rate'
-        )
-        
-        # Map CVR column names back to friendly names
-        cvr_label_map = {cvr_cols[trial_type]: label_map.get(f'{trial_type}_trials', trial_type.title()) 
-                        for trial_type in available_cvr_types}
-        conv_chart_df['trial_type'] = conv_chart_df['trial_type'].map(cvr_label_map)
-        
+
+        # Conversion rate chart straight from the long-format funnel
+        conv_chart_df = funnel[funnel['campaign_type'].isin(available_cvr_types)][['week', 'campaign_type', 'cvr_pct']]
+        conv_chart_df = conv_chart_df.rename(columns={'cvr_pct': 'conversion_rate'})
+        conv_chart_df['trial_type'] = conv_chart_df['campaign_type'].map(campaign_label)
+
         # Filter for chart display
         conv_left, conv_right = st.columns([3, 2])
         with conv_right:
-            available_conv_labels = list(cvr_label_map.values())
+            available_conv_labels = [campaign_label(t) for t in available_cvr_types]
             # Default to 'Home' if available, otherwise use all
             default_selection = ['Home'] if 'Home' in available_conv_labels else available_conv_labels
             selected_conv_labels = st.multiselect(
                 ' ', options=available_conv_labels, default=default_selection,
                 key='conversion_rates_select', label_visibility='collapsed'
             )
-        
+
         filtered_conv_df = conv_chart_df[conv_chart_df['trial_type'].isin(selected_conv_labels)] if selected_conv_labels else conv_chart_df.iloc[0:0]
         
         if not filtered_conv_df.empty:
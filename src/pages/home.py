@@ -2,33 +2,16 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-from src.db.redshift_connection import run_query
+from src.db.datasets import load_dataset
 from src.sql.core_metrics.core_metrics import core_metrics
-from src.sql.core_metrics.monthly_core_metrics import monthly_core_metrics
+from src.engines.kpi import kpi_deltas
+from src.engines.lifecycle import load_lifecycle_extract, monthly_user_metrics
+from src.engines.upgrades import load_upgrade_breakdown, with_upgrade_breakdown
+from src.sql.growth.lifecycle import lifecycle_extract
 from src.utils.chart_builder import build_sparkline_area, format_number, format_percent
 from src.utils.plotly_config import render_plotly_chart
 
 
-def _latest_with_delta(df: pd.DataFrame, date_column: str, value_column: str) -> tuple[pd.Series | None, float | None]:
-    if df is None or df.empty or value_column not in df.columns:
-        return None, None
-    temp = df.dropna(subset=[value_column]).copy()
-    if temp.empty:
-        return None, None
-    if date_column in temp.columns:
-        temp[date_column] = pd.to_datetime(temp[date_column])
-        temp = temp.sort_values(date_column)
-    if len(temp) == 1:
-        return temp.iloc[-1][value_column], None
-    latest_val = temp.iloc[-1][value_column]
-    prev_val = temp.iloc[-2][value_column]
-    try:
-        delta_val = float(latest_val) - float(prev_val)
-    except Exception:
-        delta_val = None
-    return latest_val, delta_val
-
-
 def _sparkline(df: pd.DataFrame, x_col: str, y_col: str, title: str, height: int = 110):
     if df is None or df.empty or y_col not in df.columns:
         return None
@@ -50,13 +33,21 @@ def home_page() -> None:
 
     # Get core metrics data (weekly)
     try:
-        df_core = run_query(core_metrics)
+        core = load_dataset(core_metrics)
+        df_core, core_version = core.view(), core.version
     except Exception:
-        df_core = pd.DataFrame()
+        df_core, core_version = pd.DataFrame(), ''
     
     if not df_core.empty:
         df_core['week'] = pd.to_datetime(df_core['week'])
         df_core = df_core.sort_values('week')
+        try:
+            # Upgrades by type, classified locally from the lifecycle and trial extracts
+            breakdown = load_upgrade_breakdown()
+            df_core = with_upgrade_breakdown(df_core, breakdown.frame)
+            core_version = f'{core_version}+{breakdown.version}'
+        except Exception:
+            pass
         
         # Calculate total trials from core metrics
         trial_cols = ['home_trials', 'upsell_trials', 'optin_trials', 'article_trials', 'welcome_trials']
@@ -65,21 +56,27 @@ def home_page() -> None:
             df_core['total_trials'] = df_core[existing_trial_cols].sum(axis=1)
 
     # Get monthly metrics data
+    today = pd.Timestamp.now(tz='UTC').tz_localize(None).normalize()
     try:
-        df_monthly = run_query(monthly_core_metrics)
+        df_monthly = monthly_user_metrics(load_lifecycle_extract(), today=today)
+        monthly_version = f'{load_dataset(lifecycle_extract).version}:{today:%Y-%m-%d}'
     except Exception:
-        df_monthly = pd.DataFrame()
+        df_monthly, monthly_version = pd.DataFrame(), ''
     
     if not df_monthly.empty:
         df_monthly['month'] = pd.to_datetime(df_monthly['month'])
         df_monthly = df_monthly.sort_values('month')
 
+    # Latest value and change for every KPI card, one pass per dataset
+    core_kpis = kpi_deltas(core_version, df_core, 'week', ('net_installs', 'core_net_upgrades', 'core_upgrades', 'total_trials', 'trial_conversions'))
+    monthly_kpis = kpi_deltas(monthly_version, df_monthly, 'month', ('total_growth_rate_pct',))
+
     # Group: Growth
     st.markdown('### Growth')
     g1, g2, g3 = st.columns(3)
     with g1:
         # Weekly net installs from core metrics
-        val, delta = _latest_with_delta(df_core, 'week', 'net_installs') if not df_core.empty else (None, None)
+        val, delta = core_kpis.loc['net_installs', ['latest', 'delta']]
         st.metric('Weekly net installs', format_number(val) if val is not None and pd.notna(val) else '—', format_number(delta) if delta is not None and pd.notna(delta) else None)
         fig = build_sparkline_area(
             df_core.tail(12) if not df_core.empty else df_core,
@@ -89,7 +86,7 @@ def home_page() -> None:
             render_plotly_chart(fig, use_container_width=True)
     with g2:
         # Weekly net upgrades from core metrics
-        val, delta = _latest_with_delta(df_core, 'week', 'core_net_upgrades') if not df_core.empty else (None, None)
+        val, delta = core_kpis.loc['core_net_upgrades', ['latest', 'delta']]
         st.metric('Weekly net upgrades', format_number(val) if val is not None and pd.notna(val) else '—', format_number(delta) if delta is not None and pd.notna(delta) else None)
         fig = build_sparkline_area(
             df_core.tail(12) if not df_core.empty else df_core,
@@ -99,7 +96,7 @@ def home_page() -> None:
             render_plotly_chart(fig, use_container_width=True)
     with g3:
         # Monthly total growth rate from monthly metrics
-        val, delta = _latest_with_delta(df_monthly, 'month', 'total_growth_rate_pct') if not df_monthly.empty else (None, None)
+        val, delta = monthly_kpis.loc['total_growth_rate_pct', ['latest', 'delta']]
         if val is not None and pd.notna(val):
             st.metric('Monthly growth %', format_percent(val), format_percent(delta) if delta is not None and pd.notna(delta) else None)
         else:
@@ -116,7 +113,7 @@ def home_page() -> None:
     a1, a2, a3 = st.columns(3)
     with a1:
         # Weekly upgrades from core metrics
-        val, delta = _latest_with_delta(df_core, 'week', 'core_upgrades') if not df_core.empty else (None, None)
+        val, delta = core_kpis.loc['core_upgrades', ['latest', 'delta']]
         st.metric('Weekly upgrades', format_number(val) if val is not None and pd.notna(val) else '—', format_number(delta) if delta is not None and pd.notna(delta) else None)
         fig = build_sparkline_area(
             df_core.tail(12) if not df_core.empty else df_core,
@@ -126,7 +123,7 @@ def home_page() -> None:
             render_plotly_chart(fig, use_container_width=True)
     with a2:
         # Weekly trial starts from core metrics
-        val, delta = _latest_with_delta(df_core, 'week', 'total_trials') if not df_core.empty and 'total_trials' in df_core.columns else (None, None)
+        val, delta = core_kpis.loc['total_trials', ['latest', 'delta']]
         st.metric('Weekly trial starts', format_number(val) if val is not None and pd.notna(val) else '—', format_number(delta) if delta is not None and pd.notna(delta) else None)
         fig = build_sparkline_area(
             df_core.tail(12) if not df_core.empty else df_core,
@@ -136,7 +133,7 @@ def home_page() -> None:
             render_plotly_chart(fig, use_container_width=True)
     with a3:
         # Trial conversions from core metrics
-        val, delta = _latest_with_delta(df_core, 'week', 'trial_conversions') if not df_core.empty else (None, None)
+        val, delta = core_kpis.loc['trial_conversions', ['latest', 'delta']]
         st.metric('Weekly trial conversions', format_number(val) if val is not None and pd.notna(val) else '—', format_number(delta) if delta is not None and pd.notna(delta) else None)
         fig = build_sparkline_area(
             df_core.tail(12) if not df_core.empty else df_core,
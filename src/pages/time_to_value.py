@@ -2,7 +2,7 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 from src.db.redshift_connection import run_query, get_redshift_connection
-from src.sql.sql import time_to_first_review_query
+from src.engines.journeys import weekly_time_to_first_review
 
 def time_to_value_page() -> None:
     st.title('Time To Value')
@@ -44,8 +44,8 @@ def time_to_value_page() -> None:
     with tabs[6]:
         st.subheader('Onboarding')
 
-        # Fetch weekly metrics from Redshift
-        df = run_query(time_to_first_review_query)
+        # Weekly metrics from the incremental shop-journey store
+        df = weekly_time_to_first_review()
 
         if df.empty:
             st.info('No data available yet.')
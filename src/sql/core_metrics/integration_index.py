@@ -0,0 +1,117 @@
+# Inputs of the integration bitmap index (src/engines/integrations.py): one
+# row per Shopify shop with core extensions installed in the benchmark window,
+# plus a shop -> integration membership list, so each source is joined to
+# pg.shops and pg.extensions once rather than per integration.
+
+# Lifetimes are summed over the shop's extension rows so averages and LTV
+# are taken over joined extension rows, as the integration report defines them
+integration_shops = """
+SELECT
+    s.id AS shop_id,
+    MAX(CASE WHEN s.awesome = '1' THEN 1 ELSE 0 END) AS awesome,
+    COUNT(*) AS extension_rows,
+    SUM(DATEDIFF(day, e.created_at, COALESCE(e.deleted_at, CURRENT_DATE))) AS lifetime_days,
+    MAX(CASE WHEN e.deleted_at IS NOT NULL THEN 1 ELSE 0 END) AS deleted,
+    MAX(CASE WHEN e.upgraded_at IS NOT NULL THEN 1 ELSE 0 END) AS upgraded,
+    MAX(CASE WHEN e.downgraded_at IS NOT NULL THEN 1 ELSE 0 END) AS downgraded
+FROM pg.shops s
+JOIN pg.extensions e ON s.id = e.shop_id AND e.key = 'core'
+WHERE s.platform = 'shopify'
+    AND e.created_at >= '2023-01-01'
+    AND e.created_at < CURRENT_DATE - 30
+GROUP BY s.id
+"""
+
+# Every integration source, named as on the Integrations page
+integration_memberships = """
+SELECT DISTINCT
+    oat.resource_owner_id AS shop_id,
+    oa.name AS integration_name,
+    'OAuth' AS integration_source
+FROM pg.oauth_access_tokens oat
+JOIN pg.oauth_applications oa ON oat.application_id = oa.id
+WHERE oat.revoked_at IS NULL
+
+UNION
+
+SELECT DISTINCT
+    ac.shop_id,
+    CASE ac.integration_name
+        WHEN 'smile' THEN 'Smile: Rewards & Loyalty'
+        WHEN 'flits' THEN 'Flits: Customer Account Page'
+        WHEN 'lion' THEN 'LoyaltyLion'
+        WHEN 'swell' THEN 'Swell - Yotpo Loyalty & Rewards'
+        WHEN 'beans' THEN 'Beans: Loyalty & Rewards'
+        WHEN 'ekoma' THEN 'Ekoma'
+    END AS integration_name,
+    'Coupon Integration' AS integration_source
+FROM pg.assigned_coupons ac
+WHERE ac.integration_name IN ('smile', 'flits', 'lion', 'swell', 'beans', 'ekoma')
+
+UNION
+
+SELECT DISTINCT
+    tsl.shop_id,
+    'TikTok Shop' AS integration_name,
+    'Sync Logs' AS integration_source
+FROM pg.tiktok_shop_sync_logs tsl
+
+UNION
+
+SELECT DISTINCT
+    st.shop_id,
+    'AfterShip (Settings)' AS integration_name,
+    'Settings Token' AS integration_source
+FROM pg.settings st
+WHERE st.aftership_api_token IS NOT NULL
+    AND st.aftership_api_token != ''
+    AND st.aftership_active = '1'
+
+UNION
+
+SELECT DISTINCT
+    st.shop_id,
+    'Swell (Settings)' AS integration_name,
+    'Settings Token' AS integration_source
+FROM pg.settings st
+WHERE st.swell_api_token IS NOT NULL
+    AND st.swell_api_token != ''
+
+UNION
+
+SELECT DISTINCT
+    st.shop_id,
+    'Beans (Settings)' AS integration_name,
+    'Settings Token' AS integration_source
+FROM pg.settings st
+WHERE st.beans_api_token IS NOT NULL
+    AND st.beans_api_token != ''
+
+UNION
+
+SELECT DISTINCT
+    st.shop_id,
+    'Lion Loyalty (Settings)' AS integration_name,
+    'Settings Token' AS integration_source
+FROM pg.settings st
+WHERE st.lion_loyalty_token IS NOT NULL
+    AND st.lion_loyalty_token != ''
+"""
+
+# Freshness probe for the integration index; lifetimes are measured up to
+# CURRENT_DATE so the result also turns over daily
+integrations_probe = """
+SELECT
+    CURRENT_DATE AS as_of,
+    (SELECT COUNT(*) FROM pg.extensions) AS extensions_rows,
+    (SELECT MAX(updated_at) FROM pg.extensions) AS extensions_updated_at,
+    (SELECT MAX(updated_at) FROM pg.shops) AS shops_updated_at,
+    (SELECT MAX(updated_at) FROM pg.settings) AS settings_updated_at,
+    (SELECT COUNT(*) FROM pg.oauth_access_tokens) AS oauth_tokens_rows,
+    (SELECT MAX(updated_at) FROM pg.oauth_access_tokens) AS oauth_tokens_updated_at,
+    (SELECT COUNT(*) FROM pg.oauth_applications) AS oauth_applications_rows,
+    (SELECT COUNT(*) FROM pg.assigned_coupons) AS assigned_coupons_rows,
+    (SELECT COUNT(*) FROM pg.tiktok_shop_sync_logs) AS tiktok_sync_rows,
+    (SELECT COUNT(*) FROM pg.webhooks) AS webhooks_rows,
+    (SELECT MAX(updated_at) FROM pg.webhooks) AS webhooks_updated_at
+"""
@@ -0,0 +1,10 @@
+# Datasets cached and served with pandas' pyarrow dtype backend (string[pyarrow],
+# timestamp[pyarrow], ...) instead of NumPy dtypes: only worth it for text that
+# pages keep and process as text. The GA extracts are not listed: GaFrames turns
+# every dimension into a shared Categorical, which beats Arrow strings on their
+# compares, str.replace and groupbys (python -m benchmarks.arrow_dtypes)
+PYARROW_DATASETS: frozenset[str] = frozenset()
+
+
+def dtype_backend(query: str) -> str:
+    return 'pyarrow' if query in PYARROW_DATASETS else 'numpy'
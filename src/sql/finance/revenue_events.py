@@ -0,0 +1,21 @@
+# Awesome plan upgrade (+1) and downgrade (-1) events after {since}, oldest
+# first; the revenue ledger replays them into MRR movements.
+revenue_events = """
+SELECT
+    shop_id,
+    created_at,
+    1 AS direction
+FROM dbt.mp__evt_shop_upgrades
+WHERE created_at > '{since}'
+
+UNION ALL
+
+SELECT
+    shop_id,
+    created_at,
+    -1 AS direction
+FROM dbt.mp__evt_shop_downgrades
+WHERE created_at > '{since}'
+
+ORDER BY created_at, direction
+"""
@@ -0,0 +1,8 @@
+from src.sql.core_metrics.integration_index import integration_memberships, integration_shops, integrations_probe
+
+
+# Expensive datasets and the cheap probe that tells whether their inputs changed
+FRESHNESS_PROBES = {
+    integration_shops: integrations_probe,
+    integration_memberships: integrations_probe,
+}
@@ -0,0 +1,15 @@
+# One row per core extension with its lifecycle timestamps; the lifecycle
+# engine derives user counts and flows for any window from this extract.
+lifecycle_extract = """
+SELECT
+    e.shop_id,
+    e.created_at,
+    e.upgraded_at,
+    e.downgraded_at,
+    e.deleted_at,
+    CASE WHEN s.awesome = '1' THEN 1 ELSE 0 END AS shop_awesome,
+    CASE WHEN s.platform = 'shopify' THEN 1 ELSE 0 END AS is_shopify
+FROM pg.extensions e
+LEFT JOIN pg.shops s ON e.shop_id = s.id
+WHERE e.key = 'core'
+"""
@@ -0,0 +1,123 @@
+# Per-shop install -> widget enabled -> first review journeys, the same logic as
+# time_to_first_review_query before its weekly aggregation. {changed_shops}
+# selects which shops to (re)compute; shops in it without a completed journey
+# come back with NULLs so the journey store can drop them.
+shop_journeys_query = """
+WITH
+changed_shops AS (
+    {changed_shops}
+),
+
+core_extensions AS (
+    SELECT
+        shop_id,
+        MIN(created_at) AS extension_installed_at
+    FROM pg.extensions
+    WHERE key = 'core'
+      AND deleted_at IS NULL
+      AND shop_id IN (SELECT shop_id FROM changed_shops)
+    GROUP BY shop_id
+),
+
+widget_enabled AS (
+    SELECT
+        shop_id,
+        MIN(created_at) AS widget_enabled_at
+    FROM pg.setting_logs
+    WHERE key IN ('review_widget_enabled', 'shopify_core_embed_block_enabled')
+      AND new_value = 'true'
+      AND shop_id IN (SELECT shop_id FROM changed_shops)
+    GROUP BY shop_id
+
+    UNION ALL
+
+    SELECT
+        s.shop_id,
+        e.created_at AS widget_enabled_at
+    FROM pg.settings s
+    INNER JOIN pg.extensions e ON s.shop_id = e.shop_id
+    INNER JOIN dbt.installed_widgets_by_shops iw ON s.shop_id = iw.shop_id
+    WHERE s.auto_install_widget = '1'
+      AND e.key = 'core'
+      AND e.deleted_at IS NULL
+      AND iw.installed_widgets_count > 0
+      AND s.shop_id IN (SELECT shop_id FROM changed_shops)
+      AND s.shop_id NOT IN (
+          SELECT DISTINCT shop_id
+          FROM pg.setting_logs
+          WHERE key IN ('review_widget_enabled', 'shopify_core_embed_block_enabled')
+            AND new_value = 'true'
+      )
+),
+
+widget_enabled_dedup AS (
+    SELECT
+        shop_id,
+        MIN(widget_enabled_at) AS widget_enabled_at
+    FROM widget_enabled
+    GROUP BY shop_id
+),
+
+first_reviews AS (
+    SELECT
+        shop_id,
+        MIN(made_at) AS first_review_date
+    FROM pg.reviews
+    WHERE curated = 'ok'
+      AND hidden = 0
+      AND made_at IS NOT NULL
+      AND shop_id IN (SELECT shop_id FROM changed_shops)
+    GROUP BY shop_id
+),
+
+shop_journeys AS (
+    SELECT
+        s.id AS shop_id,
+        s.awesome,
+        GREATEST(
+            ce.extension_installed_at,
+            COALESCE(we.widget_enabled_at, ce.extension_installed_at),
+            fr.first_review_date
+        ) AS first_review_shown_date,
+        DATEDIFF(
+            hour,
+            ce.extension_installed_at,
+            GREATEST(
+                ce.extension_installed_at,
+                COALESCE(we.widget_enabled_at, ce.extension_installed_at),
+                fr.first_review_date
+            )
+        ) / 24.0 AS days_to_first_review
+    FROM pg.shops s
+    INNER JOIN core_extensions ce ON s.id = ce.shop_id
+    INNER JOIN first_reviews fr ON s.id = fr.shop_id
+    LEFT JOIN widget_enabled_dedup we ON s.id = we.shop_id
+    WHERE ce.extension_installed_at IS NOT NULL
+      AND fr.first_review_date IS NOT NULL
+)
+
+SELECT
+    c.shop_id,
+    j.awesome,
+    j.first_review_shown_date,
+    j.days_to_first_review::FLOAT AS days_to_first_review
+FROM (SELECT DISTINCT shop_id FROM changed_shops) c
+LEFT JOIN shop_journeys j ON j.shop_id = c.shop_id
+"""
+
+# Every shop: used for the initial build and periodic full refreshes
+all_shops = "SELECT id AS shop_id FROM pg.shops"
+
+# Shops with any journey-relevant activity since {since}
+shops_changed_since = """
+    SELECT shop_id FROM pg.extensions
+    WHERE key = 'core' AND (created_at >= '{since}' OR deleted_at >= '{since}' OR updated_at >= '{since}')
+    UNION
+    SELECT shop_id FROM pg.setting_logs WHERE created_at >= '{since}'
+    UNION
+    SELECT shop_id FROM pg.settings WHERE updated_at >= '{since}'
+    UNION
+    SELECT shop_id FROM pg.reviews WHERE made_at >= '{since}' OR updated_at >= '{since}'
+    UNION
+    SELECT id AS shop_id FROM pg.shops WHERE updated_at >= '{since}'
+"""
@@ -0,0 +1,8 @@
+# Every trial start; the upgrade engine looks up the latest one before each upgrade
+shop_trials_extract = """
+SELECT
+    shop_id,
+    created_at
+FROM pg.shop_trials
+WHERE created_at IS NOT NULL
+"""
@@ -0,0 +1,13 @@
+# Trial starts with their campaign handle for the trial funnel engine; covers a
+# year so the funnel window can be changed without another query
+trial_starts_extract = """
+SELECT
+    shop_id,
+    trial_start_date,
+    trial_expiration_date::timestamp AS trial_expiration_date,
+    trial_campaign_handle::VARCHAR AS trial_campaign_handle
+FROM dbt.mp__evt_trial_started
+WHERE trial_start_date IS NOT NULL
+    AND trial_expiration_date IS NOT NULL
+    AND trial_start_date >= DATEADD(WEEK, -52, CURRENT_DATE)
+"""
@@ -0,0 +1,47 @@
+"""
+Render-time number formatting: datasets stay numeric, pages format on display
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# printf-style formats shared by table column configs and text labels
+FORMATS = {
+    'count': '%d',
+    'count_delta': '%+d',
+    'percent': '%.1f%%',
+    'pp': '%+.1f pp',
+    'percent_change': '%+.1f%%',
+    'rate': '%.2f%%',
+    'rate_delta': '%+.2f%%',
+    'currency': '$%.0f',
+    'currency_delta': '$%+.0f',
+    'days': '%.0f days',
+    'days_delta': '%+.0f days',
+}
+
+
+def format_values(values, kind: str, missing: str = 'N/A') -> np.ndarray:
+    """Format a numeric array or Series as strings in one vectorized pass"""
+    numbers = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64')
+    present = np.isfinite(numbers)
+    out = np.full(len(numbers), missing, dtype=object)
+    if present.any():
+        out[present] = np.char.mod(FORMATS[kind], numbers[present])
+    return out
+
+
+def format_value(value, kind: str, missing: str = 'N/A') -> str:
+    """Format a single number, for metrics and captions"""
+    return format_values([value], kind, missing)[0]
+
+
+def column_formats(kinds: dict) -> dict:
+    """st.dataframe column_config that formats numeric columns without converting them to strings
+
+    Kinds are FORMATS keys or Streamlit's named number formats ('localized', 'compact', ...)
+    """
+    return {
+        column: st.column_config.NumberColumn(format=FORMATS.get(kind, kind))
+        for column, kind in kinds.items()
+    }